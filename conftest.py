@@ -4,6 +4,9 @@ import sys
 # 1) Compute path to your src folder:
 ROOT = pathlib.Path(__file__).parent
 SRC = ROOT / "spotifyActionService" / "src"
+BENCH = ROOT / "spotifyActionService" / "bench"
 
 # 2) Prepend it to sys.path so "import spotifyActionService" works everywhere
 sys.path.insert(0, str(SRC.resolve()))
+# The benchmark modules are smoke-tested alongside the unit tests
+sys.path.insert(1, str(BENCH.resolve()))
@@ -0,0 +1,170 @@
+import threading
+import time
+from collections import Counter
+from typing import Any
+
+from models.tracks import format_added_at, move_items
+
+# Epoch of the oldest synthetic track; later tracks are one minute apart
+START_EPOCH = 1_600_000_000.0
+
+
+def make_items(track_ids: list[str], start: float = START_EPOCH) -> list[dict]:
+    """Playlist items for `track_ids`, added one minute apart from `start`."""
+    return [
+        {"added_at": format_added_at(start + 60 * i), "track": {"id": tid}}
+        for i, tid in enumerate(track_ids)
+    ]
+
+
+class FakeSpotify:
+    """
+    In-process stand-in for the parts of spotipy.Spotify the accessor uses.
+    Pages and writes behave like the Web API (page sizes, `next` links,
+    totals, snapshot_ids) and each request sleeps `latency` seconds.
+    `requests` counts calls per method.
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.requests: Counter[str] = Counter()
+        self.playlists: dict[str, dict[str, Any]] = {}
+        self.liked: list[dict] = []  # newest first
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ setup
+
+    def add_playlist(self, playlist_id: str, name: str, items: list[dict]) -> None:
+        self.playlists[playlist_id] = {"name": name, "items": items, "version": 1}
+
+    def track_ids(self, playlist_id: str) -> list[str]:
+        return [item["track"]["id"] for item in self.playlists[playlist_id]["items"]]
+
+    # --------------------------------------------------------------- plumbing
+
+    def _request(self, method: str) -> None:
+        with self._lock:
+            self.requests[method] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    @staticmethod
+    def _page(
+        kind: str, key: str, items: list, offset: int, limit: int
+    ) -> dict[str, Any]:
+        end = offset + limit
+        return {
+            "items": items[offset:end],
+            "total": len(items),
+            "offset": offset,
+            "limit": limit,
+            "next": f"{kind}|{key}|{end}|{limit}" if end < len(items) else None,
+        }
+
+    def _touch(self, playlist_id: str) -> dict[str, str]:
+        playlist = self.playlists[playlist_id]
+        playlist["version"] += 1
+        return {"snapshot_id": f"{playlist_id}@{playlist['version']}"}
+
+    # ------------------------------------------------------------------ reads
+
+    def current_user(self) -> dict[str, Any]:
+        self._request("current_user")
+        return {"id": "bench-user"}
+
+    def playlist(self, playlist_id: str, fields: str | None = None) -> dict[str, Any]:
+        self._request("playlist")
+        playlist = self.playlists[playlist_id]
+        return {
+            "id": playlist_id,
+            "name": playlist["name"],
+            "description": "",
+            "snapshot_id": f"{playlist_id}@{playlist['version']}",
+            "tracks": {"total": len(playlist["items"])},
+        }
+
+    def playlist_items(
+        self,
+        playlist_id: str,
+        fields: str | None = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> dict[str, Any]:
+        self._request("playlist_items")
+        items = self.playlists[playlist_id]["items"]
+        return self._page("playlist", playlist_id, items, offset, limit)
+
+    def current_user_saved_tracks(self, limit: int = 20, offset: int = 0) -> dict:
+        self._request("current_user_saved_tracks")
+        return self._page("liked", "", self.liked, offset, limit)
+
+    def current_user_playlists(self, limit: int = 50, offset: int = 0) -> dict:
+        self._request("current_user_playlists")
+        library = [{"id": pid, "name": p["name"]} for pid, p in self.playlists.items()]
+        return self._page("library", "", library, offset, limit)
+
+    def next(self, result: dict[str, Any]) -> dict[str, Any] | None:
+        if not result.get("next"):
+            return None
+        kind, key, offset, limit = result["next"].split("|")
+        self._request("next")
+        if kind == "playlist":
+            items = self.playlists[key]["items"]
+        elif kind == "liked":
+            items = self.liked
+        else:
+            items = [
+                {"id": pid, "name": p["name"]} for pid, p in self.playlists.items()
+            ]
+        return self._page(kind, key, items, int(offset), int(limit))
+
+    # ----------------------------------------------------------------- writes
+
+    def user_playlist_create(self, user: str, name: str, public: bool = True) -> dict:
+        self._request("user_playlist_create")
+        playlist_id = f"created-{len(self.playlists)}"
+        self.add_playlist(playlist_id, name, [])
+        return {"id": playlist_id, "name": name}
+
+    def playlist_add_items(
+        self, playlist_id: str, items: list[str], position: int | None = None
+    ) -> dict[str, str]:
+        self._request("playlist_add_items")
+        if len(items) > 100:
+            raise ValueError("At most 100 items per request")
+        added = make_items(items, start=time.time())
+        target = self.playlists[playlist_id]["items"]
+        at = len(target) if position is None else position
+        target[at:at] = added
+        return self._touch(playlist_id)
+
+    def playlist_remove_specific_occurrences_of_items(
+        self,
+        playlist_id: str,
+        items: list[dict],
+        snapshot_id: str | None = None,
+    ) -> dict[str, str]:
+        self._request("playlist_remove_specific_occurrences_of_items")
+        target = self.playlists[playlist_id]["items"]
+        positions = sorted(
+            (p for item in items for p in item["positions"]), reverse=True
+        )
+        for position in positions:
+            del target[position]
+        return self._touch(playlist_id)
+
+    def playlist_reorder_items(
+        self,
+        playlist_id: str,
+        range_start: int,
+        insert_before: int,
+        range_length: int = 1,
+    ) -> dict[str, str]:
+        self._request("playlist_reorder_items")
+        move_items(
+            self.playlists[playlist_id]["items"],
+            range_start,
+            insert_before,
+            range_length,
+        )
+        return self._touch(playlist_id)
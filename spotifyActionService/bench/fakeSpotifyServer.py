@@ -0,0 +1,146 @@
+import json
+import re
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from fakeSpotify import FakeSpotify
+
+
+def _strip_uri(uri: str) -> str:
+    return uri.rsplit(":", 1)[-1]
+
+
+class FakeSpotifyServer(ThreadingHTTPServer):
+    """
+    Serves a FakeSpotify over HTTP on localhost, answering the Web API
+    routes the async accessor uses. `throttle` makes that many of the next
+    requests fail with 429 (Retry-After: 0).
+    """
+
+    daemon_threads = True
+
+    def __init__(self, fake: FakeSpotify) -> None:
+        super().__init__(("127.0.0.1", 0), FakeSpotifyHandler)
+        self.fake = fake
+        self.throttle = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+class FakeSpotifyHandler(BaseHTTPRequestHandler):
+    server: FakeSpotifyServer
+
+    def log_message(self, format: str, *args: object) -> None:
+        """Keep test output quiet."""
+
+    def _reply(self, status: int, body: dict[str, Any], **headers: str) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in headers.items():
+            self.send_header(name.replace("_", "-"), value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _throttled(self) -> bool:
+        with self.server.lock:
+            if self.server.throttle <= 0:
+                return False
+            self.server.throttle -= 1
+        self._reply(429, {"error": {"status": 429}}, Retry_After="0")
+        return True
+
+    def _route(self, routes: list[tuple[str, Callable[..., dict]]]) -> None:
+        if self._throttled():
+            return
+        url = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        for pattern, handler in routes:
+            match = re.fullmatch(pattern, url.path)
+            if match is None:
+                continue
+            try:
+                status, body = handler(*match.groups(), query=query)
+            except KeyError:
+                status, body = 404, {"error": {"status": 404}}
+            self._reply(status, body)
+            return
+        self._reply(404, {"error": {"status": 404}})
+
+    def do_GET(self) -> None:
+        fake = self.server.fake
+        self._route(
+            [
+                (r"/v1/me", lambda query: (200, fake.current_user())),
+                (
+                    r"/v1/me/tracks",
+                    lambda query: (
+                        200,
+                        fake.current_user_saved_tracks(
+                            limit=int(query.get("limit", 20)),
+                            offset=int(query.get("offset", 0)),
+                        ),
+                    ),
+                ),
+                (
+                    r"/v1/playlists/([^/]+)",
+                    lambda pid, query: (200, fake.playlist(pid)),
+                ),
+                (
+                    r"/v1/playlists/([^/]+)/tracks",
+                    lambda pid, query: (
+                        200,
+                        fake.playlist_items(
+                            pid,
+                            limit=int(query.get("limit", 100)),
+                            offset=int(query.get("offset", 0)),
+                        ),
+                    ),
+                ),
+            ]
+        )
+
+    def do_POST(self) -> None:
+        fake = self.server.fake
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        self._route(
+            [
+                (
+                    r"/v1/playlists/([^/]+)/tracks",
+                    lambda pid, query: (
+                        201,
+                        fake.playlist_add_items(
+                            pid,
+                            [_strip_uri(uri) for uri in body.get("uris", [])],
+                            position=body.get("position"),
+                        ),
+                    ),
+                ),
+            ]
+        )
+
+
+@contextmanager
+def serve(fake: FakeSpotify) -> Iterator[FakeSpotifyServer]:
+    """Run a FakeSpotifyServer for `fake` on a background thread."""
+    server = FakeSpotifyServer(fake)
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
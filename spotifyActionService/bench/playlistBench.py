@@ -0,0 +1,306 @@
+"""
+Benchmarks PlaylistService against FakeSpotify, an in-process stand-in for
+the Web API, and compares the results with a stored baseline.
+
+    just bench                          # 100 / 1k / 10k tracks, check baseline
+    just bench --sizes 100000           # a single large run
+    just bench --latency 0.05           # simulate 50ms per request
+    just bench --update-baseline        # record the current numbers
+
+Request counts must match the baseline exactly; wall time and peak memory
+may drift by `--time-tolerance` / `--memory-tolerance` before the run is
+reported as a regression (exit status 1).
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+
+from accessor.archiveManifest import ArchiveManifest
+from accessor.membershipIndex import MembershipIndex
+from accessor.playlistCache import PlaylistCache
+from accessor.spotifyAccessor import SpotifyAccessor
+from accessor.writeJournal import WriteJournal
+from fakeSpotify import FakeSpotify, make_items
+from logic.playlistLogic import PlaylistService
+from models.actions import ActionType, ArchiveAction, SyncAction, SyncLikedAction
+from models.tracks import format_added_at
+from util.logger import logger
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_SIZES = [100, 1_000, 10_000]
+# Timing differences below this are noise, whatever the relative change
+MIN_SECONDS_DELTA = 0.05
+
+
+@dataclass
+class BenchResult:
+    scenario: str
+    size: int
+    seconds: float
+    requests: int
+    peak_bytes: int
+    allocated_blocks: int
+
+    @property
+    def name(self) -> str:
+        return f"{self.scenario}-{self.size}"
+
+
+def _ids(prefix: str, count: int) -> list[str]:
+    return [f"{prefix}{i:07d}" for i in range(count)]
+
+
+def setup_sync(client: FakeSpotify, size: int, overlap: float) -> SyncAction:
+    """A source of `size` tracks; the target already holds `overlap` of them."""
+    source = _ids("s", size)
+    client.add_playlist("source", "Source", make_items(source))
+    client.add_playlist("target", "Target", make_items(source[: int(size * overlap)]))
+    return SyncAction(
+        type=ActionType.SYNC, source_playlist_id="source", target_playlist_id="target"
+    )
+
+
+def setup_sync_liked(client: FakeSpotify, size: int, overlap: float) -> SyncLikedAction:
+    """`size` liked tracks, newest first; the target holds `overlap` of them."""
+    liked = _ids("l", size)
+    now = time.time()
+    client.liked = [
+        {"added_at": format_added_at(now - i), "track": {"id": tid}}
+        for i, tid in enumerate(liked)
+    ]
+    client.add_playlist("target", "Target", make_items(liked[: int(size * overlap)]))
+    return SyncLikedAction(
+        type=ActionType.SYNC_LIKED,
+        target_playlist_id="target",
+        timeBetweenActInSeconds=size + 3600,
+        max_tracks=size,
+    )
+
+
+def setup_archive(client: FakeSpotify, size: int, overlap: float) -> ArchiveAction:
+    """
+    Move every one of `size` source tracks into 'Source-Archive', which
+    already holds `overlap` of them.
+    """
+    source = _ids("a", size)
+    client.add_playlist("source", "Source", make_items(source))
+    client.add_playlist(
+        "archive", "Source-Archive", make_items(source[: int(size * overlap)])
+    )
+    return ArchiveAction(
+        type=ActionType.ARCHIVE,
+        source_playlist_id="source",
+        filter_by_time=False,
+        archive_after_seconds=0,
+    )
+
+
+SCENARIOS: dict[str, tuple[Callable, str]] = {
+    "sync": (setup_sync, "sync_playlists"),
+    "sync_liked": (setup_sync_liked, "sync_liked_tracks"),
+    "archive": (setup_archive, "archive_playlists"),
+}
+
+
+def run_action(
+    client: FakeSpotify, scenario: str, action: object, page_workers: int
+) -> float:
+    """
+    Run `action` through a PlaylistService wired like the production one,
+    with its local state in a scratch directory. Returns the seconds taken.
+    """
+    method = SCENARIOS[scenario][1]
+    with tempfile.TemporaryDirectory() as state_dir:
+        accessor = SpotifyAccessor(
+            client,
+            user_id="bench-user",
+            cache=PlaylistCache(cache_dir=os.path.join(state_dir, "cache")),
+            page_workers=page_workers,
+        )
+        service = PlaylistService(
+            accessor,
+            membership=MembershipIndex(os.path.join(state_dir, "membership")),
+            archive_manifest=ArchiveManifest(os.path.join(state_dir, "shards.json")),
+            journal=WriteJournal(os.path.join(state_dir, "journal.json")),
+        )
+        start = time.perf_counter()
+        getattr(service, method)(action)
+        return time.perf_counter() - start
+
+
+def _run_once(
+    scenario: str, size: int, overlap: float, latency: float, page_workers: int
+) -> tuple[float, int]:
+    """Run one scenario from scratch; returns (seconds, requests)."""
+    client = FakeSpotify()
+    action = SCENARIOS[scenario][0](client, size, overlap)
+    client.latency = latency
+    seconds = run_action(client, scenario, action, page_workers)
+    return seconds, client.requests.total()
+
+
+def run_scenario(
+    scenario: str,
+    size: int,
+    overlap: float = 0.5,
+    latency: float = 0.0,
+    page_workers: int = 4,
+    repeat: int = 3,
+) -> BenchResult:
+    """
+    Time `repeat` untraced runs (keeping the median), then repeat once under
+    tracemalloc for the peak traced memory and the blocks still allocated
+    when the run returns.
+    """
+    timings = []
+    for _ in range(repeat):
+        seconds, requests = _run_once(scenario, size, overlap, latency, page_workers)
+        timings.append(seconds)
+
+    tracemalloc.start()
+    try:
+        _run_once(scenario, size, overlap, latency, page_workers)
+        _, peak = tracemalloc.get_traced_memory()
+        blocks = sum(
+            stat.count for stat in tracemalloc.take_snapshot().statistics("filename")
+        )
+    finally:
+        tracemalloc.stop()
+
+    return BenchResult(
+        scenario=scenario,
+        size=size,
+        seconds=round(statistics.median(timings), 4),
+        requests=requests,
+        peak_bytes=peak,
+        allocated_blocks=blocks,
+    )
+
+
+def compare(
+    results: list[BenchResult],
+    baseline: dict[str, dict],
+    time_tolerance: float,
+    memory_tolerance: float,
+) -> list[str]:
+    """Describe each way `results` are worse than `baseline`."""
+    regressions = []
+    for result in results:
+        expected = baseline.get(result.name)
+        if expected is None:
+            continue
+        if result.requests != expected["requests"]:
+            regressions.append(
+                f"{result.name}: {result.requests} requests "
+                f"(baseline {expected['requests']})"
+            )
+        slower = result.seconds - expected["seconds"]
+        if slower > expected["seconds"] * time_tolerance and slower > MIN_SECONDS_DELTA:
+            regressions.append(
+                f"{result.name}: {result.seconds:.3f}s "
+                f"(baseline {expected['seconds']:.3f}s)"
+            )
+        if result.peak_bytes > expected["peak_bytes"] * (1 + memory_tolerance):
+            regressions.append(
+                f"{result.name}: peak {result.peak_bytes} bytes "
+                f"(baseline {expected['peak_bytes']})"
+            )
+    return regressions
+
+
+def format_results(results: list[BenchResult], baseline: dict[str, dict]) -> str:
+    header = (
+        f"{'scenario':<20} {'seconds':>9} {'requests':>9} "
+        f"{'peak KiB':>10} {'blocks':>8} {'vs baseline':>12}"
+    )
+    lines = [header]
+    for result in results:
+        expected = baseline.get(result.name)
+        change = (
+            f"{result.seconds / expected['seconds'] - 1:+.0%}"
+            if expected and expected["seconds"]
+            else "-"
+        )
+        lines.append(
+            f"{result.name:<20} {result.seconds:>9.3f} {result.requests:>9} "
+            f"{result.peak_bytes / 1024:>10.0f} {result.allocated_blocks:>8} "
+            f"{change:>12}"
+        )
+    return "\n".join(lines)
+
+
+def load_baseline(path: str) -> dict[str, dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS)
+    )
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    parser.add_argument(
+        "--overlap",
+        type=float,
+        default=0.5,
+        help="share of the source already in the target",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds slept per request"
+    )
+    parser.add_argument("--page-workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--time-tolerance", type=float, default=0.5)
+    parser.add_argument("--memory-tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    logger.setLevel(logging.WARNING)
+    results = [
+        run_scenario(
+            scenario,
+            size,
+            overlap=args.overlap,
+            latency=args.latency,
+            page_workers=args.page_workers,
+            repeat=args.repeat,
+        )
+        for scenario in args.scenarios
+        for size in args.sizes
+    ]
+    baseline = load_baseline(args.baseline)
+    print(format_results(results, baseline))
+
+    if args.update_baseline:
+        baseline.update({r.name: asdict(r) for r in results})
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if args.latency or args.overlap != 0.5 or args.page_workers != 4:
+        # The baseline is recorded with the defaults only
+        return 0
+    regressions = compare(results, baseline, args.time_tolerance, args.memory_tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+import os
+from dataclasses import asdict, dataclass
+
+from accessor.jsonStore import JsonStore
+from util.env import get_state_dir
+
+
+@dataclass
+class Shard:
+    """One playlist of a sharded archive."""
+
+    playlist_id: str
+    name: str
+    # Snapshot the shard was left at when it filled up; None while active
+    sealed_snapshot_id: str | None = None
+
+
+class ArchiveManifest(JsonStore):
+    """
+    Persists the shard playlists of each source's archive, oldest first,
+    in a small JSON file keyed by source playlist ID.
+    """
+
+    description = "archive manifest"
+
+    def __init__(self, path: str | None = None) -> None:
+        super().__init__(path or os.path.join(get_state_dir(), "archive_shards.json"))
+
+    def get(self, source_playlist_id: str) -> list[Shard]:
+        """
+        Return the shards recorded for `source_playlist_id`, oldest first.
+        """
+        raw = self._get(source_playlist_id) or []
+        return [Shard(**shard) for shard in raw]
+
+    def set(self, source_playlist_id: str, shards: list[Shard]) -> None:
+        """
+        Replace the shards recorded for `source_playlist_id`.
+        """
+        self._put(source_playlist_id, [asdict(shard) for shard in shards])
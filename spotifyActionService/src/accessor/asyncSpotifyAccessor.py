@@ -0,0 +1,348 @@
+import asyncio
+import inspect
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import requests
+from accessor.batchWriter import BatchResult, BatchWriter, ChunkResult
+from accessor.playlistCache import PlaylistCache
+from accessor.rateLimiter import READ, WRITE, RateLimiter
+from accessor.spotifyAccessor import (
+    PLAYLIST_PAGE_SIZE,
+    SAVED_TRACKS_PAGE_SIZE,
+    collect_saved_tracks,
+)
+from accessor.watermarkStore import Watermark
+from models.tracks import TrackRef, to_track_refs
+from spotipy.exceptions import SpotifyException
+from util.logger import event, logger, truncate
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - exercised only without the extra
+    httpx = None
+
+API_BASE_URL = "https://api.spotify.com/v1"
+# Requests one accessor keeps open at once
+DEFAULT_MAX_IN_FLIGHT = 64
+PLAYLIST_ITEM_FIELDS = "items(added_at,track(id)),total"
+# Seconds before expiry at which AsyncToken fetches a fresh token
+TOKEN_EXPIRY_MARGIN = 60
+
+
+class AsyncToken:
+    """
+    Access token for the async accessor. Fetching or refreshing a token is
+    blocking I/O in spotipy, so `fetch` (returning spotipy's token info,
+    with `access_token` and `expires_at`) runs in a worker thread, and its
+    token is reused until shortly before it expires.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], dict[str, Any]],
+        clock: Callable[[], float] = time.time,
+        margin: float = TOKEN_EXPIRY_MARGIN,
+    ) -> None:
+        self.fetch = fetch
+        self.clock = clock
+        self.margin = margin
+        self._info: dict[str, Any] | None = None
+        self._lock = asyncio.Lock()
+
+    async def __call__(self) -> str:
+        async with self._lock:
+            if self._info is None or (
+                self._info.get("expires_at", 0) - self.margin <= self.clock()
+            ):
+                self._info = await asyncio.to_thread(self.fetch)
+            return self._info["access_token"]
+
+
+class AsyncSpotifyAccessor:
+    """
+    Non-blocking counterpart of SpotifyAccessor, talking to the Web API over
+    an httpx.AsyncClient. It covers the reads and appends that the additive
+    actions need; pages after the first are requested together, up to
+    `max_in_flight` requests at a time across everything using the accessor.
+    Errors surface as spotipy's SpotifyException (and connection failures as
+    requests.ConnectionError), so the rate limiter and BatchWriter treat them
+    exactly as they do for the blocking accessor.
+    Requires the optional `httpx` dependency (`spotify-actions[async]`).
+    """
+
+    def __init__(
+        self,
+        token: Callable[[], str | Awaitable[str]],
+        client: "httpx.AsyncClient | None" = None,
+        base_url: str = API_BASE_URL,
+        cache: PlaylistCache | None = None,
+        rate_limiter: RateLimiter | None = None,
+        writer: BatchWriter | None = None,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    ) -> None:
+        if httpx is None:
+            raise ImportError(
+                "The async engine needs httpx; install spotify-actions[async]"
+            )
+        self.token = token
+        self.base_url = base_url.rstrip("/")
+        self.client = client or httpx.AsyncClient(
+            # Only failed connects are retried; nothing was sent for those
+            transport=httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=max_in_flight,
+                    max_keepalive_connections=max_in_flight,
+                ),
+                retries=3,
+            ),
+            timeout=httpx.Timeout(30.0, pool=None),
+        )
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.writer = writer or BatchWriter()
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    async def _request(
+        self,
+        kind: str,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+        json: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Send one API request, throttled by the rate limiter when configured.
+        """
+        if self.rate_limiter is None:
+            return await self._send(method, path, params, json)
+        return await self.rate_limiter.call_async(
+            kind, self._send, method, path, params, json
+        )
+
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None,
+        json: dict[str, Any] | None,
+    ) -> dict[str, Any]:
+        url = f"{self.base_url}{path}"
+        token = self.token()
+        if inspect.isawaitable(token):
+            token = await token
+        async with self._in_flight:
+            try:
+                response = await self.client.request(
+                    method,
+                    url,
+                    params=params,
+                    json=json,
+                    headers={"Authorization": f"Bearer {token}"},
+                )
+            except httpx.TransportError as e:
+                raise requests.ConnectionError(f"{method} {url}: {e}") from e
+        if response.status_code >= 400:
+            raise SpotifyException(
+                response.status_code,
+                -1,
+                f"{method} {url}: {response.text}",
+                headers=dict(response.headers),
+            )
+        return response.json() if response.content else {}
+
+    async def get_playlist_metadata(self, playlist_id: str) -> dict[str, Any]:
+        """
+        Fetch basic metadata for a Spotify playlist.
+        """
+        metadata = await self._request(
+            READ,
+            "GET",
+            f"/playlists/{playlist_id}",
+            params={"fields": "id,name,description,snapshot_id,tracks(total)"},
+        )
+        logger.info(
+            "Fetched metadata for playlist %s: %s", playlist_id, truncate(metadata)
+        )
+        return metadata
+
+    async def fetch_playlist_tracks(self, playlist_id: str) -> list[TrackRef]:
+        """
+        Fetch all tracks from a Spotify playlist, served from the cache when
+        its snapshot is unchanged.
+        """
+        snapshot_id = None
+        if self.cache is not None:
+            metadata = await self.get_playlist_metadata(playlist_id)
+            snapshot_id = metadata.get("snapshot_id")
+            cached = (
+                await asyncio.to_thread(self.cache.get, playlist_id, snapshot_id)
+                if snapshot_id
+                else None
+            )
+            if cached is not None:
+                logger.info(
+                    f"Using {len(cached)} cached tracks for playlist {playlist_id} "
+                    + f"(snapshot {snapshot_id})"
+                )
+                return cached
+
+        def fetch_page(offset: int) -> Awaitable[dict[str, Any]]:
+            return self._request(
+                READ,
+                "GET",
+                f"/playlists/{playlist_id}/tracks",
+                params={
+                    "fields": PLAYLIST_ITEM_FIELDS,
+                    "limit": PLAYLIST_PAGE_SIZE,
+                    "offset": offset,
+                },
+            )
+
+        first = await fetch_page(0)
+        rest = await asyncio.gather(
+            *(
+                fetch_page(offset)
+                for offset in range(
+                    PLAYLIST_PAGE_SIZE, first.get("total") or 0, PLAYLIST_PAGE_SIZE
+                )
+            )
+        )
+        tracks = [
+            item
+            for resp in (first, *rest)
+            for item in to_track_refs(resp.get("items", []))
+        ]
+        logger.info(
+            "Fetched %s tracks from playlist %s",
+            len(tracks),
+            playlist_id,
+            extra=event("playlist_fetched", playlist_id=playlist_id, items=len(tracks)),
+        )
+        if snapshot_id:
+            await asyncio.to_thread(self.cache.put, playlist_id, snapshot_id, tracks)
+        return tracks
+
+    async def current_user_saved_tracks(
+        self,
+        time_in_seconds: int | None = None,
+        max_items: int | None = 500,
+        stop_at: Watermark | None = None,
+    ) -> list[TrackRef]:
+        """
+        Fetch the current user's liked songs, newest first, up to the
+        time-window cutoff, `max_items` items or the `stop_at` watermark.
+        Without a cutoff or watermark every page up to `max_items` is
+        requested at once; otherwise pages are read in turn, since the walk
+        usually ends within the first.
+        """
+        cutoff = None
+        if time_in_seconds and time_in_seconds > 0:
+            cutoff = (
+                datetime.now(UTC) - timedelta(seconds=time_in_seconds)
+            ).timestamp()
+        limit = max_items if max_items is not None else float("inf")
+        bounded = cutoff is not None or stop_at is not None
+        pages = self._saved_track_pages(limit, concurrent=not bounded)
+        tracks: list[TrackRef] = []
+        try:
+            async for resp in pages:
+                collected, reached_end = collect_saved_tracks(
+                    to_track_refs(resp.get("items", [])),
+                    len(tracks),
+                    cutoff,
+                    limit,
+                    stop_at,
+                )
+                tracks.extend(collected)
+                if len(tracks) >= limit or reached_end:
+                    break
+        finally:
+            await pages.aclose()
+
+        logger.info(
+            "Fetched %s liked songs",
+            len(tracks),
+            extra=event("liked_fetched", items=len(tracks)),
+        )
+        return tracks
+
+    async def _saved_track_pages(
+        self, max_items: float, concurrent: bool
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Yield raw liked-song pages newest first, up to `max_items` items:
+        all requested at once with `concurrent`, otherwise one after another.
+        """
+
+        def fetch_page(offset: int) -> Awaitable[dict[str, Any]]:
+            return self._request(
+                READ,
+                "GET",
+                "/me/tracks",
+                params={"limit": SAVED_TRACKS_PAGE_SIZE, "offset": offset},
+            )
+
+        first = await fetch_page(0)
+        yield first
+        total = int(min(first.get("total") or 0, max_items))
+        offsets = range(SAVED_TRACKS_PAGE_SIZE, total, SAVED_TRACKS_PAGE_SIZE)
+        if concurrent:
+            for resp in await asyncio.gather(*map(fetch_page, offsets)):
+                yield resp
+            return
+        for offset in offsets:
+            yield await fetch_page(offset)
+
+    async def add_tracks_to_playlist(
+        self,
+        playlist_id: str,
+        track_ids: list[str],
+        on_chunk: Callable[[ChunkResult, int], None] | None = None,
+    ) -> BatchResult:
+        """
+        Append track IDs to a Spotify playlist in order, 100 per request.
+        Every chunk is attempted; if any chunk fails the first error is raised
+        once the remaining chunks have been written.
+        """
+        logger.info(
+            "Adding %s tracks to playlist %s: %s",
+            len(track_ids),
+            playlist_id,
+            truncate(track_ids),
+            extra=event("add_tracks", playlist_id=playlist_id, items=len(track_ids)),
+        )
+
+        async def send(chunk: list[str]) -> dict[str, Any]:
+            response = await self._request(
+                WRITE,
+                "POST",
+                f"/playlists/{playlist_id}/tracks",
+                json={"uris": [track_uri(tid) for tid in chunk]},
+            )
+            logger.info(
+                "Added tracks to playlist %s: %s",
+                playlist_id,
+                truncate(response),
+                extra=event("tracks_added", playlist_id=playlist_id),
+            )
+            return response
+
+        result = await self.writer.write_async(
+            track_ids, send, label=f"Add to playlist {playlist_id}", on_chunk=on_chunk
+        )
+        if not result.ok:
+            error = result.failed[0].error
+            logger.error(f"Failed to add tracks to playlist {playlist_id}: {error}")
+            raise error
+        return result
+
+
+def track_uri(track_id: str) -> str:
+    """Spotify URI of a track ID (URIs are passed through)."""
+    return track_id if track_id.startswith("spotify:") else f"spotify:track:{track_id}"
@@ -0,0 +1,222 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from spotipy.exceptions import SpotifyException
+from util.logger import event, logger
+
+# The Web API accepts at most this many items per add/remove request
+MAX_ITEMS_PER_REQUEST = 100
+
+
+@dataclass
+class ChunkResult:
+    """Outcome of writing a single chunk."""
+
+    index: int
+    items: list[Any]
+    attempts: int = 0
+    elapsed_seconds: float = 0.0
+    response: dict[str, Any] | None = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchResult:
+    """Per-chunk outcome of a batched write, in write order."""
+
+    chunks: list[ChunkResult] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return all(chunk.ok for chunk in self.chunks)
+
+    @property
+    def written(self) -> list[Any]:
+        return [tid for chunk in self.chunks if chunk.ok for tid in chunk.items]
+
+    @property
+    def failed(self) -> list[ChunkResult]:
+        return [chunk for chunk in self.chunks if not chunk.ok]
+
+    @property
+    def snapshot_id(self) -> str | None:
+        """Snapshot returned by the last successful chunk."""
+        for chunk in reversed(self.chunks):
+            if chunk.ok and chunk.response:
+                return chunk.response.get("snapshot_id")
+        return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Return True for failures after which the write certainly did not land,
+    i.e. throttling. A 5xx, timeout or dropped connection may arrive after
+    Spotify applied the write and resending would add tracks twice, so those
+    are left to the caller; unsent requests are retried by the HTTP transport.
+    """
+    return isinstance(error, SpotifyException) and error.http_status == 429
+
+
+def is_permanent(error: Exception) -> bool:
+    """
+    Return True for client errors that retrying cannot fix, such as 403 on
+    a playlist we may not edit or 404 on a deleted one (any 4xx but 429).
+    """
+    return (
+        isinstance(error, SpotifyException)
+        and 400 <= error.http_status < 500
+        and error.http_status != 429
+    )
+
+
+class BatchWriter:
+    """
+    Splits a write into API-sized chunks and sends them in order.
+    Each chunk is retried on its own when throttled, and a failed chunk does
+    not stop the chunks after it.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = MAX_ITEMS_PER_REQUEST,
+        max_attempts: int = 3,
+        backoff_seconds: float = 1.0,
+        on_chunk: Callable[[ChunkResult, int], None] | None = None,
+    ) -> None:
+        self.chunk_size = min(chunk_size, MAX_ITEMS_PER_REQUEST)
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.on_chunk = on_chunk
+
+    def chunk(self, items: list[Any]) -> list[list[Any]]:
+        """
+        Split `items` into consecutive chunks of at most `chunk_size`.
+        """
+        return [
+            items[i : i + self.chunk_size]
+            for i in range(0, len(items), self.chunk_size)
+        ]
+
+    def write(
+        self,
+        items: list[Any],
+        send: Callable[[list[Any]], dict[str, Any]],
+        label: str = "write",
+        on_chunk: Callable[[ChunkResult, int], None] | None = None,
+    ) -> BatchResult:
+        """
+        Send `items` through `send` one chunk at a time, preserving order.
+        `on_chunk` is called after each chunk, as the writer's own hook is.
+        """
+        chunks = self.chunk(items)
+        result = BatchResult()
+        for index, chunk_items in enumerate(chunks):
+            chunk = self._write_chunk(index, chunk_items, send)
+            result.chunks.append(chunk)
+            self._finish_chunk(chunk, len(chunks), label, on_chunk)
+        return result
+
+    async def write_async(
+        self,
+        items: list[Any],
+        send: Callable[[list[Any]], Awaitable[dict[str, Any]]],
+        label: str = "write",
+        on_chunk: Callable[[ChunkResult, int], None] | None = None,
+    ) -> BatchResult:
+        """
+        As `write`, for a coroutine `send`. Chunks still go one at a time so
+        the playlist keeps their order.
+        """
+        chunks = self.chunk(items)
+        result = BatchResult()
+        for index, chunk_items in enumerate(chunks):
+            chunk = await self._write_chunk_async(index, chunk_items, send)
+            result.chunks.append(chunk)
+            self._finish_chunk(chunk, len(chunks), label, on_chunk)
+        return result
+
+    def _finish_chunk(
+        self,
+        chunk: ChunkResult,
+        total: int,
+        label: str,
+        on_chunk: Callable[[ChunkResult, int], None] | None,
+    ) -> None:
+        if chunk.ok:
+            logger.info(
+                "%s: chunk %s/%s (%s items) done in %.3fs after %s attempt(s)",
+                label,
+                chunk.index + 1,
+                total,
+                len(chunk.items),
+                chunk.elapsed_seconds,
+                chunk.attempts,
+                extra=event("batch_chunk", sampled=True, label=label),
+            )
+        else:
+            logger.error(
+                f"{label}: chunk {chunk.index + 1}/{total} "
+                + f"({len(chunk.items)} items) failed: {chunk.error}"
+            )
+        for hook in (self.on_chunk, on_chunk):
+            if hook:
+                hook(chunk, total)
+
+    def _write_chunk(
+        self,
+        index: int,
+        items: list[Any],
+        send: Callable[[list[Any]], dict[str, Any]],
+    ) -> ChunkResult:
+        chunk = ChunkResult(index=index, items=items)
+        start = time.monotonic()
+        while True:
+            chunk.attempts += 1
+            try:
+                chunk.response = send(items)
+                chunk.error = None
+                break
+            except Exception as e:
+                chunk.error = e
+                if chunk.attempts >= self.max_attempts or not is_retryable(e):
+                    break
+                delay = self.backoff_seconds * 2 ** (chunk.attempts - 1)
+                logger.warning(
+                    f"Retrying chunk {index + 1} in {delay:.1f}s after error: {e}"
+                )
+                time.sleep(delay)
+        chunk.elapsed_seconds = time.monotonic() - start
+        return chunk
+
+    async def _write_chunk_async(
+        self,
+        index: int,
+        items: list[Any],
+        send: Callable[[list[Any]], Awaitable[dict[str, Any]]],
+    ) -> ChunkResult:
+        chunk = ChunkResult(index=index, items=items)
+        start = time.monotonic()
+        while True:
+            chunk.attempts += 1
+            try:
+                chunk.response = await send(items)
+                chunk.error = None
+                break
+            except Exception as e:
+                chunk.error = e
+                if chunk.attempts >= self.max_attempts or not is_retryable(e):
+                    break
+                delay = self.backoff_seconds * 2 ** (chunk.attempts - 1)
+                logger.warning(
+                    f"Retrying chunk {index + 1} in {delay:.1f}s after error: {e}"
+                )
+                await asyncio.sleep(delay)
+        chunk.elapsed_seconds = time.monotonic() - start
+        return chunk
@@ -1,4 +1,7 @@
+import contextlib
 import json
+import os
+import tempfile
 
 
 def load_json_file(file_path: str) -> dict:
@@ -8,3 +11,27 @@ def load_json_file(file_path: str) -> dict:
     with open(file_path) as file:
         data = json.load(file)
     return data
+
+
+def save_json_file(file_path: str, data: dict) -> None:
+    """
+    Atomically write `data` as JSON to `file_path`, creating parent directories.
+    Each write goes through its own temporary file, so concurrent writers
+    never clobber each other's half-written output.
+    """
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory or ".",
+        prefix=f"{os.path.basename(file_path)}.",
+        suffix=".tmp",
+    )
+    try:
+        with os.fdopen(fd, "w") as file:
+            json.dump(data, file, separators=(",", ":"))
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
@@ -0,0 +1,49 @@
+import threading
+
+from accessor.configLoader import load_json_file, save_json_file
+from util.logger import logger
+
+JsonValue = dict | list | str | int | float | bool | None
+
+
+class JsonStore:
+    """
+    Small JSON file of records keyed by string, read and atomically
+    rewritten under a lock. A missing or corrupt file reads as empty and a
+    failed write is logged, so bookkeeping problems never fail a run.
+    """
+
+    # Names the store in warnings
+    description = "state"
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict:
+        try:
+            return load_json_file(self.path)
+        except (OSError, ValueError):
+            return {}
+
+    def _store(self, data: dict) -> None:
+        try:
+            save_json_file(self.path, data)
+        except OSError as e:
+            logger.warning(f"Failed to persist {self.description}: {e}")
+
+    def _get(self, key: str) -> JsonValue:
+        with self._lock:
+            return self._load().get(key)
+
+    def _put(self, key: str, value: JsonValue) -> None:
+        with self._lock:
+            data = self._load()
+            data[key] = value
+            self._store(data)
+
+    def _pop(self, key: str) -> None:
+        with self._lock:
+            data = self._load()
+            if data.pop(key, None) is not None:
+                self._store(data)
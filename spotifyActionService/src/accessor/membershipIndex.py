@@ -0,0 +1,228 @@
+import base64
+import hashlib
+import math
+import os
+import threading
+from collections.abc import Callable, Iterable, Iterator
+
+from accessor.configLoader import load_json_file, save_json_file
+from util.env import get_state_dir
+from util.logger import logger
+
+DEFAULT_ERROR_RATE = 0.01
+MIN_CAPACITY = 1024
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings. Up to `capacity` items can be
+    added before the false-positive rate rises above `error_rate`.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        error_rate: float = DEFAULT_ERROR_RATE,
+        bits: bytes | None = None,
+    ) -> None:
+        self.capacity = max(capacity, MIN_CAPACITY)
+        self.error_rate = error_rate
+        self.size = math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        nbytes = (self.size + 7) // 8
+        if bits is not None and len(bits) != nbytes:
+            raise ValueError("Bloom filter bits do not match its size")
+        self.bits = bytearray(bits) if bits is not None else bytearray(nbytes)
+
+    def _positions(self, item: str) -> Iterator[int]:
+        # Double hashing: k positions from two halves of one digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: object) -> bool:
+        if not isinstance(item, str):
+            return False
+        return all(
+            self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item)
+        )
+
+
+class PlaylistMembership:
+    """
+    Track IDs held by one playlist at `snapshot_id`. Lookups ask the Bloom
+    filter first; the exact set is only read from disk the first time the
+    filter reports a possible match.
+    """
+
+    def __init__(
+        self,
+        snapshot_id: str,
+        bloom: BloomFilter,
+        load_ids: Callable[[], set[str]],
+    ) -> None:
+        self.snapshot_id = snapshot_id
+        self.bloom = bloom
+        self._load_ids = load_ids
+        self._ids: set[str] | None = None
+
+    def __contains__(self, track_id: object) -> bool:
+        if track_id not in self.bloom:
+            return False
+        if self._ids is None:
+            self._ids = self._load_ids()
+        return track_id in self._ids
+
+
+class MembershipIndex:
+    """
+    On-disk index of which track IDs each playlist holds, valid for one
+    snapshot_id. Per playlist, `<id>.json` keeps the snapshot, count and
+    Bloom filter and `<id>.ids` the exact IDs, one per line. Our own writes
+    are recorded as they succeed; any other change to the playlist moves its
+    snapshot and forces a rebuild from the API.
+    """
+
+    def __init__(
+        self,
+        index_dir: str | None = None,
+        error_rate: float = DEFAULT_ERROR_RATE,
+    ) -> None:
+        self.index_dir = index_dir or os.path.join(get_state_dir(), "membership")
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+
+    def _path(self, playlist_id: str, suffix: str) -> str:
+        return os.path.join(
+            self.index_dir, f"{playlist_id.replace(os.sep, '_')}{suffix}"
+        )
+
+    def _read_ids(self, playlist_id: str) -> set[str]:
+        with open(self._path(playlist_id, ".ids")) as file:
+            return {line.rstrip("\n") for line in file if line.strip()}
+
+    def _load(self, playlist_id: str) -> tuple[dict, BloomFilter] | None:
+        try:
+            meta = load_json_file(self._path(playlist_id, ".json"))
+            bloom = BloomFilter(
+                meta["capacity"],
+                self.error_rate,
+                bits=base64.b64decode(meta["bloom"]),
+            )
+        except (OSError, ValueError, KeyError):
+            return None
+        return meta, bloom
+
+    def _save(
+        self, playlist_id: str, snapshot_id: str, count: int, bloom: BloomFilter
+    ) -> None:
+        save_json_file(
+            self._path(playlist_id, ".json"),
+            {
+                "playlist_id": playlist_id,
+                "snapshot_id": snapshot_id,
+                "count": count,
+                "capacity": bloom.capacity,
+                "bloom": base64.b64encode(bytes(bloom.bits)).decode("ascii"),
+            },
+        )
+
+    def get(self, playlist_id: str, snapshot_id: str) -> PlaylistMembership | None:
+        """
+        Return the membership of `playlist_id` if it was indexed at
+        `snapshot_id`, otherwise None.
+        """
+        with self._lock:
+            loaded = self._load(playlist_id)
+        if loaded is None or loaded[0].get("snapshot_id") != snapshot_id:
+            logger.debug(f"Membership index miss for {playlist_id} ({snapshot_id})")
+            return None
+        return PlaylistMembership(
+            snapshot_id, loaded[1], lambda: self._read_ids(playlist_id)
+        )
+
+    def rebuild(
+        self, playlist_id: str, snapshot_id: str, track_ids: Iterable[str]
+    ) -> PlaylistMembership:
+        """
+        Replace the index of `playlist_id` with `track_ids` at `snapshot_id`.
+        """
+        ids = set(track_ids)
+        bloom = BloomFilter(2 * len(ids), self.error_rate)
+        for tid in ids:
+            bloom.add(tid)
+        with self._lock:
+            try:
+                # Retire the old snapshot before its exact IDs are replaced
+                self._remove(playlist_id)
+                self._write_ids(playlist_id, ids, mode="w")
+                self._save(playlist_id, snapshot_id, len(ids), bloom)
+            except OSError as e:
+                logger.warning(f"Failed to index playlist {playlist_id}: {e}")
+        logger.info(f"Indexed {len(ids)} tracks of playlist {playlist_id}")
+        return PlaylistMembership(snapshot_id, bloom, lambda: ids)
+
+    def record(
+        self,
+        playlist_id: str,
+        track_ids: list[str],
+        previous_snapshot_id: str,
+        snapshot_id: str | None,
+    ) -> None:
+        """
+        Add `track_ids`, just written by us, to the index and move it from
+        `previous_snapshot_id` to the `snapshot_id` the write returned. If the
+        index was not at `previous_snapshot_id` it is dropped instead.
+        """
+        with self._lock:
+            loaded = self._load(playlist_id)
+            if (
+                loaded is None
+                or not snapshot_id
+                or loaded[0].get("snapshot_id") != previous_snapshot_id
+            ):
+                self._remove(playlist_id)
+                return
+            meta, bloom = loaded
+            # Repeats in the exact store are harmless; they only overstate count
+            new_ids = list(dict.fromkeys(track_ids))
+            count = meta.get("count", 0) + len(new_ids)
+            try:
+                self._write_ids(playlist_id, new_ids, mode="a")
+                if count > bloom.capacity:
+                    # Past capacity the filter fills up; regrow it from the exact IDs
+                    bloom = BloomFilter(2 * count, self.error_rate)
+                    for tid in self._read_ids(playlist_id):
+                        bloom.add(tid)
+                else:
+                    for tid in new_ids:
+                        bloom.add(tid)
+                self._save(playlist_id, snapshot_id, count, bloom)
+            except OSError as e:
+                logger.warning(f"Failed to update index of {playlist_id}: {e}")
+                self._remove(playlist_id)
+
+    def invalidate(self, playlist_id: str) -> None:
+        """
+        Drop the index of `playlist_id`.
+        """
+        with self._lock:
+            self._remove(playlist_id)
+
+    def _write_ids(self, playlist_id: str, ids: Iterable[str], mode: str) -> None:
+        os.makedirs(self.index_dir, exist_ok=True)
+        with open(self._path(playlist_id, ".ids"), mode) as file:
+            file.writelines(f"{tid}\n" for tid in ids)
+
+    def _remove(self, playlist_id: str) -> None:
+        for suffix in (".json", ".ids"):
+            try:
+                os.remove(self._path(playlist_id, suffix))
+            except FileNotFoundError:
+                pass
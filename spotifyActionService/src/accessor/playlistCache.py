@@ -0,0 +1,146 @@
+import contextlib
+import os
+import sys
+import threading
+
+from accessor.configLoader import load_json_file, save_json_file
+from models.tracks import TrackPage, TrackRef
+from util.env import get_state_dir
+from util.logger import logger
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class PlaylistCache:
+    """
+    On-disk cache of playlist tracks keyed by playlist ID and snapshot_id,
+    stored as parallel `ids` / `added_at` arrays. Entries are evicted
+    least-recently-used first once the cache directory grows beyond
+    `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | None = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.cache_dir = cache_dir or os.path.join(get_state_dir(), "playlists")
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def _path(self, playlist_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{playlist_id.replace(os.sep, '_')}.json")
+
+    def get(self, playlist_id: str, snapshot_id: str) -> TrackPage | None:
+        """
+        Return the cached tracks for `playlist_id` if they were stored for
+        `snapshot_id`, otherwise None.
+        """
+        path = self._path(playlist_id)
+        with self._lock:
+            try:
+                entry = load_json_file(path)
+            except (OSError, ValueError):
+                entry = None
+            if (
+                not entry
+                or entry.get("snapshot_id") != snapshot_id
+                or "ids" not in entry
+            ):
+                self.misses += 1
+                logger.debug(f"Playlist cache miss for {playlist_id} ({snapshot_id})")
+                return None
+            # Touch the entry so eviction sees it as recently used; another
+            # process may have just evicted it, which must not fail the read
+            with contextlib.suppress(OSError):
+                os.utime(path)
+            self.hits += 1
+        logger.debug(f"Playlist cache hit for {playlist_id} ({snapshot_id})")
+        return TrackPage(
+            TrackRef(sys.intern(tid), added_at)
+            for tid, added_at in zip(entry["ids"], entry["added_at"], strict=True)
+        )
+
+    def contains(self, playlist_id: str, snapshot_id: str) -> bool:
+        """
+        Return True if `playlist_id` is cached at `snapshot_id`, without
+        counting a hit or miss or refreshing the entry.
+        """
+        with self._lock:
+            try:
+                entry = load_json_file(self._path(playlist_id))
+            except (OSError, ValueError):
+                return False
+        return entry.get("snapshot_id") == snapshot_id and "ids" in entry
+
+    def put(
+        self,
+        playlist_id: str,
+        snapshot_id: str,
+        items: list[TrackRef],
+    ) -> None:
+        """
+        Store `items` for `playlist_id` at `snapshot_id`, replacing any older entry.
+        """
+        entry = {
+            "playlist_id": playlist_id,
+            "snapshot_id": snapshot_id,
+            "ids": [item.id for item in items],
+            "added_at": [item.added_at for item in items],
+        }
+        with self._lock:
+            try:
+                save_json_file(self._path(playlist_id), entry)
+            except OSError as e:
+                logger.warning(f"Failed to cache playlist {playlist_id}: {e}")
+                return
+            self._evict()
+
+    def invalidate(self, playlist_id: str) -> None:
+        """
+        Drop any cached entry for `playlist_id`.
+        """
+        with self._lock:
+            try:
+                os.remove(self._path(playlist_id))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> dict[str, int]:
+        """
+        Return hit/miss/eviction counters for this cache instance.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(".json"):
+                    continue
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        # Never evict the newest entry, even if it alone exceeds the limit
+        for _, size, path in entries[:-1]:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            total -= size
+            self.evictions += 1
+            logger.debug(f"Evicted playlist cache entry {path}")
@@ -0,0 +1,105 @@
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable
+
+from accessor.configLoader import load_json_file, save_json_file
+from util.env import get_state_dir
+from util.logger import logger
+
+DEFAULT_TTL_SECONDS = 3600
+
+
+class PlaylistNameIndex:
+    """
+    Persisted map from lowercased playlist name to playlist IDs, in library
+    order, for one user. The index is considered stale once it is older
+    than `ttl_seconds` and must then be rebuilt from the API.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = path or os.path.join(get_state_dir(), "playlist_names.json")
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._user_id: str | None = None
+        self._built_at = 0.0
+        self._names: dict[str, list[str]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = load_json_file(self.path)
+        except (OSError, ValueError):
+            return
+        self._user_id = data.get("user_id")
+        self._built_at = data.get("built_at", 0.0)
+        self._names = data.get("names", {})
+
+    def _save(self) -> None:
+        try:
+            save_json_file(
+                self.path,
+                {
+                    "user_id": self._user_id,
+                    "built_at": self._built_at,
+                    "names": self._names,
+                },
+            )
+        except OSError as e:
+            logger.warning(f"Failed to persist playlist name index: {e}")
+
+    def is_fresh(self, user_id: str) -> bool:
+        """
+        Return True if the index belongs to `user_id` and is within its TTL.
+        """
+        with self._lock:
+            return (
+                self._user_id == user_id
+                and self.clock() - self._built_at < self.ttl_seconds
+            )
+
+    def lookup(self, playlist_name: str) -> str | None:
+        """
+        Return the first playlist ID with this name (case-insensitive), if any.
+        """
+        with self._lock:
+            ids = self._names.get(playlist_name.lower())
+            return ids[0] if ids else None
+
+    def rebuild(self, user_id: str, playlists: Iterable[dict]) -> None:
+        """
+        Replace the index with the given playlist objects (name and id).
+        """
+        names: dict[str, list[str]] = {}
+        for pl in playlists:
+            names.setdefault(pl.get("name", "").lower(), []).append(pl["id"])
+        with self._lock:
+            self._user_id = user_id
+            self._built_at = self.clock()
+            self._names = names
+            self._save()
+        logger.info(f"Indexed {len(names)} playlist names for user {user_id}")
+
+    def add(self, playlist_name: str, playlist_id: str) -> None:
+        """
+        Record a playlist created by us without invalidating the index.
+        """
+        with self._lock:
+            ids = self._names.setdefault(playlist_name.lower(), [])
+            if playlist_id not in ids:
+                ids.append(playlist_id)
+            self._save()
+
+    def invalidate(self) -> None:
+        """
+        Force a rebuild on the next lookup.
+        """
+        with self._lock:
+            self._built_at = 0.0
+            self._save()
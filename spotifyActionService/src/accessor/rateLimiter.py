@@ -0,0 +1,236 @@
+import asyncio
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from spotipy.exceptions import SpotifyException
+from util.env import get_env
+from util.logger import logger
+
+T = TypeVar("T")
+
+READ = "read"
+WRITE = "write"
+
+# Used when a 429 response carries no usable Retry-After header
+DEFAULT_RETRY_AFTER_SECONDS = 1.0
+
+
+class TokenBucket:
+    """
+    Token bucket that hands out reservations instead of blocking.
+    Callers may drive the balance negative; the returned wait is how long
+    they must sleep before their token becomes available.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.last = clock()
+
+    def reserve(self) -> float:
+        """
+        Take one token and return the seconds to wait before using it.
+        """
+        now = self.clock()
+        if now > self.last:
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.last) * self.rate
+            )
+            self.last = now
+        self.tokens -= 1
+        wait = self.last - now
+        if self.tokens < 0:
+            wait += -self.tokens / self.rate
+        return max(wait, 0.0)
+
+    def hold_until(self, when: float) -> None:
+        """
+        Empty the bucket and stop refilling until `when`.
+        """
+        self.tokens = min(self.tokens, 0.0)
+        self.last = max(self.last, when)
+
+
+class RateLimiter:
+    """
+    Process-wide throttle for Spotify Web API calls, with separate token
+    buckets for reads and writes. A 429 pauses every caller for the
+    response's Retry-After before the call is retried.
+    """
+
+    def __init__(
+        self,
+        read_rate: float = 10.0,
+        write_rate: float = 5.0,
+        burst_seconds: float = 2.0,
+        max_retries: int = 3,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.buckets = {
+            READ: TokenBucket(read_rate, max(1.0, read_rate * burst_seconds), clock),
+            WRITE: TokenBucket(write_rate, max(1.0, write_rate * burst_seconds), clock),
+        }
+        self.max_retries = max_retries
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._metrics = {
+            "calls": 0,
+            "throttled": 0,
+            "max_queue_depth": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+        }
+
+    def _reserve(self, kind: str) -> float:
+        with self._lock:
+            wait = self.buckets[kind].reserve()
+            self._metrics["calls"] += 1
+            if wait > 0:
+                self._waiting += 1
+                self._metrics["max_queue_depth"] = max(
+                    self._metrics["max_queue_depth"], self._waiting
+                )
+        return wait
+
+    def _waited(self, wait: float) -> None:
+        with self._lock:
+            self._waiting -= 1
+            self._metrics["total_wait_seconds"] += wait
+            self._metrics["max_wait_seconds"] = max(
+                self._metrics["max_wait_seconds"], wait
+            )
+
+    def acquire(self, kind: str = READ) -> float:
+        """
+        Block until a `kind` call may be made and return how long we waited.
+        """
+        wait = self._reserve(kind)
+        if wait <= 0:
+            return 0.0
+        try:
+            self.sleep(wait)
+        finally:
+            self._waited(wait)
+        return wait
+
+    async def acquire_async(self, kind: str = READ) -> float:
+        """
+        As `acquire`, but yields to the event loop while waiting. Tokens come
+        from the same buckets, so async and threaded callers share the budget.
+        """
+        wait = self._reserve(kind)
+        if wait <= 0:
+            return 0.0
+        try:
+            await asyncio.sleep(wait)
+        finally:
+            self._waited(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hold every bucket for `seconds`, e.g. after a 429 response.
+        """
+        with self._lock:
+            until = self.clock() + seconds
+            for bucket in self.buckets.values():
+                bucket.hold_until(until)
+            self._metrics["throttled"] += 1
+
+    def call(
+        self, kind: str, fn: Callable[..., T], *args: object, **kwargs: object
+    ) -> T:
+        """
+        Call `fn` once a `kind` token is available, retrying after 429s.
+        """
+        attempt = 0
+        while True:
+            self.acquire(kind)
+            try:
+                return fn(*args, **kwargs)
+            except SpotifyException as e:
+                attempt = self._back_off(kind, e, attempt)
+
+    async def call_async(
+        self,
+        kind: str,
+        fn: Callable[..., Awaitable[T]],
+        *args: object,
+        **kwargs: object,
+    ) -> T:
+        """
+        As `call`, for a coroutine function `fn`.
+        """
+        attempt = 0
+        while True:
+            await self.acquire_async(kind)
+            try:
+                return await fn(*args, **kwargs)
+            except SpotifyException as e:
+                attempt = self._back_off(kind, e, attempt)
+
+    def _back_off(self, kind: str, error: SpotifyException, attempt: int) -> int:
+        """
+        Pause all callers after a 429 and return the next attempt number;
+        re-raise anything else, or a 429 once retries are used up.
+        """
+        if error.http_status != 429 or attempt >= self.max_retries:
+            raise error
+        attempt += 1
+        retry_after = retry_after_seconds(error)
+        logger.warning(
+            f"Throttled by Spotify; pausing {kind} calls for {retry_after}s "
+            + f"(retry {attempt}/{self.max_retries})"
+        )
+        self.pause(retry_after)
+        return attempt
+
+    def metrics(self) -> dict[str, float]:
+        """
+        Return a snapshot of call, throttle, queue-depth and wait-time counters.
+        """
+        with self._lock:
+            return {**self._metrics, "queue_depth": self._waiting}
+
+
+def retry_after_seconds(error: SpotifyException) -> float:
+    """
+    Parse the Retry-After header of a 429 response.
+    """
+    headers = error.headers or {}
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER_SECONDS
+
+
+_shared_limiter: RateLimiter | None = None
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Return the process-wide RateLimiter, configured from the environment on
+    first use.
+    """
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter(
+                read_rate=float(get_env("SPOTIFY_READ_RATE", "10")),
+                write_rate=float(get_env("SPOTIFY_WRITE_RATE", "5")),
+            )
+        return _shared_limiter
@@ -0,0 +1,149 @@
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from accessor.batchWriter import BatchResult, ChunkResult
+from accessor.spotifyAccessor import SpotifyAccessor
+from models.tracks import TrackPage, TrackRef, move_items
+from util.logger import logger
+
+
+class RunScopedAccessor:
+    """
+    Wraps a SpotifyAccessor for the length of one batch of actions. Tracks
+    and metadata of the `shared` playlists are fetched once and served from
+    memory afterwards; our own writes to them are applied to the in-memory
+    copy so later actions see them without a refetch. Every other call goes
+    straight to the wrapped accessor.
+    """
+
+    def __init__(self, accessor: SpotifyAccessor, shared: set[str]) -> None:
+        self.accessor = accessor
+        self.shared = shared
+        self._tracks: dict[str, TrackPage] = {}
+        self._metadata: dict[str, dict[str, Any]] = {}
+
+    def __getattr__(self, name: str) -> object:
+        return getattr(self.accessor, name)
+
+    def fetch_playlist_tracks(self, playlist_id: str) -> list[TrackRef]:
+        if playlist_id not in self.shared:
+            return self.accessor.fetch_playlist_tracks(playlist_id)
+        if playlist_id not in self._tracks:
+            self._tracks[playlist_id] = TrackPage(
+                self.accessor.fetch_playlist_tracks(playlist_id)
+            )
+        else:
+            logger.info("Reusing tracks of playlist %s fetched this run", playlist_id)
+        return self._tracks[playlist_id]
+
+    def iter_playlist_tracks(self, playlist_id: str) -> Iterator[list[TrackRef]]:
+        if playlist_id not in self.shared:
+            yield from self.accessor.iter_playlist_tracks(playlist_id)
+            return
+        yield self.fetch_playlist_tracks(playlist_id)
+
+    def get_playlist_metadata(self, playlist_id: str) -> dict[str, Any]:
+        if playlist_id not in self.shared:
+            return self.accessor.get_playlist_metadata(playlist_id)
+        if playlist_id not in self._metadata:
+            self._metadata[playlist_id] = self.accessor.get_playlist_metadata(
+                playlist_id
+            )
+        return self._metadata[playlist_id]
+
+    def remember(
+        self, playlist_id: str, metadata: dict[str, Any], tracks: list[TrackRef]
+    ) -> None:
+        """
+        Replace the shared copy of `playlist_id` with `metadata` and `tracks`
+        read together straight from the wrapped accessor.
+        """
+        if playlist_id in self.shared:
+            self._metadata[playlist_id] = metadata
+            self._tracks[playlist_id] = TrackPage(tracks)
+
+    def add_tracks_to_playlist(
+        self,
+        playlist_id: str,
+        track_ids: list[str],
+        position: int | None = None,
+        on_chunk: Callable[[ChunkResult, int], None] | None = None,
+    ) -> BatchResult:
+        with self._writing(playlist_id):
+            result = self.accessor.add_tracks_to_playlist(
+                playlist_id,
+                track_ids,
+                position=position,
+                **({} if on_chunk is None else {"on_chunk": on_chunk}),
+            )
+        added = [TrackRef(tid, time.time()) for tid in track_ids]
+
+        def insert(tracks: TrackPage) -> None:
+            at = len(tracks) if position is None else position
+            tracks[at:at] = added
+
+        self._update(playlist_id, insert)
+        return result
+
+    def remove_track_occurrences(
+        self,
+        playlist_id: str,
+        occurrences: list[tuple[str, int]],
+        snapshot_id: str | None = None,
+    ) -> BatchResult:
+        with self._writing(playlist_id):
+            result = self.accessor.remove_track_occurrences(
+                playlist_id, occurrences, snapshot_id=snapshot_id
+            )
+
+        def remove(tracks: TrackPage) -> None:
+            for _, position in occurrences:
+                del tracks[position]
+
+        self._update(playlist_id, remove)
+        return result
+
+    def reorder_playlist_items(
+        self,
+        playlist_id: str,
+        range_start: int,
+        insert_before: int,
+        range_length: int = 1,
+    ) -> dict[str, Any]:
+        with self._writing(playlist_id):
+            response = self.accessor.reorder_playlist_items(
+                playlist_id, range_start, insert_before, range_length
+            )
+
+        def move(tracks: TrackPage) -> None:
+            move_items(tracks, range_start, insert_before, range_length)
+
+        self._update(playlist_id, move)
+        return response
+
+    @contextmanager
+    def _writing(self, playlist_id: str) -> Iterator[None]:
+        """
+        Forget the shared copy of `playlist_id` if a write to it fails, since
+        part of the write may have landed.
+        """
+        try:
+            yield
+        except Exception:
+            self._tracks.pop(playlist_id, None)
+            self._metadata.pop(playlist_id, None)
+            raise
+
+    def _update(self, playlist_id: str, apply: Callable[[TrackPage], None]) -> None:
+        """
+        Apply a successful write to the in-memory copy of `playlist_id`.
+        """
+        # The write moved the playlist to a new snapshot
+        self._metadata.pop(playlist_id, None)
+        tracks = self._tracks.get(playlist_id)
+        if tracks is None:
+            return
+        apply(tracks)
+        tracks.recheck_order()
@@ -0,0 +1,41 @@
+import os
+from dataclasses import asdict, dataclass
+
+from accessor.jsonStore import JsonStore
+from util.env import get_state_dir
+
+
+@dataclass(frozen=True)
+class RunRecord:
+    """When an action last started and its next run is due (epoch seconds)."""
+
+    last_run: float
+    next_due: float
+
+
+class RunStore(JsonStore):
+    """
+    Persists the latest RunRecord per action key in a small JSON file, so a
+    restarted scheduler knows which actions are due and which it missed.
+    """
+
+    description = "run times"
+
+    def __init__(self, path: str | None = None) -> None:
+        super().__init__(path or os.path.join(get_state_dir(), "runs.json"))
+
+    def get(self, key: str) -> RunRecord | None:
+        """
+        Return the stored record for `key`, or None if it never ran.
+        """
+        raw = self._get(key)
+        return RunRecord(**raw) if raw else None
+
+    def record(self, key: str, started: float, interval: float) -> RunRecord:
+        """
+        Store that `key` started at `started` and is next due one `interval`
+        later.
+        """
+        record = RunRecord(last_run=started, next_due=started + interval)
+        self._put(key, asdict(record))
+        return record
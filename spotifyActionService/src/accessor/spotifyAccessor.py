@@ -1,8 +1,53 @@
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import UTC, datetime, timedelta
-from typing import Any
+from itertools import islice
+from typing import Any, TypeVar
 
+from accessor.batchWriter import BatchResult, BatchWriter, ChunkResult
+from accessor.playlistCache import PlaylistCache
+from accessor.playlistIndex import PlaylistNameIndex
+from accessor.rateLimiter import READ, WRITE, RateLimiter
+from accessor.watermarkStore import Watermark
+from models.tracks import TrackRef, parse_added_at, to_track_refs
 from spotipy import Spotify
-from util.logger import logger
+from util.logger import event, logger, truncate
+
+T = TypeVar("T")
+
+# Maximum page sizes accepted by the Web API for each endpoint
+PLAYLIST_PAGE_SIZE = 100
+SAVED_TRACKS_PAGE_SIZE = 50
+
+
+def collect_saved_tracks(
+    items: list[TrackRef],
+    count: int,
+    cutoff: float | None,
+    max_items: float,
+    stop_at: Watermark | None = None,
+) -> tuple[list[TrackRef], bool]:
+    """
+    Take liked songs from one page (newest first) until `max_items` have been
+    collected overall (`count` already were), or one is at or before the
+    `cutoff` timestamp or the `stop_at` watermark. Returns the items taken and
+    whether the walk has reached its end.
+    """
+    collected: list[TrackRef] = []
+    reached_end = False
+    stop_time = parse_added_at(stop_at.added_at).timestamp() if stop_at else None
+    for item in items:
+        if count + len(collected) >= max_items:
+            break
+        if cutoff is not None and item.added_at <= cutoff:
+            reached_end = True
+            break
+        if stop_at and (item.added_at < stop_time or item.id == stop_at.track_id):
+            reached_end = True
+            break
+        collected.append(item)
+    return collected, reached_end
 
 
 class SpotifyAccessor:
@@ -15,8 +60,18 @@ class SpotifyAccessor:
         self,
         client: Spotify,
         user_id: str | None = None,
+        cache: PlaylistCache | None = None,
+        page_workers: int = 1,
+        writer: BatchWriter | None = None,
+        rate_limiter: RateLimiter | None = None,
+        name_index: PlaylistNameIndex | None = None,
     ) -> None:
         self.client = client
+        self.rate_limiter = rate_limiter
+        self.name_index = name_index
+        self.cache = cache
+        self.page_workers = page_workers
+        self.writer = writer or BatchWriter()
         # If user_id not provided, fetch from the API
         if user_id:
             self.user_id = user_id
@@ -24,9 +79,19 @@ class SpotifyAccessor:
         else:
             self.user_id = self.get_current_user_id()
 
+    def _call(
+        self, kind: str, fn: Callable[..., T], *args: object, **kwargs: object
+    ) -> T:
+        """
+        Invoke a client method, throttled by the rate limiter when configured.
+        """
+        if self.rate_limiter is None:
+            return fn(*args, **kwargs)
+        return self.rate_limiter.call(kind, fn, *args, **kwargs)
+
     def get_current_user_id(self) -> str:
         try:
-            me = self.client.current_user()
+            me = self._call(READ, self.client.current_user)
             self.user_id = me.get("id")
             logger.info(f"Fetched current user ID: {self.user_id}")
         except Exception as e:
@@ -34,99 +99,356 @@ class SpotifyAccessor:
             raise
         return self.user_id
 
-    def fetch_playlist_tracks(self, playlist_id: str) -> list[dict[str, Any]]:
+    def fetch_playlist_tracks(self, playlist_id: str) -> list[TrackRef]:
         """
-        Fetch all items from a Spotify playlist.
-        Handles pagination automatically.
+        Fetch all tracks from a Spotify playlist.
+        Handles pagination automatically. When a cache is configured, the
+        playlist's snapshot_id is checked first and unchanged playlists are
+        served from the cache without paging.
         """
-        tracks: list[dict[str, Any]] = []
-        page = 0
-        resp = self.client.playlist_items(
-            playlist_id,
-            fields="items(added_at,track(id)),next",
-        )
-        logger.info(f"Fetched playlist items page {page} for {playlist_id}: {resp}")
-        tracks.extend(resp.get("items", []))
+        return [
+            item for page in self.iter_playlist_tracks(playlist_id) for item in page
+        ]
+
+    def iter_playlist_tracks(self, playlist_id: str) -> Iterator[list[TrackRef]]:
+        """
+        Yield the tracks of a Spotify playlist one page at a time, in order.
+        Only the current page is held in memory unless a cache is configured,
+        in which case the items are kept to store once the last page arrives.
+        """
+        snapshot_id = None
+        if self.cache is not None:
+            snapshot_id = self.get_playlist_metadata(playlist_id).get("snapshot_id")
+            cached = self.cache.get(playlist_id, snapshot_id) if snapshot_id else None
+            if cached is not None:
+                logger.info(
+                    f"Using {len(cached)} cached tracks for playlist {playlist_id} "
+                    + f"(snapshot {snapshot_id})"
+                )
+                yield cached
+                return
 
-        while resp.get("next"):
-            page += 1
-            resp = self.client.next(resp)
-            logger.info(f"Fetched playlist items page {page} for {playlist_id}: {resp}")
-            tracks.extend(resp.get("items", []))
+        tracks: list[TrackRef] | None = [] if snapshot_id else None
+        count = 0
+        for page, resp in enumerate(self._playlist_pages(playlist_id)):
+            items = to_track_refs(resp.get("items", []))
+            logger.info(
+                "Fetched playlist items page %s for %s: %s",
+                page,
+                playlist_id,
+                truncate(resp),
+                extra=event(
+                    "playlist_page",
+                    sampled=True,
+                    playlist_id=playlist_id,
+                    page=page,
+                    items=len(items),
+                ),
+            )
+            count += len(items)
+            if tracks is not None:
+                tracks.extend(items)
+            yield items
 
-        logger.info(f"Fetched {len(tracks)} tracks from playlist {playlist_id}")
-        return tracks
+        logger.info(
+            "Fetched %s tracks from playlist %s",
+            count,
+            playlist_id,
+            extra=event("playlist_fetched", playlist_id=playlist_id, items=count),
+        )
+        if tracks is not None:
+            # Stored under the snapshot read *before* paging: if the playlist
+            # changed mid-fetch the next run sees a new snapshot and refetches.
+            self.cache.put(playlist_id, snapshot_id, tracks)
 
     def current_user_saved_tracks(
         self,
         time_in_seconds: int | None = None,
-        max_items: int = 500,
-    ) -> list[dict[str, Any]]:
+        max_items: int | None = 500,
+        stop_at: Watermark | None = None,
+    ) -> list[TrackRef]:
         """
         Fetch all liked songs for the current user.
         Handles pagination automatically with optional time-window and size limits.
         """
-        tracks: list[dict[str, Any]] = []
-        page = 0
+        return [
+            item
+            for page in self.iter_saved_tracks(time_in_seconds, max_items, stop_at)
+            for item in page
+        ]
+
+    def iter_saved_tracks(
+        self,
+        time_in_seconds: int | None = None,
+        max_items: int | None = 500,
+        stop_at: Watermark | None = None,
+    ) -> Iterator[list[TrackRef]]:
+        """
+        Yield the current user's liked songs one page at a time, newest first.
+        Stops at the time-window cutoff, after `max_items` items (None for no
+        limit), or on reaching the `stop_at` watermark, whichever comes first.
+        """
+        count = 0
         cutoff = None
         if time_in_seconds and time_in_seconds > 0:
-            cutoff = datetime.now(UTC) - timedelta(seconds=time_in_seconds)
-        resp = self.client.current_user_saved_tracks(limit=50)
-        logger.info(f"Fetched liked songs page {page}: {resp}")
-        collected, reached_cutoff = self._collect_saved_tracks(
-            resp.get("items", []), tracks, cutoff, max_items
+            cutoff = (
+                datetime.now(UTC) - timedelta(seconds=time_in_seconds)
+            ).timestamp()
+        limit = max_items if max_items is not None else float("inf")
+        # A cutoff or watermark usually ends the walk within the first page, so
+        # only fan out over offsets when the whole range up to `limit` is wanted
+        bounded = cutoff is not None or stop_at is not None
+        pages = self._saved_track_pages(limit, concurrent=not bounded)
+        try:
+            for page, resp in enumerate(pages):
+                logger.info(
+                    "Fetched liked songs page %s: %s",
+                    page,
+                    truncate(resp),
+                    extra=event("liked_page", sampled=True, page=page),
+                )
+                collected, reached_end = collect_saved_tracks(
+                    to_track_refs(resp.get("items", [])), count, cutoff, limit, stop_at
+                )
+                count += len(collected)
+                if collected:
+                    yield collected
+                if count >= limit or reached_end:
+                    break
+        finally:
+            # Cancels any pages still in flight when we stop early
+            pages.close()
+
+        logger.info(
+            "Fetched %s liked songs", count, extra=event("liked_fetched", items=count)
+        )
+
+    def saved_tracks_total(self) -> int:
+        """
+        Return how many liked songs the current user has.
+        """
+        resp = self._call(READ, self.client.current_user_saved_tracks, limit=1)
+        return resp.get("total") or 0
+
+    def user_playlists_total(self) -> int:
+        """
+        Return how many playlists are in the current user's library.
+        """
+        resp = self._call(READ, self.client.current_user_playlists, limit=1)
+        return resp.get("total") or 0
+
+    def _playlist_pages(self, playlist_id: str) -> Iterator[dict[str, Any]]:
+        """
+        Yield raw playlist item pages in order, fetching them concurrently
+        when `page_workers` > 1.
+        """
+        if self.page_workers <= 1:
+            resp = self._call(
+                READ,
+                self.client.playlist_items,
+                playlist_id,
+                fields="items(added_at,track(id)),next",
+            )
+            yield resp
+            while resp.get("next"):
+                resp = self._call(READ, self.client.next, resp)
+                yield resp
+            return
+
+        def fetch_page(offset: int) -> dict[str, Any]:
+            return self._call(
+                READ,
+                self.client.playlist_items,
+                playlist_id,
+                fields="items(added_at,track(id)),next,total",
+                limit=PLAYLIST_PAGE_SIZE,
+                offset=offset,
+            )
+
+        first = fetch_page(0)
+        yield first
+        yield from self._fetch_pages_concurrently(
+            fetch_page, first.get("total") or 0, PLAYLIST_PAGE_SIZE
+        )
+
+    def _saved_track_pages(
+        self, max_items: float, concurrent: bool = True
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Yield raw liked-song pages newest first, fetching up to `max_items`
+        concurrently when `page_workers` > 1 and `concurrent` is set.
+        """
+        resp = self._call(
+            READ, self.client.current_user_saved_tracks, limit=SAVED_TRACKS_PAGE_SIZE
         )
-        tracks.extend(collected)
-
-        while resp.get("next"):
-            if len(tracks) >= max_items or reached_cutoff:
-                break
-            page += 1
-            resp = self.client.next(resp)
-            logger.info(f"Fetched liked songs page {page}: {resp}")
-            collected, reached_cutoff = self._collect_saved_tracks(
-                resp.get("items", []), tracks, cutoff, max_items
+        yield resp
+        if self.page_workers <= 1 or not concurrent:
+            while resp.get("next"):
+                resp = self._call(READ, self.client.next, resp)
+                yield resp
+            return
+
+        def fetch_page(offset: int) -> dict[str, Any]:
+            return self._call(
+                READ,
+                self.client.current_user_saved_tracks,
+                limit=SAVED_TRACKS_PAGE_SIZE,
+                offset=offset,
             )
-            tracks.extend(collected)
 
-        logger.info(f"Fetched {len(tracks)} liked songs")
-        return tracks
+        total = int(min(resp.get("total") or 0, max_items))
+        yield from self._fetch_pages_concurrently(
+            fetch_page, total, SAVED_TRACKS_PAGE_SIZE
+        )
 
-    def _collect_saved_tracks(
+    def _fetch_pages_concurrently(
         self,
-        items: list[dict[str, Any]],
-        tracks: list[dict[str, Any]],
-        cutoff: datetime | None,
-        max_items: int,
-    ) -> tuple[list[dict[str, Any]], bool]:
-        collected: list[dict[str, Any]] = []
-        reached_cutoff = False
-        for item in items:
-            if len(tracks) + len(collected) >= max_items:
-                break
-            if cutoff:
-                added_at = datetime.fromisoformat(
-                    item["added_at"].replace("Z", "+00:00")
-                )
-                if added_at <= cutoff:
-                    reached_cutoff = True
-                    break
-            collected.append(item)
-        return collected, reached_cutoff
+        fetch_page: Callable[[int], dict[str, Any]],
+        total: int,
+        page_size: int,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Fetch every page after the first by offset, keeping at most
+        `page_workers` requests in flight, and yield them in offset order.
+        """
+        offsets = iter(range(page_size, total, page_size))
+        with ThreadPoolExecutor(max_workers=self.page_workers) as pool:
+            pending: deque[Future] = deque(
+                pool.submit(fetch_page, offset)
+                for offset in islice(offsets, self.page_workers)
+            )
+            try:
+                while pending:
+                    resp = pending.popleft().result()
+                    offset = next(offsets, None)
+                    if offset is not None:
+                        pending.append(pool.submit(fetch_page, offset))
+                    yield resp
+            finally:
+                for future in pending:
+                    future.cancel()
 
-    def add_tracks_to_playlist(self, playlist_id: str, track_ids: list[str]) -> None:
+    def add_tracks_to_playlist(
+        self,
+        playlist_id: str,
+        track_ids: list[str],
+        position: int | None = None,
+        on_chunk: Callable[[ChunkResult, int], None] | None = None,
+    ) -> BatchResult:
         """
-        Add a batch of track IDs to a Spotify playlist.
+        Add track IDs to a Spotify playlist in order, 100 per request.
+        Tracks are appended unless `position` is given, in which case they are
+        inserted there as one contiguous run. `on_chunk` is told about each
+        request as it completes.
+        Every chunk is attempted; if any chunk fails the first error is raised
+        once the remaining chunks have been written.
         """
         logger.info(
-            f"Adding {len(track_ids)} tracks to playlist {playlist_id}: "
-            + f"{track_ids}"
+            "Adding %s tracks to playlist %s: %s",
+            len(track_ids),
+            playlist_id,
+            truncate(track_ids),
+            extra=event("add_tracks", playlist_id=playlist_id, items=len(track_ids)),
+        )
+        next_position = position
+
+        def send(chunk: list[str]) -> dict[str, Any]:
+            nonlocal next_position
+            response = self._call(
+                WRITE,
+                self.client.playlist_add_items,
+                playlist_id,
+                chunk,
+                **({} if next_position is None else {"position": next_position}),
+            )
+            if next_position is not None:
+                next_position += len(chunk)
+            logger.info(
+                "Added tracks to playlist %s: %s",
+                playlist_id,
+                truncate(response),
+                extra=event("tracks_added", playlist_id=playlist_id),
+            )
+            return response
+
+        result = self.writer.write(
+            track_ids, send, label=f"Add to playlist {playlist_id}", on_chunk=on_chunk
         )
+        if not result.ok:
+            error = result.failed[0].error
+            logger.error(f"Failed to add tracks to playlist {playlist_id}: {error}")
+            raise error
+        return result
+
+    def remove_track_occurrences(
+        self,
+        playlist_id: str,
+        occurrences: list[tuple[str, int]],
+        snapshot_id: str | None = None,
+    ) -> BatchResult:
+        """
+        Remove specific (track ID, position) occurrences from a playlist, 100
+        per request. Occurrences must be ordered by descending position so
+        that each request leaves the positions of later ones unchanged.
+        With `snapshot_id`, positions are read against that snapshot (each
+        later request against the snapshot the previous one returned), so an
+        edit made meanwhile fails the request instead of removing the wrong
+        items.
+        """
+        items = [{"uri": tid, "positions": [pos]} for tid, pos in occurrences]
+        pinned = {"snapshot_id": snapshot_id} if snapshot_id else {}
+
+        def send(chunk: list[dict[str, Any]]) -> dict[str, Any]:
+            response = self._call(
+                WRITE,
+                self.client.playlist_remove_specific_occurrences_of_items,
+                playlist_id,
+                chunk,
+                **pinned,
+            )
+            if pinned and response.get("snapshot_id"):
+                pinned["snapshot_id"] = response["snapshot_id"]
+            logger.info(
+                "Removed tracks from playlist %s: %s",
+                playlist_id,
+                truncate(response),
+                extra=event("tracks_removed", playlist_id=playlist_id),
+            )
+            return response
+
+        result = self.writer.write(
+            items, send, label=f"Remove from playlist {playlist_id}"
+        )
+        if not result.ok:
+            error = result.failed[0].error
+            logger.error(
+                f"Failed to remove tracks from playlist {playlist_id}: {error}"
+            )
+            raise error
+        return result
+
+    def reorder_playlist_items(
+        self,
+        playlist_id: str,
+        range_start: int,
+        insert_before: int,
+        range_length: int = 1,
+    ) -> dict[str, Any]:
+        """
+        Move `range_length` tracks starting at `range_start` so they sit
+        before `insert_before` (both counted before the move), in one request.
+        """
         try:
-            response = self.client.playlist_add_items(playlist_id, track_ids)
-            logger.info(f"Added tracks to playlist {playlist_id}: {response}")
+            return self._call(
+                WRITE,
+                self.client.playlist_reorder_items,
+                playlist_id,
+                range_start=range_start,
+                insert_before=insert_before,
+                range_length=range_length,
+            )
         except Exception as e:
-            logger.error(f"Failed to add tracks to playlist {playlist_id}: {e}")
+            logger.error(f"Failed to reorder playlist {playlist_id}: {e}")
             raise
 
     def get_playlist_metadata(self, playlist_id: str) -> dict[str, Any]:
@@ -134,11 +456,15 @@ class SpotifyAccessor:
         Fetch basic metadata for a Spotify playlist.
         """
         try:
-            metadata = self.client.playlist(
+            metadata = self._call(
+                READ,
+                self.client.playlist,
                 playlist_id,
-                fields="id,name,description,snapshot_id",
+                fields="id,name,description,snapshot_id,tracks(total)",
+            )
+            logger.info(
+                "Fetched metadata for playlist %s: %s", playlist_id, truncate(metadata)
             )
-            logger.info(f"Fetched metadata for playlist {playlist_id}: {metadata}")
             return metadata
         except Exception as e:
             logger.error(f"Failed to fetch metadata for playlist {playlist_id}: {e}")
@@ -148,21 +474,38 @@ class SpotifyAccessor:
         """
         Return the first playlist ID matching `name` in the current user's library,
         or None if not found.
+        When a name index is configured the lookup is answered from it, and the
+        library is only paged when the index is missing or past its TTL.
         """
-        results = self.client.current_user_playlists(limit=50)
-        while True:
-            for pl in results.get("items", []):
-                if pl.get("name", "").lower() == playlist_name.lower():
-                    logger.info(f"Found playlist '{playlist_name}' → {pl['id']}")
-                    return pl["id"]
-            if results.get("next"):
-                results = self.client.next(results)
+        if self.name_index is not None:
+            if not self.name_index.is_fresh(self.user_id):
+                logger.info("Playlist name index is stale, rebuilding")
+                self.name_index.rebuild(self.user_id, self._user_playlists())
+            playlist_id = self.name_index.lookup(playlist_name)
+            if playlist_id:
+                logger.info(f"Found playlist '{playlist_name}' → {playlist_id}")
             else:
-                break
+                logger.info(f"No playlist found with name '{playlist_name}'")
+            return playlist_id
+
+        for pl in self._user_playlists():
+            if pl.get("name", "").lower() == playlist_name.lower():
+                logger.info(f"Found playlist '{playlist_name}' → {pl['id']}")
+                return pl["id"]
 
         logger.info(f"No playlist found with name '{playlist_name}'")
         return None
 
+    def _user_playlists(self) -> Iterator[dict[str, Any]]:
+        """
+        Yield the current user's playlists in library order.
+        """
+        results = self._call(READ, self.client.current_user_playlists, limit=50)
+        yield from results.get("items", [])
+        while results.get("next"):
+            results = self._call(READ, self.client.next, results)
+            yield from results.get("items", [])
+
     def create_playlist_with_name(
         self, playlist_name: str, public: bool = False
     ) -> str:
@@ -171,13 +514,17 @@ class SpotifyAccessor:
                 f"Creating new playlist '{playlist_name}' "
                 + f"(public={public}) for user {self.user_id}"
             )
-            new = self.client.user_playlist_create(
+            new = self._call(
+                WRITE,
+                self.client.user_playlist_create,
                 user=self.user_id,
                 name=playlist_name,
                 public=public,
             )
             new_id = new.get("id")
             logger.info(f"Created playlist '{playlist_name}' → {new_id}")
+            if self.name_index is not None:
+                self.name_index.add(playlist_name, new_id)
             return new_id
         except Exception as e:
             logger.error(f"Failed to create playlist '{playlist_name}': {e}")
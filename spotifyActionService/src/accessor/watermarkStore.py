@@ -0,0 +1,39 @@
+import os
+from dataclasses import asdict, dataclass
+
+from accessor.jsonStore import JsonStore
+from util.env import get_state_dir
+from util.logger import logger
+
+
+@dataclass(frozen=True)
+class Watermark:
+    """Newest liked track an action has processed."""
+
+    added_at: str
+    track_id: str
+
+
+class WatermarkStore(JsonStore):
+    """
+    Persists one Watermark per action key in a small JSON file.
+    """
+
+    description = "watermarks"
+
+    def __init__(self, path: str | None = None) -> None:
+        super().__init__(path or os.path.join(get_state_dir(), "watermarks.json"))
+
+    def get(self, key: str) -> Watermark | None:
+        """
+        Return the stored watermark for `key`, or None if there is none.
+        """
+        raw = self._get(key)
+        return Watermark(**raw) if raw else None
+
+    def set(self, key: str, watermark: Watermark) -> None:
+        """
+        Store `watermark` for `key`, replacing the previous one.
+        """
+        self._put(key, asdict(watermark))
+        logger.info(f"Advanced watermark for {key} to {watermark}")
@@ -0,0 +1,82 @@
+import os
+from dataclasses import asdict, dataclass, field
+
+from accessor.jsonStore import JsonStore
+from accessor.watermarkStore import Watermark
+from util.env import get_state_dir
+
+
+@dataclass
+class JournalEntry:
+    """
+    A planned add of `pending` tracks to the action's target, and what to do
+    once all of them have landed: advance a watermark and/or remove tracks
+    from another playlist.
+    """
+
+    pending: list[str]
+    watermark: Watermark | None = None
+    removal_playlist_id: str | None = None
+    removals: list[tuple[str, int]] = field(default_factory=list)
+    removal_snapshot_id: str | None = None
+
+    @classmethod
+    def from_dict(cls, raw: dict) -> "JournalEntry":
+        watermark = raw.get("watermark")
+        return cls(
+            pending=raw.get("pending", []),
+            watermark=Watermark(**watermark) if watermark else None,
+            removal_playlist_id=raw.get("removal_playlist_id"),
+            removals=[(tid, pos) for tid, pos in raw.get("removals", [])],
+            removal_snapshot_id=raw.get("removal_snapshot_id"),
+        )
+
+
+class WriteJournal(JsonStore):
+    """
+    Write-ahead journal of batched playlist writes, one entry per action
+    key. An entry is stored before the first request and trimmed as each
+    chunk commits, so whatever is left after a crash is exactly the part
+    still to be written. Entries do not record where they go: the key names
+    the target, so an entry is only resumed into the playlist it was
+    planned for.
+    """
+
+    description = "write journal"
+
+    def __init__(self, path: str | None = None) -> None:
+        super().__init__(path or os.path.join(get_state_dir(), "journal.json"))
+
+    def get(self, key: str) -> JournalEntry | None:
+        """
+        Return the unfinished write of action `key`, if there is one.
+        """
+        raw = self._get(key)
+        return JournalEntry.from_dict(raw) if raw else None
+
+    def begin(self, key: str, entry: JournalEntry) -> None:
+        """
+        Record `entry` as the planned write of action `key`.
+        """
+        self._put(key, asdict(entry))
+
+    def commit(self, key: str, written: list[str]) -> None:
+        """
+        Drop `written` tracks, just confirmed by the API, from the pending
+        list of action `key`.
+        """
+        done = set(written)
+        with self._lock:
+            data = self._load()
+            if key not in data:
+                return
+            data[key]["pending"] = [
+                tid for tid in data[key]["pending"] if tid not in done
+            ]
+            self._store(data)
+
+    def finish(self, key: str) -> None:
+        """
+        Forget the write of action `key` once everything it planned is done.
+        """
+        self._pop(key)
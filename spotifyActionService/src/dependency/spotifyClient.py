@@ -1,37 +1,140 @@
 import os
+import threading
 
+import requests
 from spotipy import Spotify
+from spotipy.cache_handler import CacheFileHandler, CacheHandler
 from spotipy.exceptions import SpotifyOauthError
 from spotipy.oauth2 import SpotifyOAuth
-from util.env import get_environ
+from urllib3.util.retry import Retry
+from util.env import get_env, get_environ
+
+# Status codes spotipy retries itself
+SERVER_ERROR_STATUSES = (500, 502, 503, 504)
+
+
+class ProcessTokenCache(CacheHandler):
+    """
+    Keeps the token in memory for the life of the process and writes it
+    through to the on-disk `.cache` file, so every request does not re-read
+    the file and other processes still pick up refreshed tokens.
+    """
+
+    def __init__(self, backing: CacheHandler | None = None) -> None:
+        self.backing = backing or CacheFileHandler()
+        self._token_info: dict | None = None
+        self._lock = threading.Lock()
+
+    def get_cached_token(self) -> dict | None:
+        with self._lock:
+            if self._token_info is None:
+                self._token_info = self.backing.get_cached_token()
+            return self._token_info
+
+    def save_token_to_cache(self, token_info: dict) -> None:
+        with self._lock:
+            self._token_info = token_info
+            self.backing.save_token_to_cache(token_info)
+
+
+class SpotifyClientProvider:
+    """
+    Builds one authenticated :class:`Spotify` client and hands the same
+    instance to every caller, so the keep-alive connection pool and the
+    access token are reused across commands in a process.
+    """
+
+    def __init__(self, pool_size: int = 10) -> None:
+        self.pool_size = pool_size
+        self._client: Spotify | None = None
+        self._lock = threading.Lock()
+
+    def get_client(self) -> Spotify:
+        """Return the shared client, building it on first use."""
+        with self._lock:
+            if self._client is None:
+                self._client = self._build_client()
+            return self._client
+
+    def reset(self) -> None:
+        """Drop the shared client so the next call builds a fresh one."""
+        with self._lock:
+            self._client = None
+
+    def _build_session(self) -> requests.Session:
+        """
+        Pooled session retrying failed connections and, for reads only, 5xx
+        responses. Writes are not idempotent, so a 5xx on one is returned
+        as is. 429s are never retried or slept on here, even with a
+        Retry-After header: they reach accessor.rateLimiter, which pauses
+        every caller.
+        """
+        session = requests.Session()
+        retry = Retry(
+            total=3,
+            connect=None,
+            read=False,
+            allowed_methods=frozenset(["GET"]),
+            status=3,
+            backoff_factor=0.3,
+            status_forcelist=SERVER_ERROR_STATUSES,
+            respect_retry_after_header=False,
+        )
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size,
+            max_retries=retry,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _build_client(self) -> Spotify:
+        required = [
+            "SPOTIFY_CLIENT_ID",
+            "SPOTIFY_CLIENT_SECRET",
+            "SPOTIFY_REDIRECT_URI",
+        ]
+        missing = [name for name in required if not get_environ(name)]
+        if missing:
+            raise OSError(f"Missing environment variables: {', '.join(missing)}")
+
+        scope = (
+            "playlist-read-private playlist-modify-public playlist-modify-private "
+            "user-library-read"
+        )
+        auth_manager = SpotifyOAuth(
+            client_id=get_environ("SPOTIFY_CLIENT_ID"),
+            client_secret=get_environ("SPOTIFY_CLIENT_SECRET"),
+            redirect_uri=get_environ("SPOTIFY_REDIRECT_URI"),
+            scope=scope,
+            cache_handler=ProcessTokenCache(),
+        )
+
+        refresh_token = get_environ("SPOTIPY_REFRESH_TOKEN")
+        if refresh_token and not os.path.exists(".cache"):
+            try:
+                auth_manager.refresh_access_token(refresh_token)
+            except SpotifyOauthError as exc:
+                raise SpotifyOauthError(f"failed to refresh token: {exc}") from exc
+
+        return Spotify(
+            auth_manager=auth_manager,
+            requests_session=self._build_session(),
+            status_forcelist=SERVER_ERROR_STATUSES,
+        )
+
+
+_provider = SpotifyClientProvider(
+    pool_size=int(get_env("SPOTIFY_HTTP_POOL_SIZE", "10"))
+)
+
+
+def get_client_provider() -> SpotifyClientProvider:
+    """Return the process-wide client provider."""
+    return _provider
 
 
 def get_client() -> Spotify:
-    """Return an authenticated :class:`Spotify` client."""
-
-    required = ["SPOTIFY_CLIENT_ID", "SPOTIFY_CLIENT_SECRET", "SPOTIFY_REDIRECT_URI"]
-    missing = [name for name in required if not get_environ(name)]
-    if missing:
-        raise OSError(f"Missing environment variables: {', '.join(missing)}")
-
-    scope = (
-        "playlist-read-private playlist-modify-public playlist-modify-private "
-        "user-library-read"
-    )
-    auth_manager = SpotifyOAuth(
-        client_id=get_environ("SPOTIFY_CLIENT_ID"),
-        client_secret=get_environ("SPOTIFY_CLIENT_SECRET"),
-        redirect_uri=get_environ("SPOTIFY_REDIRECT_URI"),
-        scope=scope,
-    )
-
-    refresh_token = get_environ("SPOTIPY_REFRESH_TOKEN")
-    if refresh_token and not os.path.exists(".cache"):
-        try:
-            auth_manager.refresh_access_token(refresh_token)
-        except SpotifyOauthError as exc:
-            raise SpotifyOauthError(
-                f"failed to refresh token: {exc}"
-            ) from exc
-
-    return Spotify(auth_manager=auth_manager)
+    """Return the process-wide authenticated :class:`Spotify` client."""
+    return _provider.get_client()
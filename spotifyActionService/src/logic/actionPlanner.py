@@ -0,0 +1,257 @@
+import math
+from collections import Counter
+from dataclasses import dataclass, field
+
+from accessor.batchWriter import MAX_ITEMS_PER_REQUEST
+from accessor.spotifyAccessor import (
+    PLAYLIST_PAGE_SIZE,
+    SAVED_TRACKS_PAGE_SIZE,
+    SpotifyAccessor,
+)
+from models.actions import (
+    Action,
+    ActionType,
+    ArchiveAction,
+    SyncAction,
+    SyncLikedAction,
+)
+from util.logger import logger
+
+# Page size used when listing the user's playlists
+USER_PLAYLISTS_PAGE_SIZE = 50
+# Rows in the scheduled load timeline
+TIMELINE_ROWS = 12
+# Width of the longest bar in the load timeline
+TIMELINE_BAR_WIDTH = 30
+
+
+@dataclass
+class ActionPlan:
+    """
+    What one action would read and write, and how many API requests that
+    takes. Writes are an upper bound: the real diff is only known once the
+    playlists are read.
+    """
+
+    action: Action
+    reads: list[str] = field(default_factory=list)
+    writes: list[str] = field(default_factory=list)
+    read_requests: int = 0
+    write_requests: int = 0
+
+    def read(self, description: str, requests: int) -> None:
+        self.reads.append(f"{description} ({requests} req)")
+        self.read_requests += requests
+
+    def write(self, description: str, requests: int) -> None:
+        self.writes.append(f"{description} (up to {requests} req)")
+        self.write_requests += requests
+
+
+def pages(items: int, page_size: int) -> int:
+    """Number of requests needed to page through `items` (at least one)."""
+    return max(1, math.ceil(items / page_size))
+
+
+class ActionPlanner:
+    """
+    Estimates the API cost of actions from playlist totals without
+    changing anything. Each planned playlist costs one metadata request.
+    """
+
+    def __init__(self, accessor: SpotifyAccessor) -> None:
+        self.accessor = accessor
+
+    def plan_all(self, actions: list[Action]) -> list[ActionPlan]:
+        return [self.plan(action) for action in actions]
+
+    def plan(self, action: Action) -> ActionPlan:
+        plan = ActionPlan(action)
+        match action.type:
+            case ActionType.SYNC:
+                self._plan_sync(action, plan)
+            case ActionType.SYNC_LIKED:
+                self._plan_sync_liked(action, plan)
+            case ActionType.ARCHIVE:
+                self._plan_archive(action, plan)
+            case _:
+                logger.warning(f"Cannot plan action type: {action.type}")
+        return plan
+
+    def _playlist_read(self, plan: ActionPlan, playlist_id: str, role: str) -> int:
+        """
+        Add the reads for one playlist to `plan` and return its track count.
+        """
+        metadata = self.accessor.get_playlist_metadata(playlist_id)
+        total = metadata.get("tracks", {}).get("total", 0)
+        label = f"{role} {metadata.get('name', playlist_id)!r}: {total} tracks"
+        cache = self.accessor.cache
+        snapshot_id = metadata.get("snapshot_id")
+        if (
+            cache is not None
+            and snapshot_id
+            and cache.contains(playlist_id, snapshot_id)
+        ):
+            plan.read(f"{label}, unchanged since cached", 1)
+        else:
+            plan.read(label, 1 + pages(total, PLAYLIST_PAGE_SIZE))
+        return total
+
+    def _plan_sync(self, action: SyncAction, plan: ActionPlan) -> None:
+        source = self._playlist_read(plan, action.source_playlist_id, "source")
+        target = self._playlist_read(plan, action.target_playlist_id, "target")
+        if action.mirror:
+            plan.write(
+                f"remove up to {target} tracks",
+                math.ceil(target / MAX_ITEMS_PER_REQUEST),
+            )
+            plan.write(
+                f"reorder up to {min(source, target)} tracks", min(source, target)
+            )
+        if source:
+            plan.write(
+                f"add up to {source} tracks",
+                math.ceil(source / MAX_ITEMS_PER_REQUEST),
+            )
+
+    def _plan_sync_liked(self, action: SyncLikedAction, plan: ActionPlan) -> None:
+        if action.avoid_duplicates:
+            self._playlist_read(plan, action.target_playlist_id, "target")
+        liked = min(self.accessor.saved_tracks_total(), action.max_tracks)
+        plan.read(
+            f"liked songs: up to {liked} tracks",
+            1 + pages(liked, SAVED_TRACKS_PAGE_SIZE),
+        )
+        if liked:
+            plan.write(
+                f"add up to {liked} tracks",
+                math.ceil(liked / MAX_ITEMS_PER_REQUEST),
+            )
+
+    def _plan_archive(self, action: ArchiveAction, plan: ActionPlan) -> None:
+        source = self._playlist_read(plan, action.source_playlist_id, "source")
+        if action.target_playlist_id is None:
+            self._plan_archive_lookup(plan)
+        if action.avoid_duplicates:
+            plan.read("archive playlist tracks, at least", 1)
+        if source:
+            batches = math.ceil(source / MAX_ITEMS_PER_REQUEST)
+            plan.write(f"archive up to {source} tracks", batches)
+            if action.moves_tracks():
+                plan.write(f"remove up to {source} tracks from the source", batches)
+
+    def _plan_archive_lookup(self, plan: ActionPlan) -> None:
+        index = self.accessor.name_index
+        if index is not None and index.is_fresh(self.accessor.user_id):
+            plan.read("archive playlist lookup, from name index", 0)
+        else:
+            library = self.accessor.user_playlists_total()
+            plan.read(
+                f"archive playlist lookup over {library} playlists",
+                1 + pages(library, USER_PLAYLISTS_PAGE_SIZE),
+            )
+        plan.write("create archive playlist if missing", 1)
+
+
+def request_timeline(
+    plans: list[ActionPlan], first_runs: list[float], horizon: float, bucket: int
+) -> Counter[int]:
+    """
+    Requests issued in each `bucket`-second slot of the first `horizon`
+    seconds of a schedule, keyed by slot number. Each action is taken to
+    send all its requests when it fires, `first_runs[i]` seconds in and then
+    once per interval; slot n covers the seconds after n * bucket.
+    """
+    timeline: Counter[int] = Counter()
+    for plan, first_run in zip(plans, first_runs, strict=True):
+        interval = max(plan.action.timeBetweenActInSeconds, 1)
+        requests = plan.read_requests + plan.write_requests
+        at = first_run
+        while at <= horizon:
+            timeline[max(math.ceil(round(at, 6) / bucket) - 1, 0)] += requests
+            at += interval
+    return timeline
+
+
+def format_timeline(plans: list[ActionPlan], first_runs: list[float]) -> list[str]:
+    """
+    Render the requests sent over the longest interval, in up to
+    TIMELINE_ROWS rows, and the busiest second compared with every action
+    starting at once.
+    """
+    horizon = max(max(p.action.timeBetweenActInSeconds, 1) for p in plans)
+    bucket = math.ceil(horizon / TIMELINE_ROWS)
+    timeline = request_timeline(plans, first_runs, horizon, bucket)
+    widest = max(timeline.values(), default=0) or 1
+    lines = [f"Requests over the first {horizon}s, as actions fire:"]
+    for row in range(math.ceil(horizon / bucket)):
+        count = timeline[row]
+        bar = "#" * math.ceil(count / widest * TIMELINE_BAR_WIDTH)
+        start = f"{row * bucket}s"
+        lines.append(f"   {start:>8} {count:>6} {bar}".rstrip())
+
+    busiest = max(request_timeline(plans, first_runs, horizon, 1).values())
+    aligned = [max(p.action.timeBetweenActInSeconds, 1) for p in plans]
+    together = max(request_timeline(plans, aligned, horizon, 1).values())
+    lines.append(
+        f"Busiest second: {busiest} requests "
+        + f"({together} if every action started together)"
+    )
+    return lines
+
+
+def format_plan(
+    plans: list[ActionPlan],
+    read_rate: float,
+    write_rate: float,
+    scheduled: bool,
+    first_runs: list[float] | None = None,
+) -> str:
+    """
+    Render plans as a report. For scheduled runs the request rate each
+    action adds is its cost divided by its interval, and the totals are
+    compared with the rate limiter's budget; with `first_runs`, the delay
+    before each action first fires, the load is also shown over time.
+    """
+    lines: list[str] = []
+    for number, plan in enumerate(plans, start=1):
+        action = plan.action
+        header = f"{number}. {action.type} [{action.key()}]"
+        if scheduled:
+            header += f" every {action.timeBetweenActInSeconds}s"
+        lines.append(header)
+        lines.extend(f"   read  {entry}" for entry in plan.reads)
+        lines.extend(f"   write {entry}" for entry in plan.writes)
+        lines.append(
+            f"   total: {plan.read_requests} reads, "
+            + f"up to {plan.write_requests} writes"
+        )
+
+    reads = sum(plan.read_requests for plan in plans)
+    writes = sum(plan.write_requests for plan in plans)
+    lines.append("")
+    if scheduled:
+        read_per_second = sum(
+            p.read_requests / max(p.action.timeBetweenActInSeconds, 1) for p in plans
+        )
+        write_per_second = sum(
+            p.write_requests / max(p.action.timeBetweenActInSeconds, 1) for p in plans
+        )
+        lines.append(
+            f"Projected load: {read_per_second:.2f} reads/s of {read_rate:g} allowed, "
+            + f"up to {write_per_second:.2f} writes/s of {write_rate:g} allowed"
+        )
+        if read_per_second > read_rate or write_per_second > write_rate:
+            lines.append(
+                "WARNING: these actions exceed the request budget and will be "
+                + "throttled; lengthen timeBetweenActInSeconds."
+            )
+        if first_runs is not None and plans:
+            lines.extend(format_timeline(plans, first_runs))
+    else:
+        seconds = max(reads / read_rate, writes / write_rate)
+        lines.append(
+            f"Total: {reads} reads, up to {writes} writes "
+            + f"(at least {seconds:.1f}s at the configured rate limits)"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,222 @@
+from collections.abc import Callable, Container
+
+from accessor.archiveManifest import ArchiveManifest, Shard
+from accessor.batchWriter import ChunkResult
+from accessor.membershipIndex import MembershipIndex
+from accessor.spotifyAccessor import SpotifyAccessor
+from logic.mapper.spotifyMapper import map_to_id_set, map_to_ids
+from util.logger import logger
+
+# Spotify refuses to grow a playlist past this many items
+SHARD_LIMIT = 10_000
+
+
+def shard_name(base_name: str, number: int) -> str:
+    """Name of the `number`-th shard: '<base>', '<base>-2', '<base>-3', ..."""
+    return base_name if number == 1 else f"{base_name}-{number}"
+
+
+class AnyOf:
+    """Membership test across several containers."""
+
+    def __init__(self, parts: list[Container[str]]) -> None:
+        self.parts = parts
+
+    def __contains__(self, item: object) -> bool:
+        return any(item in part for part in self.parts)
+
+
+class ArchiveShards:
+    """
+    The playlists an archive action writes to. Tracks go to the last
+    (active) shard; once it holds `limit` items it is sealed and the next
+    shard is started. Sealed shards no longer change, so duplicate checks
+    against them use the membership index alone and only the active shard
+    is read in full.
+    With `limit` None there is a single shard that never rolls over.
+    """
+
+    def __init__(
+        self,
+        accessor: SpotifyAccessor,
+        shards: list[Shard],
+        membership: MembershipIndex | None = None,
+        limit: int | None = None,
+        base_name: str | None = None,
+        manifest: ArchiveManifest | None = None,
+        source_playlist_id: str | None = None,
+    ) -> None:
+        self.accessor = accessor
+        self.shards = shards
+        self.membership = membership
+        self.limit = limit
+        self.base_name = base_name
+        self.manifest = manifest
+        self.source_playlist_id = source_playlist_id
+        self._activate()
+
+    @classmethod
+    def single(
+        cls,
+        accessor: SpotifyAccessor,
+        playlist_id: str,
+        membership: MembershipIndex | None = None,
+    ) -> "ArchiveShards":
+        """A fixed archive playlist chosen by the user."""
+        return cls(accessor, [Shard(playlist_id, playlist_id)], membership)
+
+    @classmethod
+    def for_source(
+        cls,
+        accessor: SpotifyAccessor,
+        source_playlist_id: str,
+        base_name: str,
+        manifest: ArchiveManifest | None = None,
+        membership: MembershipIndex | None = None,
+        limit: int = SHARD_LIMIT,
+    ) -> "ArchiveShards":
+        """
+        The '<base_name>' shards of a source playlist, as recorded in the
+        manifest or, failing that, found by name in the user's library.
+        """
+        shards = manifest.get(source_playlist_id) if manifest else []
+        if not shards:
+            shards = cls._discover(accessor, base_name)
+        archive = cls(
+            accessor,
+            shards,
+            membership,
+            limit=limit,
+            base_name=base_name,
+            manifest=manifest,
+            source_playlist_id=source_playlist_id,
+        )
+        archive._save()
+        return archive
+
+    @staticmethod
+    def _discover(accessor: SpotifyAccessor, base_name: str) -> list[Shard]:
+        logger.info("Using archive playlist name: '%s'", base_name)
+        shards = [
+            Shard(accessor.get_or_create_playlist_with_name(base_name), base_name)
+        ]
+        while True:
+            name = shard_name(base_name, len(shards) + 1)
+            playlist_id = accessor.get_playlist_id_by_name(name)
+            if playlist_id is None:
+                return shards
+            shards.append(Shard(playlist_id, name))
+
+    @property
+    def active(self) -> Shard:
+        return self.shards[-1]
+
+    def _activate(self) -> None:
+        """Read the active shard's snapshot and size."""
+        metadata = self.accessor.get_playlist_metadata(self.active.playlist_id)
+        self.snapshot_id: str | None = metadata.get("snapshot_id")
+        self.total: int = metadata.get("tracks", {}).get("total", 0)
+
+    def _save(self) -> None:
+        if self.manifest is not None and self.source_playlist_id:
+            self.manifest.set(self.source_playlist_id, self.shards)
+
+    def members(self) -> Container[str]:
+        """
+        Return the track IDs already archived, across all shards.
+        """
+        sealed = [self._sealed_members(shard) for shard in self.shards[:-1]]
+        return AnyOf([*sealed, self._active_members()])
+
+    def _active_members(self) -> Container[str]:
+        playlist_id = self.active.playlist_id
+        if self.membership is not None and self.snapshot_id:
+            members = self.membership.get(playlist_id, self.snapshot_id)
+            if members is not None:
+                logger.info("Checking duplicates against the archive's local index")
+                return members
+        logger.info("Avoiding duplicates: fetching existing archive playlist items...")
+        items = self.accessor.fetch_playlist_tracks(playlist_id)
+        if self.membership is not None and self.snapshot_id:
+            return self.membership.rebuild(
+                playlist_id, self.snapshot_id, map_to_ids(items)
+            )
+        return map_to_id_set(items)
+
+    def _sealed_members(self, shard: Shard) -> Container[str]:
+        if self.membership is not None and shard.sealed_snapshot_id:
+            members = self.membership.get(shard.playlist_id, shard.sealed_snapshot_id)
+            if members is not None:
+                return members
+        # Only happens when local state was lost or the shard predates it
+        logger.warning("No index for sealed archive shard '%s'; reading it", shard.name)
+        snapshot_id = self.accessor.get_playlist_metadata(shard.playlist_id).get(
+            "snapshot_id"
+        )
+        items = self.accessor.fetch_playlist_tracks(shard.playlist_id)
+        if self.membership is None or not snapshot_id:
+            return map_to_id_set(items)
+        shard.sealed_snapshot_id = snapshot_id
+        self._save()
+        return self.membership.rebuild(
+            shard.playlist_id, snapshot_id, map_to_ids(items)
+        )
+
+    def add(
+        self,
+        track_ids: list[str],
+        on_chunk: Callable[[ChunkResult, int], None] | None = None,
+    ) -> None:
+        """
+        Append `track_ids` to the active shard, rolling over into new shards
+        as each one fills up. `on_chunk` is told about each request.
+        """
+        remaining = track_ids
+        while remaining:
+            room = len(remaining) if self.limit is None else self.limit - self.total
+            if room <= 0:
+                remaining = self._roll_over(remaining)
+                continue
+            batch, remaining = remaining[:room], remaining[room:]
+            shard = self.active
+            result = self.accessor.add_tracks_to_playlist(
+                shard.playlist_id,
+                batch,
+                **({} if on_chunk is None else {"on_chunk": on_chunk}),
+            )
+            if self.membership is not None and self.snapshot_id:
+                self.membership.record(
+                    shard.playlist_id, batch, self.snapshot_id, result.snapshot_id
+                )
+            self.snapshot_id = result.snapshot_id
+            self.total += len(batch)
+            logger.info(
+                "Archived %s tracks to playlist '%s' (ID: %s)",
+                len(batch),
+                shard.name,
+                shard.playlist_id,
+            )
+
+    def _roll_over(self, remaining: list[str]) -> list[str]:
+        """
+        Seal the full active shard and start the next one. Returns the
+        tracks of `remaining` that the new shard does not already hold.
+        """
+        self.active.sealed_snapshot_id = self.snapshot_id
+        name = shard_name(self.base_name, len(self.shards) + 1)
+        logger.info(
+            "Archive shard '%s' is full, continuing in '%s'", self.active.name, name
+        )
+        self.shards.append(
+            Shard(self.accessor.get_or_create_playlist_with_name(name), name)
+        )
+        self._save()
+        self._activate()
+        if not self.total:
+            if self.membership is not None and self.snapshot_id:
+                # Start the new shard's index so later writes can extend it
+                self.membership.rebuild(self.active.playlist_id, self.snapshot_id, [])
+            return remaining
+        # The new shard already existed; don't archive what it holds twice
+        members = self._active_members()
+        return [tid for tid in remaining if tid not in members]
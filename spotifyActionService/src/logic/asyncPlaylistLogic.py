@@ -0,0 +1,214 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime, timedelta
+from functools import partial
+
+from accessor.asyncSpotifyAccessor import AsyncSpotifyAccessor
+from accessor.batchWriter import ChunkResult, is_permanent
+from accessor.watermarkStore import Watermark, WatermarkStore
+from accessor.writeJournal import JournalEntry, WriteJournal
+from logic.mapper.spotifyMapper import map_to_id_set
+from logic.playlistLogic import collect_new_ids
+from models.actions import Action, ArchiveAction, SyncAction, SyncLikedAction
+from models.tracks import TrackRef, added_after, format_added_at
+from util.logger import logger, truncate
+
+AddTracks = Callable[..., Awaitable[object]]
+
+
+class AsyncPlaylistService:
+    """
+    Asyncio version of PlaylistService for the additive actions: syncs
+    without `mirror`, liked-song syncs and archives into a given target.
+    The playlists an action compares are read at the same time, and writes
+    go through the same watermark store and write journal as the blocking
+    service, so the two can take turns running an action. Their file I/O
+    runs in worker threads so it never stalls the event loop, except for
+    the journal commit after each chunk, which must land in order.
+    """
+
+    def __init__(
+        self,
+        accessor: AsyncSpotifyAccessor,
+        watermarks: WatermarkStore | None = None,
+        journal: WriteJournal | None = None,
+    ) -> None:
+        self.accessor = accessor
+        self.watermarks = watermarks
+        self.journal = journal
+
+    @staticmethod
+    def supports(action: Action) -> bool:
+        """
+        Return True if `action` can run here. Mirroring and moving archives
+        remove and reorder tracks, which only the blocking service does.
+        """
+        if isinstance(action, SyncAction):
+            return not action.mirror
+        if isinstance(action, ArchiveAction):
+            return bool(action.target_playlist_id)
+        return isinstance(action, SyncLikedAction)
+
+    async def sync_playlists(self, action: SyncAction) -> None:
+        """
+        Add the tracks of the source playlist that the target lacks.
+        """
+        add = partial(self.accessor.add_tracks_to_playlist, action.target_playlist_id)
+        if await self._resume_write(action.key(), add):
+            return
+
+        target_items, source_items = await asyncio.gather(
+            self.accessor.fetch_playlist_tracks(action.target_playlist_id),
+            self.accessor.fetch_playlist_tracks(action.source_playlist_id),
+        )
+        tracks_to_add = collect_new_ids([source_items], map_to_id_set(target_items))
+        logger.info("Tracks to add: %s", truncate(tracks_to_add))
+
+        if not tracks_to_add:
+            logger.info("No new tracks to add to target playlist.")
+            return
+
+        await self._write_journaled(action.key(), JournalEntry(tracks_to_add), add)
+        logger.info(
+            "Added %s tracks to target playlist: %s",
+            len(tracks_to_add),
+            action.target_playlist_id,
+        )
+
+    async def sync_liked_tracks(self, action: SyncLikedAction) -> None:
+        """
+        Add the current user's liked tracks that the target playlist lacks,
+        reading back to the stored watermark when there is one.
+        """
+        add = partial(self.accessor.add_tracks_to_playlist, action.target_playlist_id)
+        if await self._resume_write(action.key(), add):
+            return
+
+        watermark = (
+            await asyncio.to_thread(self.watermarks.get, action.key())
+            if self.watermarks
+            else None
+        )
+        if watermark:
+            liked = self.accessor.current_user_saved_tracks(
+                time_in_seconds=None, max_items=None, stop_at=watermark
+            )
+        else:
+            liked = self.accessor.current_user_saved_tracks(
+                time_in_seconds=action.timeBetweenActInSeconds,
+                max_items=action.max_tracks,
+            )
+        target_items, liked_items = await asyncio.gather(
+            self._fetch_if(action.avoid_duplicates, action.target_playlist_id), liked
+        )
+        tracks_to_add = collect_new_ids([liked_items], map_to_id_set(target_items))
+        logger.info("Tracks to add: %s", truncate(tracks_to_add))
+
+        if not tracks_to_add:
+            logger.info("No new liked tracks to add to target playlist.")
+
+        entry = JournalEntry(tracks_to_add)
+        if self.watermarks and liked_items:
+            entry.watermark = Watermark(
+                added_at=format_added_at(liked_items[0].added_at),
+                track_id=liked_items[0].id,
+            )
+        await self._write_journaled(action.key(), entry, add)
+        if tracks_to_add:
+            logger.info(
+                "Added %s liked tracks to target playlist: %s",
+                len(tracks_to_add),
+                action.target_playlist_id,
+            )
+
+    async def archive_playlists(self, action: ArchiveAction) -> None:
+        """
+        Copy the source playlist's tracks (those added within the time window
+        with `filter_by_time`) into the target playlist.
+        """
+        if not action.target_playlist_id:
+            raise ValueError("Moving archives run on the blocking PlaylistService")
+        add = partial(self.accessor.add_tracks_to_playlist, action.target_playlist_id)
+        if await self._resume_write(action.key(), add):
+            return
+
+        target_items, source_items = await asyncio.gather(
+            self._fetch_if(action.avoid_duplicates, action.target_playlist_id),
+            self.accessor.fetch_playlist_tracks(action.source_playlist_id),
+        )
+        if action.filter_by_time:
+            cutoff = datetime.now(UTC) - timedelta(
+                seconds=action.timeBetweenActInSeconds
+            )
+            source_items = added_after(source_items, cutoff.timestamp())
+        tracks_to_add = collect_new_ids([source_items], map_to_id_set(target_items))
+        logger.info("Tracks to archive: %s", truncate(tracks_to_add))
+
+        if not tracks_to_add:
+            logger.info("No new tracks to archive.")
+            return
+
+        await self._write_journaled(action.key(), JournalEntry(tracks_to_add), add)
+
+    async def _fetch_if(self, wanted: bool, playlist_id: str) -> list[TrackRef]:
+        if not wanted:
+            return []
+        return await self.accessor.fetch_playlist_tracks(playlist_id)
+
+    async def _resume_write(self, key: str, add: AddTracks) -> bool:
+        """
+        Finish the write action `key` left unfinished on a previous run, if
+        any. Returns True if there was one.
+        """
+        entry = await asyncio.to_thread(self.journal.get, key) if self.journal else None
+        if entry is None:
+            return False
+        logger.info(
+            "Resuming interrupted write for %s: %s tracks still to add",
+            key,
+            len(entry.pending),
+        )
+        await self._write_journaled(key, entry, add)
+        return True
+
+    async def _write_journaled(
+        self, key: str, entry: JournalEntry, add: AddTracks
+    ) -> None:
+        """
+        Add `entry.pending` through `add`, then advance the entry's watermark.
+        With a journal the entry is recorded first and trimmed as each chunk
+        lands, so a crash leaves exactly the rest; as in PlaylistService, an
+        empty entry is not journaled and a permanently failing one dropped.
+        """
+        if not entry.pending:
+            if entry.watermark and self.watermarks:
+                await asyncio.to_thread(self.watermarks.set, key, entry.watermark)
+            if self.journal is not None:
+                await asyncio.to_thread(self.journal.finish, key)
+            return
+        if self.journal is not None:
+            await asyncio.to_thread(self.journal.begin, key, entry)
+        try:
+            if self.journal is None:
+                await add(entry.pending)
+            else:
+                await add(entry.pending, on_chunk=partial(self._commit_chunk, key))
+        except Exception as e:
+            if self.journal is not None and is_permanent(e):
+                logger.warning(
+                    "Dropping the journaled write of %s, which cannot succeed: %s",
+                    key,
+                    e,
+                )
+                await asyncio.to_thread(self.journal.finish, key)
+            raise
+        try:
+            if entry.watermark and self.watermarks:
+                await asyncio.to_thread(self.watermarks.set, key, entry.watermark)
+        finally:
+            if self.journal is not None:
+                await asyncio.to_thread(self.journal.finish, key)
+
+    def _commit_chunk(self, key: str, chunk: ChunkResult, _total: int) -> None:
+        if chunk.ok:
+            self.journal.commit(key, chunk.items)
@@ -1,5 +1,17 @@
-def map_to_id_set(playlist_items: list) -> set:
+from collections.abc import Iterable
+
+from models.tracks import TrackRef
+
+
+def map_to_id_set(tracks: Iterable[TrackRef]) -> set[str]:
     """
-    Convert playlist items to a set of track IDs.
+    Convert tracks to a set of track IDs.
     """
-    return {item["track"]["id"] for item in playlist_items}
+    return {track.id for track in tracks}
+
+
+def map_to_ids(tracks: Iterable[TrackRef]) -> list[str]:
+    """
+    Convert tracks to a list of track IDs, preserving order.
+    """
+    return [track.id for track in tracks]
@@ -0,0 +1,215 @@
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from models.tracks import move_items
+
+
+@dataclass(frozen=True)
+class Removal:
+    """One occurrence of a track to drop, by its position in the target."""
+
+    track_id: str
+    position: int
+
+
+@dataclass(frozen=True)
+class Move:
+    """
+    A reorder of `range_length` consecutive items, in playlist_reorder_items
+    terms: both positions are counted before the items are lifted.
+    """
+
+    range_start: int
+    insert_before: int
+    range_length: int = 1
+
+    def apply(self, items: list) -> None:
+        """Perform the move on a local copy of the playlist."""
+        move_items(items, self.range_start, self.insert_before, self.range_length)
+
+
+@dataclass(frozen=True)
+class Insertion:
+    """A run of consecutive source tracks to insert at `position`."""
+
+    position: int
+    track_ids: list[str]
+
+
+@dataclass
+class PlaylistDiff:
+    """
+    Writes that turn a target track list into a copy of its source. Apply
+    them in field order: removals (highest position first), then moves, then
+    insertions (lowest position first).
+    """
+
+    removals: list[Removal] = field(default_factory=list)
+    moves: list[Move] = field(default_factory=list)
+    insertions: list[Insertion] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.removals or self.moves or self.insertions)
+
+    @property
+    def added(self) -> int:
+        return sum(len(ins.track_ids) for ins in self.insertions)
+
+
+def diff_playlists(source_ids: list[str], target_ids: list[str]) -> PlaylistDiff:
+    """
+    Compute the removals, moves and insertions that make `target_ids` equal
+    to `source_ids`, duplicates included.
+
+    The n-th occurrence of a track in the target is matched to its n-th
+    occurrence in the source; unmatched target occurrences are removed and
+    unmatched source occurrences inserted. Matched tracks on a longest
+    increasing subsequence of source positions stay put, so only the rest
+    are moved, neighbours that belong together in one request.
+    """
+    source_positions: dict[str, list[int]] = defaultdict(list)
+    for index, tid in enumerate(source_ids):
+        source_positions[tid].append(index)
+
+    diff = PlaylistDiff()
+    # Source index of each target track that is kept, in target order
+    kept: list[int] = []
+    matched: dict[str, int] = defaultdict(int)
+    for position, tid in enumerate(target_ids):
+        occurrence = matched[tid]
+        candidates = source_positions.get(tid, [])
+        if occurrence < len(candidates):
+            kept.append(candidates[occurrence])
+            matched[tid] = occurrence + 1
+        else:
+            diff.removals.append(Removal(tid, position))
+    diff.removals.reverse()
+
+    diff.moves = _moves_to_sort(kept)
+    diff.insertions = _insertions(source_ids, set(kept))
+    return diff
+
+
+def _longest_increasing(values: list[int]) -> set[int]:
+    """
+    Return one longest strictly increasing subsequence of `values` (which
+    are distinct) as a set of values.
+    """
+    tails: list[int] = []  # smallest tail value of an increasing run per length
+    tail_index: list[int] = []
+    previous: list[int] = [-1] * len(values)
+    for i, value in enumerate(values):
+        length = bisect_left(tails, value)
+        if length == len(tails):
+            tails.append(value)
+            tail_index.append(i)
+        else:
+            tails[length] = value
+            tail_index[length] = i
+        previous[i] = tail_index[length - 1] if length else -1
+
+    result: set[int] = set()
+    i = tail_index[-1] if tail_index else -1
+    while i >= 0:
+        result.add(values[i])
+        i = previous[i]
+    return result
+
+
+class _Counts:
+    """Fenwick tree counting the occupied slots up to an index."""
+
+    def __init__(self, size: int) -> None:
+        self.tree = [0] * (size + 1)
+
+    def add(self, index: int, delta: int) -> None:
+        index += 1
+        while index < len(self.tree):
+            self.tree[index] += delta
+            index += index & -index
+
+    def before(self, index: int) -> int:
+        """Number of occupied slots below `index`."""
+        total = 0
+        while index > 0:
+            total += self.tree[index]
+            index -= index & -index
+        return total
+
+
+def _moves_to_sort(kept: list[int]) -> list[Move]:
+    """
+    Return moves that sort `kept` (distinct values) ascending, leaving a
+    longest increasing subsequence in place. Values off it are placed in
+    ascending order, each directly after its predecessor in sorted order;
+    a run of such values that are also neighbours in the list goes in one
+    range move. Positions are relative to the list as it stands before each
+    move. O(n log n): positions are counted with a Fenwick tree over slots
+    in list order rather than by searching the list.
+    """
+    stay = _longest_increasing(kept)
+    ordered = sorted(kept)
+    # Slot of each item: (original index, 0) while unmoved; a moved item
+    # takes the slot just after its predecessor's, (index, depth + 1). Only
+    # one item ever lands after a given one, so slots never collide.
+    slot_of = {value: (index, 0) for index, value in enumerate(kept)}
+    landing: dict[int, tuple[int, int]] = {}
+    previous = (-1, 0)
+    for value in ordered:
+        if value not in stay:
+            landing[value] = (previous[0], previous[1] + 1)
+        previous = landing.get(value, slot_of[value])
+    slots = sorted([*slot_of.values(), *landing.values()])
+    rank = {slot: index for index, slot in enumerate(slots)}
+    counts = _Counts(len(slots))
+    for slot in slot_of.values():
+        counts.add(rank[slot], 1)
+
+    moves: list[Move] = []
+    i = 0
+    while i < len(ordered):
+        if ordered[i] in stay:
+            i += 1
+            continue
+        # Extend the run while the next value also moves and sits right after
+        j = i + 1
+        while (
+            j < len(ordered)
+            and ordered[j] not in stay
+            and counts.before(rank[slot_of[ordered[j]]])
+            == counts.before(rank[slot_of[ordered[j - 1]]]) + 1
+        ):
+            j += 1
+        run = ordered[i:j]
+        start = counts.before(rank[slot_of[run[0]]])
+        for value in run:
+            counts.add(rank[slot_of[value]], -1)
+        insert_at = counts.before(rank[landing[run[0]]])
+        for value in run:
+            slot_of[value] = landing[value]
+            counts.add(rank[slot_of[value]], 1)
+        # playlist_reorder_items counts insert_before before the run is lifted
+        insert_before = insert_at + len(run) if insert_at >= start else insert_at
+        moves.append(Move(start, insert_before, range_length=len(run)))
+        i = j
+    return moves
+
+
+def _insertions(source_ids: list[str], kept: set[int]) -> list[Insertion]:
+    """
+    Group the source positions missing from `kept` into runs. Once the kept
+    tracks are in source order, inserting each run at its source index, in
+    order, rebuilds the source exactly.
+    """
+    insertions: list[Insertion] = []
+    run_start = None
+    for index in range(len(source_ids) + 1):
+        missing = index < len(source_ids) and index not in kept
+        if missing and run_start is None:
+            run_start = index
+        elif not missing and run_start is not None:
+            insertions.append(Insertion(run_start, source_ids[run_start:index]))
+            run_start = None
+    return insertions
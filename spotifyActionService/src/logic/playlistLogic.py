@@ -1,9 +1,39 @@
+from collections.abc import Callable, Container, Iterable, Iterator
+from contextlib import contextmanager
 from datetime import UTC, datetime, timedelta
+from functools import partial
+from typing import Any
 
+from accessor.archiveManifest import ArchiveManifest
+from accessor.batchWriter import ChunkResult, is_permanent
+from accessor.membershipIndex import MembershipIndex
+from accessor.runScopedAccessor import RunScopedAccessor
 from accessor.spotifyAccessor import SpotifyAccessor
-from logic.mapper.spotifyMapper import map_to_id_set
+from accessor.watermarkStore import Watermark, WatermarkStore
+from accessor.writeJournal import JournalEntry, WriteJournal
+from logic.archiveShards import ArchiveShards
+from logic.mapper.spotifyMapper import map_to_id_set, map_to_ids
+from logic.playlistDiff import diff_playlists
 from models.actions import ArchiveAction, SyncAction, SyncLikedAction
-from util.logger import logger
+from models.tracks import TrackRef, added_after, format_added_at
+from util.logger import logger, truncate
+
+
+def collect_new_ids(
+    pages: Iterable[list[TrackRef]], existing_ids: Container[str]
+) -> list[str]:
+    """
+    Walk item pages as they arrive and return, in order, the track IDs not
+    in `existing_ids`. Repeated IDs are only returned once.
+    """
+    tracks_to_add: list[str] = []
+    queued: set[str] = set()
+    for page in pages:
+        for tid in map_to_ids(page):
+            if tid not in existing_ids and tid not in queued:
+                queued.add(tid)
+                tracks_to_add.append(tid)
+    return tracks_to_add
 
 
 class PlaylistService:
@@ -11,13 +41,40 @@ class PlaylistService:
     Provides methods to manage playlists using a SpotifyAccessor.
     """
 
-    def __init__(self, accessor: SpotifyAccessor) -> None:
+    def __init__(
+        self,
+        accessor: SpotifyAccessor,
+        watermarks: WatermarkStore | None = None,
+        membership: MembershipIndex | None = None,
+        archive_manifest: ArchiveManifest | None = None,
+        journal: WriteJournal | None = None,
+    ) -> None:
         self.accessor = accessor
+        self.watermarks = watermarks
+        self.membership = membership
+        self.archive_manifest = archive_manifest
+        self.journal = journal
 
-    def filter_items_after_time(self, items: list[str], time_in_seconds: int) -> list:
+    @contextmanager
+    def run_scope(self, shared_playlist_ids: set[str]) -> Iterator[None]:
+        """
+        Within the block, fetch each of `shared_playlist_ids` at most once and
+        keep our writes to them applied to the shared copy.
+        """
+        accessor = self.accessor
+        self.accessor = RunScopedAccessor(accessor, shared_playlist_ids)
+        try:
+            yield
+        finally:
+            self.accessor = accessor
+
+    def filter_items_after_time(
+        self, items: list[TrackRef], time_in_seconds: int
+    ) -> list[TrackRef]:
         """
         Filters items based on a time threshold.
-        Returns items that were added after the specified time.
+        Returns items that were added after the specified time. Pages already
+        in added_at order are cut with a binary search instead of a scan.
         """
         cutoff = datetime.now(UTC) - timedelta(seconds=time_in_seconds)
         logger.info(
@@ -26,147 +83,367 @@ class PlaylistService:
             time_in_seconds,
         )
 
-        filtered_items = [
-            item
-            for item in items
-            if datetime.fromisoformat(item["added_at"].replace("Z", "+00:00")) > cutoff
-        ]
-        logger.info("Filtered items: %s", filtered_items)
+        filtered_items = added_after(items, cutoff.timestamp())
+        logger.info(
+            "Kept %s of %s items: %s",
+            len(filtered_items),
+            len(items),
+            truncate(filtered_items),
+        )
         return filtered_items
 
     def sync_playlists(self, action: SyncAction) -> None:
         """
         Synchronize the source playlist with the target playlist.
         Only adds tracks that are in the source but not in the target.
+        The target is read first so source pages can be diffed as they stream in.
+        With `mirror` set, the target is instead made identical to the source.
         """
-        logger.info("Fetching source playlist items...")
-        source_items = self.accessor.fetch_playlist_tracks(action.source_playlist_id)
-        source_ids = map_to_id_set(source_items)
+        if action.mirror and self.mirror_playlist(action):
+            return
+        add = partial(self.accessor.add_tracks_to_playlist, action.target_playlist_id)
+        if self._resume_write(action.key(), add):
+            return
 
         logger.info("Fetching target playlist items...")
         target_items = self.accessor.fetch_playlist_tracks(action.target_playlist_id)
         target_ids = map_to_id_set(target_items)
+        logger.info("Found %s tracks in target playlist", len(target_ids))
 
-        logger.info(
-            "Found %s tracks in source playlist: %s", len(source_ids), source_ids
-        )
-        logger.info(
-            "Found %s tracks in target playlist: %s", len(target_ids), target_ids
+        logger.info("Streaming source playlist items...")
+        tracks_to_add = collect_new_ids(
+            self.accessor.iter_playlist_tracks(action.source_playlist_id), target_ids
         )
-
-        # Determine which source tracks aren't in the target
-        tracks_to_add = [tid for tid in source_ids if tid not in target_ids]
-        logger.info("Tracks to add: %s", tracks_to_add)
+        logger.info("Tracks to add: %s", truncate(tracks_to_add))
 
         if not tracks_to_add:
             logger.info("No new tracks to add to target playlist.")
             return
 
-        self.accessor.add_tracks_to_playlist(action.target_playlist_id, tracks_to_add)
+        self._write_journaled(action.key(), JournalEntry(tracks_to_add), add)
         logger.info(
             "Added %s tracks to target playlist: %s",
             len(tracks_to_add),
             action.target_playlist_id,
         )
 
-    def sync_liked_tracks(self, action: SyncLikedAction) -> None:
+    def mirror_playlist(self, action: SyncAction) -> bool:
         """
-        Synchronize the current user's liked tracks into a target playlist.
-        Only adds tracks that are liked but not already in the target playlist.
+        Make the target playlist an exact copy of the source: same tracks,
+        same order, same duplicates. Only the differences are written, as
+        batched removals, range moves and batched insertions.
+        Returns False, writing nothing, if the target holds items without a
+        track ID (local files, unavailable tracks): our positions would not
+        line up with Spotify's, so only an additive sync is safe.
         """
-        logger.info("Fetching liked songs...")
-        liked_items = self.accessor.current_user_saved_tracks(
-            time_in_seconds=action.timeBetweenActInSeconds,
-            max_items=action.max_tracks,
+        target_total = (
+            self.accessor.get_playlist_metadata(action.target_playlist_id)
+            .get("tracks", {})
+            .get("total")
+        )
+        target_ids = map_to_ids(
+            self.accessor.fetch_playlist_tracks(action.target_playlist_id)
         )
+        source_ids = map_to_ids(
+            self.accessor.fetch_playlist_tracks(action.source_playlist_id)
+        )
+        if target_total is not None and target_total != len(target_ids):
+            logger.warning(
+                "Target playlist %s has %s items without track IDs; "
+                + "falling back to adding missing tracks only",
+                action.target_playlist_id,
+                target_total - len(target_ids),
+            )
+            return False
 
-        liked_ids = map_to_id_set(liked_items)
-        logger.info("Found %s liked tracks: %s", len(liked_ids), liked_ids)
+        diff = diff_playlists(source_ids, target_ids)
+        if diff.is_empty:
+            logger.info("Target playlist already mirrors the source.")
+            return True
+        logger.info(
+            "Mirroring %s: %s removals, %s moves, %s additions",
+            action.target_playlist_id,
+            len(diff.removals),
+            len(diff.moves),
+            diff.added,
+        )
+        if diff.removals:
+            self.accessor.remove_track_occurrences(
+                action.target_playlist_id,
+                [(r.track_id, r.position) for r in diff.removals],
+            )
+        for move in diff.moves:
+            self.accessor.reorder_playlist_items(
+                action.target_playlist_id,
+                move.range_start,
+                move.insert_before,
+                move.range_length,
+            )
+        for insertion in diff.insertions:
+            self.accessor.add_tracks_to_playlist(
+                action.target_playlist_id,
+                insertion.track_ids,
+                position=insertion.position,
+            )
+        return True
 
-        if not liked_ids:
-            logger.info("No liked songs found in the specified time period.")
+    def sync_liked_tracks(self, action: SyncLikedAction) -> None:
+        """
+        Synchronize the current user's liked tracks into a target playlist.
+        Only adds tracks that are liked but not already in the target playlist.
+        When a watermark store is configured, liked songs are read back to the
+        newest track handled by the previous run instead of using the time
+        window and `max_tracks`, so slow or missed runs leave no gaps.
+        """
+        add = partial(self.accessor.add_tracks_to_playlist, action.target_playlist_id)
+        if self._resume_write(action.key(), add):
             return
 
-        if not action.avoid_duplicates:
-            tracks_to_add = list(liked_ids)
-            logger.info("Tracks to add without duplicate check: %s", tracks_to_add)
-        else:
+        target_ids: set[str] = set()
+        if action.avoid_duplicates:
             logger.info("Fetching target playlist items...")
             target_items = self.accessor.fetch_playlist_tracks(
                 action.target_playlist_id
             )
             target_ids = map_to_id_set(target_items)
+            logger.info("Found %s tracks in target playlist", len(target_ids))
 
-            logger.info(
-                "Found %s tracks in target playlist: %s", len(target_ids), target_ids
+        watermark = self.watermarks.get(action.key()) if self.watermarks else None
+        if watermark:
+            logger.info("Streaming liked songs newer than %s...", watermark)
+            pages = self.accessor.iter_saved_tracks(
+                time_in_seconds=None, max_items=None, stop_at=watermark
             )
-
-            tracks_to_add = [tid for tid in liked_ids if tid not in target_ids]
-            logger.info("Tracks to add: %s", tracks_to_add)
+        else:
+            logger.info("Streaming liked songs...")
+            pages = self.accessor.iter_saved_tracks(
+                time_in_seconds=action.timeBetweenActInSeconds,
+                max_items=action.max_tracks,
+            )
+        newest: list[TrackRef] = []
+        tracks_to_add = collect_new_ids(
+            self._remember_first_item(pages, newest), target_ids
+        )
+        logger.info("Tracks to add: %s", truncate(tracks_to_add))
 
         if not tracks_to_add:
             logger.info("No new liked tracks to add to target playlist.")
-            return
 
-        self.accessor.add_tracks_to_playlist(action.target_playlist_id, tracks_to_add)
-        logger.info(
-            "Added %s liked tracks to target playlist: %s",
-            len(tracks_to_add),
-            action.target_playlist_id,
-        )
+        # Only advance once the new tracks are safely written
+        entry = JournalEntry(tracks_to_add)
+        if self.watermarks and newest:
+            entry.watermark = Watermark(
+                added_at=format_added_at(newest[0].added_at),
+                track_id=newest[0].id,
+            )
+        self._write_journaled(action.key(), entry, add)
+        if tracks_to_add:
+            logger.info(
+                "Added %s liked tracks to target playlist: %s",
+                len(tracks_to_add),
+                action.target_playlist_id,
+            )
+
+    def _remember_first_item(
+        self, pages: Iterable[list[TrackRef]], first: list[TrackRef]
+    ) -> Iterator[list[TrackRef]]:
+        """
+        Pass `pages` through, appending the very first item seen to `first`.
+        """
+        for page in pages:
+            if page and not first:
+                first.append(page[0])
+            yield page
 
     def archive_playlists(self, action: ArchiveAction) -> None:
         """
-        Archive the source playlist by copying new items into '{source_name}-Archive'.
-        Creates the archive playlist if it does not exist.
+        Archive the source playlist by copying new items into the target, or
+        without one into '{source_name}-Archive' (created if it does not
+        exist, rolling over into '-Archive-2', '-Archive-3', ... as each fills
+        up). If the action sets `archive_after_seconds`, tracks older than
+        that are moved there instead: copied, then removed from the source.
         Optionally avoids duplicates.
         """
-        logger.info("Fetching source playlist items...")
-        source_items = self.accessor.fetch_playlist_tracks(action.source_playlist_id)
-
-        if getattr(action, "filter_by_time", True):
-            logger.info("Filtering source playlist items by time...")
-            source_items = self.filter_items_after_time(
-                source_items, action.timeBetweenActInSeconds
+        source = self.accessor.get_playlist_metadata(action.source_playlist_id)
+        if action.target_playlist_id:
+            archive = ArchiveShards.single(
+                self.accessor, action.target_playlist_id, self.membership
             )
+        else:
+            archive = ArchiveShards.for_source(
+                self.accessor,
+                action.source_playlist_id,
+                f"{source['name']}-Archive",
+                manifest=self.archive_manifest,
+                membership=self.membership,
+            )
+        if self._resume_write(action.key(), archive.add):
+            return
 
-        source_ids = map_to_id_set(source_items)
-        logger.info(
-            "Found %s tracks in source playlist: %s", len(source_ids), source_ids
-        )
+        existing_ids: Container[str] = set()
+        if action.avoid_duplicates:
+            existing_ids = archive.members()
 
-        # Determine archive playlist name and ensure it exists
-        source_name = self.accessor.get_playlist_metadata(action.source_playlist_id)[
-            "name"
-        ]
-        archive_name = f"{source_name}-Archive"
-        logger.info("Using archive playlist name: '%s'", archive_name)
-        archive_playlist_id = self.accessor.get_or_create_playlist_with_name(
-            archive_name
-        )
+        if action.moves_tracks():
+            self._move_old_tracks(action, source, archive, existing_ids)
+            return
 
-        # Determine which tracks to add
-        if getattr(action, "avoidDuplicates", False):
-            logger.info(
-                "Avoiding duplicates: fetching existing archive playlist items..."
+        logger.info("Streaming source playlist items...")
+        pages = self.accessor.iter_playlist_tracks(action.source_playlist_id)
+        if getattr(action, "filter_by_time", True):
+            cutoff = datetime.now(UTC) - timedelta(
+                seconds=action.timeBetweenActInSeconds
             )
-            existing_items = self.accessor.fetch_playlist_tracks(archive_playlist_id)
-            existing_ids = map_to_id_set(existing_items)
-            tracks_to_add = [tid for tid in source_ids if tid not in existing_ids]
-            logger.info("Tracks to add after duplicate check: %s", tracks_to_add)
-        else:
-            tracks_to_add = list(source_ids)
-            logger.info("Adding all tracks without duplicate check: %s", tracks_to_add)
+            logger.info("Archiving tracks added after %s", cutoff.isoformat())
+            pages = (added_after(page, cutoff.timestamp()) for page in pages)
+        tracks_to_add = collect_new_ids(pages, existing_ids)
+        logger.info("Tracks to archive: %s", truncate(tracks_to_add))
 
         if not tracks_to_add:
             logger.info("No new tracks to archive.")
             return
 
-        # Add tracks to archive playlist
-        self.accessor.add_tracks_to_playlist(archive_playlist_id, tracks_to_add)
+        self._write_journaled(action.key(), JournalEntry(tracks_to_add), archive.add)
+
+    def _move_old_tracks(
+        self,
+        action: ArchiveAction,
+        source: dict[str, Any],
+        archive: ArchiveShards,
+        existing_ids: Container[str],
+    ) -> None:
+        """
+        Copy the source tracks added more than `archive_after_seconds` ago (all
+        of them without `filter_by_time`) into the archive, then remove every
+        occurrence of them from the source.
+        Removals go by position, highest first, pinned to the snapshot the
+        positions were read at, so a concurrent edit fails the request rather
+        than deleting the wrong items. The snapshot is read again after the
+        tracks and nothing is moved if it changed in between, since the
+        positions might then belong to neither. These reads bypass any run
+        scope, whose copies may be older than each other. Removals are
+        skipped if the source holds items without a track ID, since
+        positions would not line up.
+        """
+        direct = self.accessor
+        if isinstance(direct, RunScopedAccessor):
+            direct = direct.accessor
+            source = direct.get_playlist_metadata(action.source_playlist_id)
+        items = direct.fetch_playlist_tracks(action.source_playlist_id)
+        snapshot_id = source.get("snapshot_id")
+        current = direct.get_playlist_metadata(action.source_playlist_id)
+        if current.get("snapshot_id") != snapshot_id:
+            logger.warning(
+                "Source playlist %s changed while it was read; "
+                + "not moving anything until the next run",
+                action.source_playlist_id,
+            )
+            return
+        if isinstance(self.accessor, RunScopedAccessor):
+            # Keep the scope's copy in step with the positions removed below
+            self.accessor.remember(action.source_playlist_id, current, items)
+        old = list(enumerate(items))
+        if action.filter_by_time:
+            cutoff = datetime.now(UTC) - timedelta(seconds=action.archive_after_seconds)
+            logger.info("Moving tracks added before %s", cutoff.isoformat())
+            old = [
+                (pos, item) for pos, item in old if item.added_at < cutoff.timestamp()
+            ]
+        if not old:
+            logger.info("No tracks old enough to archive.")
+            return
+
+        tracks_to_add = collect_new_ids([[item for _, item in old]], existing_ids)
+        logger.info("Tracks to archive: %s", truncate(tracks_to_add))
+
+        entry = JournalEntry(tracks_to_add)
+        total = source.get("tracks", {}).get("total")
+        if total is not None and total != len(items):
+            logger.warning(
+                "Source playlist %s has %s items without track IDs; "
+                + "archived tracks were not removed from it",
+                action.source_playlist_id,
+                total - len(items),
+            )
+        else:
+            # Only removed once the tracks are safely in the archive
+            entry.removal_playlist_id = action.source_playlist_id
+            entry.removals = [(item.id, pos) for pos, item in reversed(old)]
+            entry.removal_snapshot_id = snapshot_id
+        self._write_journaled(action.key(), entry, archive.add)
+
+    def _resume_write(self, key: str, add: Callable[..., object]) -> bool:
+        """
+        Finish the write action `key` left unfinished on a previous run, if
+        any, without recomputing it. Returns True if there was one.
+        """
+        entry = self.journal.get(key) if self.journal else None
+        if entry is None:
+            return False
         logger.info(
-            "Archived %s tracks to playlist '%s' (ID: %s)",
-            len(tracks_to_add),
-            archive_name,
-            archive_playlist_id,
+            "Resuming interrupted write for %s: %s tracks still to add",
+            key,
+            len(entry.pending),
         )
+        self._write_journaled(key, entry, add)
+        return True
+
+    def _write_journaled(
+        self, key: str, entry: JournalEntry, add: Callable[..., object]
+    ) -> None:
+        """
+        Add `entry.pending` through `add`, then advance the entry's watermark
+        and make its removals. With a journal the entry is recorded first and
+        trimmed as each chunk lands, so a crash leaves exactly the rest. An
+        entry with nothing to write is not journaled, and one whose add fails
+        permanently (see `is_permanent`) is dropped so the next run starts
+        afresh instead of retrying it forever.
+        """
+        if not entry.pending and not entry.removals:
+            if entry.watermark and self.watermarks:
+                self.watermarks.set(key, entry.watermark)
+            if self.journal is not None:
+                self.journal.finish(key)
+            return
+        if self.journal is not None:
+            self.journal.begin(key, entry)
+        if entry.pending:
+            try:
+                if self.journal is None:
+                    add(entry.pending)
+                else:
+                    add(entry.pending, on_chunk=partial(self._commit_chunk, key))
+            except Exception as e:
+                self._drop_if_permanent(key, e)
+                raise
+        try:
+            if entry.watermark and self.watermarks:
+                self.watermarks.set(key, entry.watermark)
+            if entry.removals:
+                self.accessor.remove_track_occurrences(
+                    entry.removal_playlist_id,
+                    entry.removals,
+                    snapshot_id=entry.removal_snapshot_id,
+                )
+                logger.info(
+                    "Removed %s archived tracks from source playlist %s",
+                    len(entry.removals),
+                    entry.removal_playlist_id,
+                )
+        finally:
+            # A rejected removal (the source moved on) must not be retried forever
+            if self.journal is not None:
+                self.journal.finish(key)
+
+    def _commit_chunk(self, key: str, chunk: ChunkResult, _total: int) -> None:
+        if chunk.ok:
+            self.journal.commit(key, chunk.items)
+
+    def _drop_if_permanent(self, key: str, error: Exception) -> None:
+        if self.journal is not None and is_permanent(error):
+            logger.warning(
+                "Dropping the journaled write of %s, which cannot succeed: %s",
+                key,
+                error,
+            )
+            self.journal.finish(key)
@@ -15,12 +15,22 @@ class Action:
     type: ActionType
     timeBetweenActInSeconds: int = 30  # Default to 30 seconds
 
+    def key(self) -> str:
+        """
+        Stable identity of the action (type, source and target), used to key
+        per-action state that must survive restarts.
+        """
+        source = getattr(self, "source_playlist_id", None) or ""
+        target = getattr(self, "target_playlist_id", None) or ""
+        return f"{self.type}:{source}:{target}"
+
 
 @dataclass
 class SyncAction(Action):
     source_playlist_id: str
     target_playlist_id: str
     avoid_duplicates: bool = True
+    mirror: bool = False  # Also remove and reorder so target == source
 
 
 @dataclass
@@ -33,9 +43,16 @@ class SyncLikedAction(Action):
 @dataclass
 class ArchiveAction(Action):
     source_playlist_id: str
-    target_playlist_id: str | None
+    target_playlist_id: str | None = None  # None archives into '<source>-Archive'
     avoid_duplicates: bool = True
     filter_by_time: bool = True
+    # Without a target: move tracks this old out of the source. Unset, the
+    # source is left alone and new tracks are only copied
+    archive_after_seconds: int | None = None
+
+    def moves_tracks(self) -> bool:
+        """Return True if this archive removes tracks from its source."""
+        return not self.target_playlist_id and self.archive_after_seconds is not None
 
 
 # Map each enum to its dataclass
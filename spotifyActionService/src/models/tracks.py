@@ -0,0 +1,113 @@
+import sys
+from bisect import bisect_right
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from itertools import pairwise
+from operator import attrgetter
+from typing import Any
+
+
+def parse_added_at(added_at: str) -> datetime:
+    """
+    Parse a Web API `added_at` timestamp (ISO 8601 with a trailing Z).
+    """
+    return datetime.fromisoformat(added_at.replace("Z", "+00:00"))
+
+
+def format_added_at(timestamp: float) -> str:
+    """
+    Format epoch seconds the way the Web API reports `added_at`.
+    """
+    return datetime.fromtimestamp(timestamp, UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+@dataclass(frozen=True, slots=True)
+class TrackRef:
+    """
+    The two fields we use from a playlist or liked-song item: the track ID
+    (interned, so repeated IDs across playlists share one string) and when
+    it was added, as epoch seconds.
+    """
+
+    id: str
+    added_at: float = 0.0
+
+    @classmethod
+    def from_item(cls, item: dict[str, Any]) -> "TrackRef":
+        """
+        Build a TrackRef from a raw Web API item. Items from before Spotify
+        recorded `added_at` get 0.0.
+        """
+        added_at = item.get("added_at")
+        return cls(
+            id=sys.intern(item["track"]["id"]),
+            added_at=parse_added_at(added_at).timestamp() if added_at else 0.0,
+        )
+
+
+_added_at = attrgetter("added_at")
+
+
+class TrackPage(list[TrackRef]):
+    """
+    TrackRefs in playlist order that remember whether they are also in
+    `added_at` order, which is the common case for playlists that are only
+    ever appended to. Time filters on such pages are a binary search.
+    """
+
+    __slots__ = ("ascending",)
+
+    def __init__(self, tracks: Iterable[TrackRef] = ()) -> None:
+        super().__init__(tracks)
+        self.recheck_order()
+
+    def recheck_order(self) -> None:
+        """
+        Recompute `ascending`, e.g. after the page was edited in place.
+        """
+        self.ascending = all(a.added_at <= b.added_at for a, b in pairwise(self))
+
+    def added_after(self, timestamp: float) -> list[TrackRef]:
+        """
+        Return the tracks added after `timestamp`, in page order.
+        """
+        if self.ascending:
+            return self[bisect_right(self, timestamp, key=_added_at) :]
+        return [track for track in self if track.added_at > timestamp]
+
+
+def added_after(tracks: list[TrackRef], timestamp: float) -> list[TrackRef]:
+    """
+    Return the tracks added after `timestamp`, in order.
+    """
+    page = tracks if isinstance(tracks, TrackPage) else TrackPage(tracks)
+    return page.added_after(timestamp)
+
+
+def to_track_refs(items: Iterable[dict[str, Any]]) -> TrackPage:
+    """
+    Convert raw Web API items to TrackRefs, in order. Items without a track
+    ID (unavailable tracks and local files) are dropped.
+    """
+    return TrackPage(
+        TrackRef.from_item(item)
+        for item in items
+        if item["track"] is not None and item["track"]["id"] is not None
+    )
+
+
+def move_items(
+    items: list, range_start: int, insert_before: int, range_length: int = 1
+) -> None:
+    """
+    Move `range_length` items starting at `range_start` so they sit before
+    `insert_before`, both counted before the move, as the Web API's
+    playlist reorder does.
+    """
+    end = range_start + range_length
+    block = items[range_start:end]
+    del items[range_start:end]
+    if insert_before > range_start:
+        insert_before -= range_length
+    items[insert_before:insert_before] = block
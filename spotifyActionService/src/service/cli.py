@@ -3,6 +3,7 @@ import click
 from .mainHandler import (
     do_archive,
     do_sync,
+    plan_actions,
     run_actions_once,
     start_scheduled_actions,
 )
@@ -23,15 +24,23 @@ def cli() -> None:
         "Skip tracks already in target by default; use --allow-duplicates to disable."
     ),
 )
+@click.option(
+    "--mirror",
+    is_flag=True,
+    default=False,
+    help="Make TARGET an exact copy of SOURCE, removing and reordering tracks.",
+)
 def sync(
     source_playlist_id: str,
     target_playlist_id: str,
     no_duplicates: bool,
+    mirror: bool,
 ) -> None:
     do_sync(
         source_playlist_id,
         target_playlist_id,
         avoid_duplicates=no_duplicates,
+        mirror=mirror,
     )
 
 
@@ -76,15 +85,43 @@ def archive(
     "run-once",
     help="Process all actions one time (on-demand)",
 )
-def run_once() -> None:
-    run_actions_once()
+@click.option(
+    "--plan",
+    is_flag=True,
+    default=False,
+    help="Only show what would be read and written and the estimated API cost.",
+)
+@click.option(
+    "--async",
+    "use_async",
+    is_flag=True,
+    default=False,
+    help="Run the actions concurrently on the asyncio engine (needs httpx).",
+)
+def run_once(plan: bool, use_async: bool) -> None:
+    if plan and use_async:
+        # Plans are made by the blocking engine, which would ignore --async
+        raise click.UsageError("--plan cannot be combined with --async")
+    if plan:
+        plan_actions(scheduled=False)
+        return
+    run_actions_once(use_async=use_async)
 
 
 @cli.command(
     "schedule",
     help="Start the scheduler (runs indefinitely)",
 )
-def schedule() -> None:
+@click.option(
+    "--plan",
+    is_flag=True,
+    default=False,
+    help="Only show the projected request rate per scheduler interval.",
+)
+def schedule(plan: bool) -> None:
+    if plan:
+        plan_actions(scheduled=True)
+        return
     start_scheduled_actions()
 
 
@@ -1,23 +1,58 @@
+import asyncio
+import math
+import time
+from collections import Counter
+from dataclasses import replace
+
 from accessor.configLoader import load_json_file
+from accessor.runStore import RunStore
+from logic.asyncPlaylistLogic import AsyncPlaylistService
 from logic.playlistLogic import PlaylistService
-from models.actions import ACTION_MAP, Action, ActionType
+from models.actions import (
+    ACTION_MAP,
+    Action,
+    ActionType,
+    ArchiveAction,
+    SyncLikedAction,
+)
+from service.helper.playlistLocks import AsyncPlaylistLocks, PlaylistLocks
 from util.logger import logger
 
+# Actions handle_actions_async runs at once by default
+DEFAULT_ASYNC_CONCURRENCY = 16
+
 
 class ActionProcessor:
     """
     Encapsulates parsing and handling of action definitions.
+    With `locks`, an action holds the locks of the playlists it writes to
+    while it runs, so concurrent actions never write to one at once.
+    With `async_playlist_service`, `handle_actions_async` runs the actions
+    it supports on the event loop and the rest on worker threads.
+    With `runs`, every run is recorded there when it ends, failed or not.
     """
 
-    def __init__(self, playlist_service: PlaylistService) -> None:
+    def __init__(
+        self,
+        playlist_service: PlaylistService,
+        locks: PlaylistLocks | None = None,
+        async_playlist_service: AsyncPlaylistService | None = None,
+        runs: RunStore | None = None,
+    ) -> None:
         self.playlist_service = playlist_service
+        self.locks = locks
+        self.async_playlist_service = async_playlist_service
+        self.runs = runs
 
     def parse_action_file(self, filepath: str) -> list[Action]:
         """
         Reads a JSON file and returns a list of Action instances.
+        Two actions with the same `key()` are rejected, since the key is
+        what their watermarks, journal entries and run records are kept by.
         """
         data: dict = load_json_file(filepath)
         actions: list[Action] = []
+        seen: set[str] = set()
 
         for raw in data.get("actions", []):
             # parse & validate the enum
@@ -39,14 +74,39 @@ class ActionProcessor:
             except TypeError as err:
                 raise ValueError(f"Invalid params for {a_type!r}: {err}") from err
 
+            key = action_obj.key()
+            if key in seen:
+                raise ValueError(
+                    f"Duplicate action {key}: actions must differ in type, "
+                    + "source or target playlist"
+                )
+            seen.add(key)
             actions.append(action_obj)
 
         return actions
 
-    def handle_action(self, action: Action) -> None:
+    def handle_action(self, action: Action, window: float | None = None) -> None:
         """
         Dispatches a single Action to the appropriate PlaylistService method.
+        With `window`, a catch-up run reads back that many seconds instead
+        of one interval (see `with_window`).
         """
+        started = time.time()
+        run = with_window(action, window) if window else action
+        try:
+            if self.locks is None:
+                self._dispatch(run)
+                return
+            with self.locks.hold(written_playlist_ids(run)):
+                self._dispatch(run)
+        finally:
+            self._record(action, started)
+
+    def _record(self, action: Action, started: float) -> None:
+        if self.runs is not None:
+            self.runs.record(action.key(), started, action.timeBetweenActInSeconds)
+
+    def _dispatch(self, action: Action) -> None:
         match action.type:
             case ActionType.SYNC:
                 self.playlist_service.sync_playlists(action)
@@ -60,6 +120,113 @@ class ActionProcessor:
     def handle_actions(self, actions: list[Action]) -> None:
         """
         Processes a list of Actions in sequence.
+        Playlists used by more than one action are fetched once for the
+        whole batch and shared between those actions.
+        """
+        shared = shared_playlist_ids(actions)
+        if not shared:
+            for action in actions:
+                self.handle_action(action)
+            return
+
+        logger.info(
+            f"{len(shared)} playlists are shared by several actions; "
+            + "fetching each once for this run"
+        )
+        with self.playlist_service.run_scope(shared):
+            for action in actions:
+                self.handle_action(action)
+
+    async def handle_action_async(self, action: Action) -> None:
         """
-        for action in actions:
-            self.handle_action(action)
+        Dispatch `action` to the async service, or run it on a worker thread
+        when the async service cannot handle it.
+        """
+        service = self.async_playlist_service
+        if service is None or not service.supports(action):
+            await asyncio.to_thread(self.handle_action, action)
+            return
+        started = time.time()
+        try:
+            match action.type:
+                case ActionType.SYNC:
+                    await service.sync_playlists(action)
+                case ActionType.SYNC_LIKED:
+                    await service.sync_liked_tracks(action)
+                case ActionType.ARCHIVE:
+                    await service.archive_playlists(action)
+        finally:
+            self._record(action, started)
+
+    async def handle_actions_async(
+        self, actions: list[Action], concurrency: int = DEFAULT_ASYNC_CONCURRENCY
+    ) -> None:
+        """
+        Run `actions` at the same time, at most `concurrency` at once.
+        Actions writing to the same playlist still run one after another.
+        Every action is run; if any failed, the first error is raised after.
+        """
+        slots = asyncio.Semaphore(concurrency)
+        locks = AsyncPlaylistLocks()
+
+        async def run(action: Action) -> None:
+            async with locks.hold(written_playlist_ids(action)), slots:
+                await self.handle_action_async(action)
+
+        results = await asyncio.gather(
+            *(run(action) for action in actions), return_exceptions=True
+        )
+        failed = [
+            (action, result)
+            for action, result in zip(actions, results, strict=True)
+            if isinstance(result, BaseException)
+        ]
+        for action, error in failed:
+            logger.error(f"Action {action} failed: {error}")
+        if failed:
+            raise failed[0][1]
+
+
+def written_playlist_ids(action: Action) -> set[str]:
+    """
+    Return the playlist IDs `action` may write to: its target, and for an
+    archive without a target the source it moves tracks out of (the archive
+    shards belong to that source).
+    """
+    ids = {getattr(action, "target_playlist_id", None)}
+    if isinstance(action, ArchiveAction) and not action.target_playlist_id:
+        ids.add(action.source_playlist_id)
+    return {playlist_id for playlist_id in ids if playlist_id}
+
+
+def with_window(action: Action, seconds: float) -> Action:
+    """
+    Return `action` reading back `seconds` rather than one interval. Only
+    liked-song syncs and time-filtered archives that copy limit their reads
+    to the last interval; other actions come back unchanged, as does a
+    window no longer than the interval.
+    """
+    windowed = isinstance(action, SyncLikedAction) or (
+        isinstance(action, ArchiveAction)
+        and not action.moves_tracks()
+        and action.filter_by_time
+    )
+    if not windowed or seconds <= action.timeBetweenActInSeconds:
+        return action
+    return replace(action, timeBetweenActInSeconds=math.ceil(seconds))
+
+
+def shared_playlist_ids(actions: list[Action]) -> set[str]:
+    """
+    Return the playlist IDs that more than one of `actions` reads.
+    """
+    counts = Counter(
+        playlist_id
+        for action in actions
+        for playlist_id in {
+            getattr(action, "source_playlist_id", None),
+            getattr(action, "target_playlist_id", None),
+        }
+        if playlist_id
+    )
+    return {playlist_id for playlist_id, count in counts.items() if count > 1}
@@ -0,0 +1,161 @@
+import hashlib
+import os
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from models.actions import Action
+from service.helper.actionHelper import ActionProcessor
+from service.helper.timerScheduler import Job, TimerScheduler
+from util.logger import logger
+
+# Schedules an action, first after the given delay (None: one interval)
+ScheduleFn = Callable[[Action, float | None], Job]
+
+
+@dataclass
+class ActionDiff:
+    """Keys of the actions added, removed and edited between two files."""
+
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    changed: list[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+def keyed_actions(actions: list[Action]) -> dict[str, Action]:
+    """
+    Actions by `key()`, which `parse_action_file` keeps unique.
+    """
+    return {action.key(): action for action in actions}
+
+
+def diff_actions(old: dict[str, Action], new: dict[str, Action]) -> ActionDiff:
+    """Compare two keyed action sets; an action counts as changed if unequal."""
+    return ActionDiff(
+        added=[key for key in new if key not in old],
+        removed=[key for key in old if key not in new],
+        changed=[key for key in new if key in old and new[key] != old[key]],
+    )
+
+
+class ActionReloader:
+    """
+    Keeps a scheduler's jobs in step with the actions file. `check()` only
+    stats the file, reading and hashing it when its mtime or size moved and
+    touching the jobs only when the content changed; then just the added,
+    removed and edited actions are rescheduled. Unchanged actions keep their
+    timers, and an edited action keeps its next run time unless its interval
+    changed. A file that fails to parse is logged and the schedule kept.
+    One-off catch-up runs passed to `track_catch_up` are cancelled when
+    their action is removed or edited before they run.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        scheduler: TimerScheduler,
+        processor: ActionProcessor,
+        schedule: ScheduleFn,
+    ) -> None:
+        self.path = path
+        self.scheduler = scheduler
+        self.processor = processor
+        self.schedule = schedule
+        self.jobs: dict[str, Job] = {}
+        self.catch_ups: dict[str, Job] = {}
+        self._signature: tuple[int, int] | None = None
+        self._digest: str | None = None
+
+    @property
+    def actions(self) -> dict[str, Action]:
+        return {key: job.args[0] for key, job in self.jobs.items()}
+
+    def start(self, delays: Callable[[list[Action]], list[float]]) -> list[Action]:
+        """
+        Read the file and schedule every action, the i-th first after
+        `delays(actions)[i]` seconds. Returns the actions.
+        """
+        self._fingerprint()
+        actions = self.processor.parse_action_file(self.path)
+        keyed = keyed_actions(actions)
+        for (key, action), delay in zip(keyed.items(), delays(actions), strict=True):
+            self.jobs[key] = self.schedule(action, delay)
+        return actions
+
+    def track_catch_up(self, action: Action, job: Job) -> None:
+        """
+        Cancel `job`, a one-off catch-up run of `action`, if the action is
+        removed or edited before the job runs.
+        """
+        self.catch_ups[action.key()] = job
+
+    def _fingerprint(self) -> bool:
+        """
+        Record the file's stat signature and content hash. Returns True if
+        the content differs from what was last recorded.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        with open(self.path, "rb") as file:
+            digest = hashlib.sha256(file.read()).hexdigest()
+        if digest == self._digest:
+            return False
+        self._digest = digest
+        return True
+
+    def check(self) -> ActionDiff:
+        """
+        Apply any change to the actions file to the schedule and return what
+        changed (empty when nothing did).
+        """
+        if not self._fingerprint():
+            return ActionDiff()
+        try:
+            actions = self.processor.parse_action_file(self.path)
+        except (OSError, ValueError, KeyError, RuntimeError) as e:
+            # Forget the hash so the same content is retried on the next edit
+            self._digest = None
+            logger.error(f"Keeping the current schedule; cannot load {self.path}: {e}")
+            return ActionDiff()
+        return self.apply(keyed_actions(actions))
+
+    def apply(self, new: dict[str, Action]) -> ActionDiff:
+        """
+        Reschedule only the jobs whose actions differ from `new`.
+        """
+        diff = diff_actions(self.actions, new)
+        for key in diff.removed + diff.changed:
+            # A pending catch-up would run the old definition
+            if (catch_up := self.catch_ups.pop(key, None)) is not None:
+                self.scheduler.cancel(catch_up)
+        for key in diff.removed:
+            self.scheduler.cancel(self.jobs.pop(key))
+        for key in diff.changed:
+            old = self.jobs.pop(key)
+            self.scheduler.cancel(old)
+            action = new[key]
+            delay = None
+            if action.timeBetweenActInSeconds == old.interval:
+                now = self.scheduler.clock()
+                slot = old.slot if old.slot > now else old.next_slot(now)
+                delay = slot - now
+            self.jobs[key] = self.schedule(action, delay)
+        for key in diff.added:
+            self.jobs[key] = self.schedule(new[key], None)
+        if diff:
+            logger.info(
+                "Reloaded %s: %s added, %s removed, %s changed",
+                self.path,
+                len(diff.added),
+                len(diff.removed),
+                len(diff.changed),
+            )
+        return diff
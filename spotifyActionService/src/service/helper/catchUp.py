@@ -0,0 +1,86 @@
+from dataclasses import dataclass
+from enum import StrEnum
+
+from accessor.runStore import RunRecord, RunStore
+from models.actions import Action
+from service.helper.timerScheduler import spread_offsets
+
+
+class CatchUpPolicy(StrEnum):
+    """What a restarted scheduler does about runs it missed while down."""
+
+    # Drop them and wait for the next slot on the action's cadence
+    SKIP = "skip"
+    # Run the action once straight away, then every interval from then
+    RUN_ONCE = "run_once"
+    # As RUN_ONCE, but that run reads back to the last one so nothing added
+    # while the scheduler was down falls outside its window
+    COALESCE = "coalesce"
+
+
+@dataclass
+class CatchUp:
+    """
+    A missed action to run once, `delay` seconds from now, reading back
+    `window` seconds if set.
+    """
+
+    action: Action
+    window: float | None = None
+    delay: float = 0.0
+
+
+def resume_delays(
+    actions: list[Action],
+    defaults: list[float],
+    runs: RunStore,
+    policy: CatchUpPolicy,
+    now: float,
+) -> tuple[list[float], list[CatchUp]]:
+    """
+    Work out, from the run store, how long each action waits before its
+    first scheduled run and which missed actions to catch up. Actions that
+    never ran wait their entry in `defaults`; those not yet due wait until
+    their stored next run (at most one interval). A run less than one
+    interval overdue is just late and runs soon; one further behind was
+    missed and follows `policy`. Late runs and catch-ups are spread across
+    their interval, first one straight away, so a restart does not fire
+    them all at once.
+    """
+    delays: list[float] = []
+    overdue: list[tuple[int, RunRecord]] = []
+    for index, (action, default) in enumerate(zip(actions, defaults, strict=True)):
+        interval = action.timeBetweenActInSeconds
+        record = runs.get(action.key())
+        if record is None:
+            delays.append(default)
+        elif record.next_due > now:
+            delays.append(min(record.next_due - now, interval))
+        elif now - record.next_due > interval and policy is CatchUpPolicy.SKIP:
+            delays.append((record.next_due - now) % interval)
+        else:
+            delays.append(0.0)
+            overdue.append((index, record))
+
+    catch_ups: list[CatchUp] = []
+    intervals = [actions[index].timeBetweenActInSeconds for index, _ in overdue]
+    # spread_offsets counts up to a full interval; reversed, it counts from 0
+    offsets = reversed(spread_offsets(intervals[::-1]))
+    for (index, record), interval, offset in zip(
+        overdue, intervals, offsets, strict=True
+    ):
+        start = interval - offset
+        if now - record.next_due <= interval:
+            delays[index] = start
+            continue
+        # The regular cadence picks up one interval after the catch-up
+        delays[index] = start + interval
+        window = now + start - record.last_run
+        catch_ups.append(
+            CatchUp(
+                actions[index],
+                window if policy is CatchUpPolicy.COALESCE else None,
+                delay=start,
+            )
+        )
+    return delays, catch_ups
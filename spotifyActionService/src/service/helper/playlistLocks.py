@@ -0,0 +1,52 @@
+import asyncio
+import threading
+from collections import defaultdict
+from collections.abc import AsyncIterator, Iterable, Iterator
+from contextlib import AsyncExitStack, ExitStack, asynccontextmanager, contextmanager
+
+
+class PlaylistLocks:
+    """
+    One lock per playlist ID, so actions writing to the same playlist take
+    turns while actions on different playlists run side by side.
+    """
+
+    def __init__(self) -> None:
+        self._locks: dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def _lock_for(self, playlist_id: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(playlist_id, threading.Lock())
+
+    @contextmanager
+    def hold(self, playlist_ids: Iterable[str]) -> Iterator[None]:
+        """
+        Hold the locks of all `playlist_ids` for the duration of the block.
+        They are always taken in sorted order, so two callers wanting an
+        overlapping set cannot deadlock.
+        """
+        with ExitStack() as stack:
+            for playlist_id in sorted(set(playlist_ids)):
+                stack.enter_context(self._lock_for(playlist_id))
+            yield
+
+
+class AsyncPlaylistLocks:
+    """
+    PlaylistLocks for coroutines on one event loop.
+    """
+
+    def __init__(self) -> None:
+        self._locks: defaultdict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    @asynccontextmanager
+    async def hold(self, playlist_ids: Iterable[str]) -> AsyncIterator[None]:
+        """
+        Hold the locks of all `playlist_ids`, taken in sorted order, for the
+        duration of the block.
+        """
+        async with AsyncExitStack() as stack:
+            for playlist_id in sorted(set(playlist_ids)):
+                await stack.enter_async_context(self._locks[playlist_id])
+            yield
@@ -0,0 +1,106 @@
+import threading
+from dataclasses import dataclass
+from functools import partial
+
+import logic.asyncPlaylistLogic as _async_pl_logic
+import logic.playlistLogic as _pl_logic
+from accessor.archiveManifest import ArchiveManifest
+from accessor.asyncSpotifyAccessor import (
+    DEFAULT_MAX_IN_FLIGHT,
+    AsyncSpotifyAccessor,
+    AsyncToken,
+)
+from accessor.membershipIndex import MembershipIndex
+from accessor.playlistCache import PlaylistCache
+from accessor.playlistIndex import PlaylistNameIndex
+from accessor.rateLimiter import get_rate_limiter
+from accessor.spotifyAccessor import SpotifyAccessor
+from accessor.watermarkStore import WatermarkStore
+from accessor.writeJournal import WriteJournal
+from dependency import spotifyClient
+from spotipy.oauth2 import SpotifyOAuth
+from util.env import get_env
+
+
+@dataclass
+class LocalState:
+    """
+    The on-disk stores, one instance of each per process, so services built
+    for both engines read and write the same files under the same locks.
+    """
+
+    cache: PlaylistCache
+    watermarks: WatermarkStore
+    membership: MembershipIndex
+    archive_manifest: ArchiveManifest
+    journal: WriteJournal
+
+
+_shared_state: LocalState | None = None
+_shared_lock = threading.Lock()
+
+
+def get_local_state() -> LocalState:
+    """
+    Return the process-wide LocalState, creating it on first use.
+    """
+    global _shared_state
+    with _shared_lock:
+        if _shared_state is None:
+            _shared_state = LocalState(
+                cache=PlaylistCache(),
+                watermarks=WatermarkStore(),
+                membership=MembershipIndex(),
+                archive_manifest=ArchiveManifest(),
+                journal=WriteJournal(),
+            )
+        return _shared_state
+
+
+def build_playlist_service() -> _pl_logic.PlaylistService:
+    """
+    Build a PlaylistService backed by an authenticated, cache-enabled accessor.
+    """
+    state = get_local_state()
+    accessor = SpotifyAccessor(
+        spotifyClient.get_client(),
+        cache=state.cache,
+        page_workers=int(get_env("SPOTIFY_PAGE_WORKERS", "4")),
+        rate_limiter=get_rate_limiter(),
+        name_index=PlaylistNameIndex(
+            ttl_seconds=float(get_env("SPOTIFY_PLAYLIST_INDEX_TTL", "3600"))
+        ),
+    )
+    return _pl_logic.PlaylistService(
+        accessor,
+        watermarks=state.watermarks,
+        membership=state.membership,
+        archive_manifest=state.archive_manifest,
+        journal=state.journal,
+    )
+
+
+def _token_info(auth_manager: SpotifyOAuth) -> dict:
+    # Refreshes the cached token first if it has expired
+    auth_manager.get_access_token(as_dict=False)
+    return auth_manager.cache_handler.get_cached_token()
+
+
+def build_async_playlist_service() -> _async_pl_logic.AsyncPlaylistService:
+    """
+    Build an AsyncPlaylistService sharing the blocking client's credentials,
+    rate limits, cache and local state. Needs the optional httpx dependency.
+    """
+    auth_manager = spotifyClient.get_client().auth_manager
+    state = get_local_state()
+    accessor = AsyncSpotifyAccessor(
+        AsyncToken(partial(_token_info, auth_manager)),
+        cache=state.cache,
+        rate_limiter=get_rate_limiter(),
+        max_in_flight=int(
+            get_env("SPOTIFY_ASYNC_MAX_IN_FLIGHT", str(DEFAULT_MAX_IN_FLIGHT))
+        ),
+    )
+    return _async_pl_logic.AsyncPlaylistService(
+        accessor, watermarks=state.watermarks, journal=state.journal
+    )
@@ -0,0 +1,243 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass, field
+from functools import partial
+
+from util.logger import logger
+
+
+@dataclass(eq=False)
+class Job:
+    """
+    A callable run every `interval` seconds (or just once without
+    `repeat`), next at clock time `due`: its slot on the cadence plus up to
+    `jitter` seconds of random delay.
+    """
+
+    interval: float
+    fn: Callable[..., object]
+    args: tuple = ()
+    due: float = 0.0
+    jitter: float = 0.0
+    repeat: bool = True
+    slot: float = field(default=0.0, repr=False)
+    cancelled: bool = field(default=False, repr=False)
+
+    def run(self) -> None:
+        self.fn(*self.args)
+
+    def next_slot(self, now: float) -> float:
+        """
+        First slot on the job's cadence after its current one that is not
+        before `now`; slots missed in between are skipped.
+        """
+        slot = self.slot + self.interval
+        if slot < now:
+            slot += ((now - slot) // self.interval + 1) * self.interval
+        return slot
+
+
+class TimerScheduler:
+    """
+    Runs recurring jobs from a heap ordered by next due time. The loop sleeps
+    on a condition until the earliest job is due, so it does not wake at all
+    while idle; adding or cancelling jobs, `wake()` and `stop()` notify the
+    condition so the sleep is cut short and the heap re-read.
+    Missed slots (a job overrunning its interval) are skipped rather than
+    run back to back. Jitter delays a single run without shifting the
+    cadence, so a job's runs never drift.
+    With an `executor`, due jobs are handed to it so several run at once;
+    a job is only rescheduled when it finishes, so it never overlaps itself.
+    Without one, jobs run inline. Either way a failing job is logged and
+    rescheduled, so one bad run does not stop the others.
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.monotonic,
+        executor: Executor | None = None,
+        rand: Callable[[float, float], float] = random.uniform,
+    ) -> None:
+        self.clock = clock
+        self.executor = executor
+        self.rand = rand
+        self._heap: list[tuple[float, int, Job]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stopped = False
+
+    def every(
+        self,
+        interval: float,
+        fn: Callable[..., object],
+        *args: object,
+        delay: float | None = None,
+        jitter: float = 0.0,
+    ) -> Job:
+        """
+        Run `fn(*args)` every `interval` seconds, first `delay` from now
+        (default `interval`), each run up to `jitter` seconds late.
+        """
+        if interval <= 0:
+            raise ValueError(f"Interval must be positive, got {interval}")
+        if jitter < 0 or (delay is not None and delay < 0):
+            raise ValueError("Delay and jitter cannot be negative")
+        slot = self.clock() + (interval if delay is None else delay)
+        job = Job(interval, fn, args, jitter=jitter, slot=slot)
+        job.due = slot + self._jitter(job)
+        with self._cond:
+            self._push(job)
+            self._cond.notify_all()
+        return job
+
+    def once(self, delay: float, fn: Callable[..., object], *args: object) -> Job:
+        """
+        Run `fn(*args)` a single time, `delay` seconds from now.
+        """
+        if delay < 0:
+            raise ValueError(f"Delay cannot be negative, got {delay}")
+        due = self.clock() + delay
+        job = Job(delay, fn, args, due=due, repeat=False, slot=due)
+        with self._cond:
+            self._push(job)
+            self._cond.notify_all()
+        return job
+
+    def cancel(self, job: Job) -> None:
+        """
+        Stop running `job`. Its heap entry is dropped when it comes due.
+        """
+        with self._cond:
+            job.cancelled = True
+            self._cond.notify_all()
+
+    def wake(self) -> None:
+        """
+        Interrupt the current sleep so the loop re-reads its jobs.
+        """
+        with self._cond:
+            self._cond.notify_all()
+
+    def stop(self) -> None:
+        """
+        Make `run_forever` return once the job it is running, if any, ends.
+        """
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    @property
+    def jobs(self) -> list[Job]:
+        with self._cond:
+            return [job for _, _, job in sorted(self._heap) if not job.cancelled]
+
+    def _push(self, job: Job) -> None:
+        heapq.heappush(self._heap, (job.due, next(self._seq), job))
+
+    def _drop_cancelled(self) -> None:
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+
+    def next_due(self) -> float | None:
+        """
+        Clock time at which the earliest job is due, or None without jobs.
+        """
+        with self._cond:
+            self._drop_cancelled()
+            return self._heap[0][0] if self._heap else None
+
+    def _pop_due(self) -> Job | None:
+        with self._cond:
+            self._drop_cancelled()
+            if not self._heap or self._heap[0][0] > self.clock():
+                return None
+            return heapq.heappop(self._heap)[2]
+
+    def _jitter(self, job: Job) -> float:
+        if job.jitter <= 0:
+            return 0.0
+        return self.rand(0.0, min(job.jitter, job.interval))
+
+    def _reschedule(self, job: Job) -> None:
+        if not job.repeat:
+            return
+        # Keep to the original cadence, skipping the slots we missed
+        job.slot = job.next_slot(self.clock())
+        job.due = job.slot + self._jitter(job)
+        with self._cond:
+            if not job.cancelled:
+                self._push(job)
+                self._cond.notify_all()
+
+    def _finished(self, job: Job, future: Future) -> None:
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            logger.error("Scheduled job %s failed", job, exc_info=error)
+        self._reschedule(job)
+
+    def run_pending(self) -> int:
+        """
+        Run (or, with an executor, start) every job that is due now, in due
+        order. Returns how many there were.
+        """
+        ran = 0
+        while (job := self._pop_due()) is not None:
+            ran += 1
+            if self.executor is not None:
+                future = self.executor.submit(job.run)
+                future.add_done_callback(partial(self._finished, job))
+                continue
+            try:
+                job.run()
+            except Exception:
+                logger.exception("Scheduled job %s failed", job)
+            self._reschedule(job)
+        return ran
+
+    def _wait_until_due(self) -> bool:
+        """
+        Sleep until a job is due; False if the scheduler was stopped instead.
+        """
+        with self._cond:
+            while not self._stopped:
+                self._drop_cancelled()
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                delay = self._heap[0][0] - self.clock()
+                if delay <= 0:
+                    return True
+                self._cond.wait(delay)
+            return False
+
+    def run_forever(self) -> None:
+        """
+        Run jobs as they come due until `stop()` is called.
+        """
+        with self._cond:
+            self._stopped = False
+        while self._wait_until_due():
+            self.run_pending()
+
+
+def spread_offsets(intervals: list[float]) -> list[float]:
+    """
+    First-run delays that spread jobs sharing an interval evenly across it:
+    the i-th of n jobs every T seconds first runs T * i / n in, so the last
+    one still waits a full interval.
+    """
+    counts = Counter(intervals)
+    seen: Counter[float] = Counter()
+    offsets = []
+    for interval in intervals:
+        seen[interval] += 1
+        offsets.append(interval * seen[interval] / counts[interval])
+    return offsets
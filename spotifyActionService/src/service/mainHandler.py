@@ -1,27 +1,28 @@
-import dependency.spotifyClient as _spotifyClient
-import logic.playlistLogic as _pl_logic
+import service.helper.serviceFactory as _factory
 import service.onDemandHandler as _odh
 import service.schedulerHandler as _sch
-from accessor.spotifyAccessor import SpotifyAccessor as _SpotifyAccessor
+from accessor.rateLimiter import READ, WRITE, get_rate_limiter
+from logic.actionPlanner import ActionPlanner, format_plan
 from models.actions import ActionType, ArchiveAction, SyncAction
+from service.helper.actionHelper import ActionProcessor
 
 
 def do_sync(
     source_playlist_id: str,
     target_playlist_id: str,
     avoid_duplicates: bool = True,
+    mirror: bool = False,
 ) -> None:
     """
-    Sync one playlist into another.
+    Sync one playlist into another, or mirror it exactly if `mirror` is set.
     """
-    client = _spotifyClient.get_client()
-    accessor = _SpotifyAccessor(client)
-    service = _pl_logic.PlaylistService(accessor)
+    service = _factory.build_playlist_service()
     action = SyncAction(
         type=ActionType.SYNC,
         source_playlist_id=source_playlist_id,
         target_playlist_id=target_playlist_id,
         avoid_duplicates=avoid_duplicates,
+        mirror=mirror,
     )
     service.sync_playlists(action)
     print(f"✅ Synced from {source_playlist_id!r} → {target_playlist_id!r}")
@@ -38,9 +39,7 @@ def do_archive(
     Archive tracks from a source playlist into a target (or remove if target is None).
     Only tracks older than `days` days will be archived if filter_by_time is True.
     """
-    client = _spotifyClient.get_client()
-    accessor = _SpotifyAccessor(client)
-    service = _pl_logic.PlaylistService(accessor)
+    service = _factory.build_playlist_service()
     action = ArchiveAction(
         type=ActionType.ARCHIVE,
         timeBetweenActInSeconds=days * 24 * 3600,
@@ -48,17 +47,19 @@ def do_archive(
         target_playlist_id=target_playlist_id,
         avoid_duplicates=avoid_duplicates,
         filter_by_time=filter_by_time,
+        archive_after_seconds=None if target_playlist_id else days * 24 * 3600,
     )
     service.archive_playlists(action)
     tgt = target_playlist_id or "removed"
     print(f"✅ Archived from {source_playlist_id!r} → {tgt!r}")
 
 
-def run_actions_once() -> None:
+def run_actions_once(use_async: bool = False) -> None:
     """
-    Process all queued actions one time (on-demand).
+    Process all queued actions one time (on-demand), on the asyncio engine
+    if `use_async` is set.
     """
-    _odh.main()
+    _odh.main(use_async=use_async)
 
 
 def start_scheduled_actions() -> None:
@@ -66,3 +67,27 @@ def start_scheduled_actions() -> None:
     Start the scheduler (this will block and run your recurring jobs).
     """
     _sch.main()
+
+
+def plan_actions(scheduled: bool = False) -> None:
+    """
+    Print what each queued action would read and write and its estimated
+    request cost, without changing anything. For a schedule this includes
+    the request load over time with the first runs spread as the scheduler
+    would spread them.
+    """
+    service = _factory.build_playlist_service()
+    actions = ActionProcessor(service).parse_action_file(
+        "spotifyActionService/actions.json"
+    )
+    plans = ActionPlanner(service.accessor).plan_all(actions)
+    limiter = get_rate_limiter()
+    print(
+        format_plan(
+            plans,
+            read_rate=limiter.buckets[READ].rate,
+            write_rate=limiter.buckets[WRITE].rate,
+            scheduled=scheduled,
+            first_runs=_sch.first_run_delays(actions) if scheduled else None,
+        )
+    )
@@ -1,24 +1,46 @@
-from accessor.spotifyAccessor import SpotifyAccessor
-from dependency import spotifyClient
-from logic.playlistLogic import PlaylistService
-from service.helper.actionHelper import ActionProcessor
+import asyncio
+
+from accessor.rateLimiter import get_rate_limiter
+from accessor.runStore import RunStore
+from service.helper.actionHelper import DEFAULT_ASYNC_CONCURRENCY, ActionProcessor
+from service.helper.serviceFactory import (
+    build_async_playlist_service,
+    build_playlist_service,
+)
+from util.env import get_env
 from util.logger import logger
 
 
-def main() -> None:
+def main(use_async: bool = False) -> None:
     logger.info("Starting on-demand handler...")
 
     logger.info("Parsing action file...")
     # Instantiate the processor with a real PlaylistService
     processor = ActionProcessor(
-        playlist_service=PlaylistService(SpotifyAccessor(spotifyClient.get_client()))
+        playlist_service=build_playlist_service(),
+        async_playlist_service=build_async_playlist_service() if use_async else None,
+        runs=RunStore(),
     )
     actions = processor.parse_action_file("spotifyActionService/actions.json")
     logger.info(f"Parsed {len(actions)} actions.")
     logger.info(f"Actions: {actions}")
 
     logger.info("Handling actions...")
-    processor.handle_actions(actions)
+    if use_async:
+        asyncio.run(_handle_actions_async(processor, actions))
+    else:
+        processor.handle_actions(actions)
+    logger.info(f"Rate limiter metrics: {get_rate_limiter().metrics()}")
+
+
+async def _handle_actions_async(processor: ActionProcessor, actions: list) -> None:
+    concurrency = int(
+        get_env("SPOTIFY_ASYNC_CONCURRENCY", str(DEFAULT_ASYNC_CONCURRENCY))
+    )
+    try:
+        await processor.handle_actions_async(actions, concurrency=concurrency)
+    finally:
+        await processor.async_playlist_service.accessor.aclose()
 
 
 if __name__ == "__main__":  # pragma: no cover
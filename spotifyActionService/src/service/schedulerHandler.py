@@ -1,41 +1,134 @@
+import signal
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-import schedule
-from accessor.spotifyAccessor import SpotifyAccessor
-from dependency import spotifyClient
-from logic.playlistLogic import PlaylistService
+from accessor.runStore import RunStore
 from models.actions import Action
 from service.helper.actionHelper import ActionProcessor
+from service.helper.actionReloader import ActionReloader
+from service.helper.catchUp import CatchUp, CatchUpPolicy, resume_delays
+from service.helper.playlistLocks import PlaylistLocks
+from service.helper.serviceFactory import build_playlist_service
+from service.helper.timerScheduler import Job, TimerScheduler, spread_offsets
+from util.env import get_env
 from util.logger import logger
 
-# Setup Constants
-SLEEP_TIME_IN_SECONDS = 1
 
-
-def schedule_action(processor: ActionProcessor, action: Action) -> None:
+def schedule_action(
+    scheduler: TimerScheduler,
+    processor: ActionProcessor,
+    action: Action,
+    delay: float | None = None,
+    jitter: float = 0.0,
+) -> Job:
     """
-    Schedule the action to run at the specified time.
+    Schedule the action to run every `timeBetweenActInSeconds`, first after
+    `delay` seconds (default one interval).
     """
     logger.info(f"Scheduling action: {action}")
-    schedule.every(action.timeBetweenActInSeconds).seconds.do(
-        processor.handle_action, action
+    return scheduler.every(
+        action.timeBetweenActInSeconds,
+        processor.handle_action,
+        action,
+        delay=delay,
+        jitter=jitter,
+    )
+
+
+def schedule_catch_up(
+    scheduler: TimerScheduler,
+    processor: ActionProcessor,
+    catch_up: CatchUp,
+    jitter: float = 0.0,
+) -> Job:
+    """
+    Schedule a single catch-up run of a missed action, up to `jitter`
+    seconds after its spread-out delay.
+    """
+    delay = catch_up.delay + (scheduler.rand(0.0, jitter) if jitter > 0 else 0.0)
+    return scheduler.once(
+        delay, processor.handle_action, catch_up.action, catch_up.window
+    )
+
+
+def first_run_delays(actions: list[Action]) -> list[float]:
+    """
+    Seconds until each action first runs. Actions sharing an interval are
+    spread evenly across it unless SPOTIFY_SCHEDULE_SPREAD is turned off,
+    in which case they all wait one full interval.
+    """
+    intervals = [action.timeBetweenActInSeconds for action in actions]
+    spread = get_env("SPOTIFY_SCHEDULE_SPREAD", "true").lower()
+    if spread not in {"1", "true", "yes"}:
+        return intervals
+    return spread_offsets(intervals)
+
+
+def resume_schedule(
+    actions: list[Action], runs: RunStore, catch_ups: list[CatchUp]
+) -> list[float]:
+    """
+    First-run delays for `actions` picking up from the run store, appending
+    the missed actions to run now to `catch_ups`. The policy for missed runs
+    is SPOTIFY_SCHEDULE_CATCH_UP (default `coalesce`).
+    """
+    policy = CatchUpPolicy(get_env("SPOTIFY_SCHEDULE_CATCH_UP", "coalesce"))
+    delays, missed = resume_delays(
+        actions, first_run_delays(actions), runs, policy, time.time()
     )
+    for catch_up in missed:
+        logger.info(
+            f"Catching up missed run ({policy}) in {catch_up.delay:.0f}s: "
+            f"{catch_up.action}"
+        )
+    catch_ups.extend(missed)
+    return delays
 
 
 def main() -> None:
+    workers = int(get_env("SPOTIFY_ACTION_WORKERS", "1"))
+    executor = (
+        ThreadPoolExecutor(max_workers=workers, thread_name_prefix="action")
+        if workers > 1
+        else None
+    )
+    runs = RunStore()
     processor = ActionProcessor(
-        playlist_service=PlaylistService(SpotifyAccessor(spotifyClient.get_client()))
+        playlist_service=build_playlist_service(),
+        locks=PlaylistLocks() if executor else None,
+        runs=runs,
     )
-    actions = processor.parse_action_file("spotifyActionService/actions.json")
 
     # Setup Schedule
-    for action in actions:
-        schedule_action(processor, action)
+    jitter = float(get_env("SPOTIFY_SCHEDULE_JITTER", "0"))
+    scheduler = TimerScheduler(executor=executor)
+    reloader = ActionReloader(
+        "spotifyActionService/actions.json",
+        scheduler,
+        processor,
+        lambda action, delay: schedule_action(
+            scheduler, processor, action, delay=delay, jitter=jitter
+        ),
+    )
+    catch_ups: list[CatchUp] = []
+    reloader.start(lambda actions: resume_schedule(actions, runs, catch_ups))
+    for catch_up in catch_ups:
+        job = schedule_catch_up(scheduler, processor, catch_up, jitter=jitter)
+        reloader.track_catch_up(catch_up.action, job)
+
+    # Pick up edits to actions.json without a restart
+    reload_seconds = float(get_env("SPOTIFY_ACTIONS_RELOAD_SECONDS", "5"))
+    if reload_seconds > 0:
+        scheduler.every(reload_seconds, reloader.check)
 
-    # Start Schedule
-    while True:
-        schedule.run_pending()
-        time.sleep(SLEEP_TIME_IN_SECONDS)
+    # Start Schedule; SIGTERM lets running actions finish, then exits
+    signal.signal(signal.SIGTERM, lambda signum, frame: scheduler.stop())
+    try:
+        scheduler.run_forever()
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
+    logger.info("Scheduler stopped")
 
 
 if __name__ == "__main__":  # pragma: no cover
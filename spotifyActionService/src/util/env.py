@@ -19,3 +19,10 @@ def get_env(key: str, default: str = None) -> str:
     If not found, returns the default value.
     """
     return os.getenv(key, default)
+
+
+def get_state_dir() -> str:
+    """
+    Returns the directory used for local persistent state such as caches.
+    """
+    return get_env("SPOTIFY_ACTIONS_STATE_DIR", "spotifyActionService/.state")
@@ -1,12 +1,131 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
+import threading
+from typing import Any
 
 from util.env import get_env
 
 # Configure logging
 LOG_LEVEL = get_env("LOG_LEVEL", "INFO").upper()
-logging.basicConfig(
-    level=getattr(logging, LOG_LEVEL),
-    format="%(asctime)s %(levelname)s %(name)s "
-    + "[%(filename)s:%(lineno)d] --- %(message)s",
+# Longest rendering of a payload wrapped in truncate()
+LOG_MAX_CHARS = int(get_env("LOG_MAX_CHARS", "500"))
+# Keep one in every N records of a sampled event (1 keeps everything)
+LOG_SAMPLE_EVERY = int(get_env("LOG_SAMPLE_EVERY", "10"))
+# "text" or "json"
+LOG_FORMAT = get_env("LOG_FORMAT", "text").lower()
+# Hand records to a background thread instead of writing them inline
+LOG_ASYNC = get_env("LOG_ASYNC", "false").lower() in {"1", "true", "yes"}
+
+TEXT_FORMAT = (
+    "%(asctime)s %(levelname)s %(name)s [%(filename)s:%(lineno)d] --- %(message)s"
 )
+
+
+class Truncated:
+    """
+    Log argument that renders `value` only when the record is emitted, cut
+    down to `limit` characters so large API payloads stay cheap to log.
+    """
+
+    __slots__ = ("limit", "value")
+
+    def __init__(self, value: object, limit: int) -> None:
+        self.value = value
+        self.limit = limit
+
+    def _cap(self, text: str) -> str:
+        if len(text) <= self.limit:
+            return text
+        return f"{text[: self.limit]}... ({len(text)} chars)"
+
+    def __str__(self) -> str:
+        return self._cap(str(self.value))
+
+    def __repr__(self) -> str:
+        return self._cap(repr(self.value))
+
+
+def truncate(value: object, limit: int | None = None) -> Truncated:
+    """
+    Wrap a log argument so it is formatted lazily and capped in length.
+    """
+    return Truncated(value, LOG_MAX_CHARS if limit is None else limit)
+
+
+def event(name: str, sampled: bool = False, **fields: object) -> dict[str, Any]:
+    """
+    Build the `extra` for a structured log record. `fields` are emitted as
+    JSON keys by the json formatter; `sampled` events are thinned out by
+    SamplingFilter.
+    """
+    return {"event": name, "sampled": sampled, "fields": fields}
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Passes one in every `every` records of each sampled event, always
+    including the first. Warnings and errors are never dropped.
+    """
+
+    def __init__(self, every: int = LOG_SAMPLE_EVERY) -> None:
+        super().__init__()
+        self.every = max(every, 1)
+        self._counts: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sampled", False) or record.levelno >= logging.WARNING:
+            return True
+        name = getattr(record, "event", record.msg)
+        with self._lock:
+            seen = self._counts.get(name, 0)
+            self._counts[name] = seen + 1
+        return seen % self.every == 0
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line with the event name and its structured fields.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "location": f"{record.filename}:{record.lineno}",
+            "event": getattr(record, "event", None),
+            "message": record.getMessage(),
+            **getattr(record, "fields", {}),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def _use_queue(root: logging.Logger) -> logging.handlers.QueueListener:
+    """
+    Move the root handlers behind a QueueHandler served by a listener thread.
+    """
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(
+        records, *root.handlers, respect_handler_level=True
+    )
+    root.handlers = [logging.handlers.QueueHandler(records)]
+    listener.start()
+    return listener
+
+
+logging.basicConfig(level=getattr(logging, LOG_LEVEL), format=TEXT_FORMAT)
+if LOG_FORMAT == "json":
+    for handler in logging.getLogger().handlers:
+        handler.setFormatter(JsonFormatter())
+if LOG_ASYNC:
+    # Stopping the listener flushes anything still queued at exit
+    atexit.register(_use_queue(logging.getLogger()).stop)
+
 logger = logging.getLogger("SpotifyActionService")
+logger.addFilter(SamplingFilter())
@@ -0,0 +1,17 @@
+from pathlib import Path
+
+from accessor.archiveManifest import ArchiveManifest, Shard
+
+
+def test_get_is_empty_for_unknown_source(tmp_path: Path) -> None:
+    under_test = ArchiveManifest(path=str(tmp_path / "shards.json"))
+    assert under_test.get("src") == []
+
+
+def test_set_then_get_round_trips(tmp_path: Path) -> None:
+    shards = [Shard("p1", "PL-Archive", "snap9"), Shard("p2", "PL-Archive-2")]
+    under_test = ArchiveManifest(path=str(tmp_path / "shards.json"))
+    under_test.set("src", shards)
+    under_test.set("other", [])
+
+    assert ArchiveManifest(path=str(tmp_path / "shards.json")).get("src") == shards
@@ -0,0 +1,213 @@
+import asyncio
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+import pytest
+from accessor.asyncSpotifyAccessor import AsyncSpotifyAccessor, AsyncToken, track_uri
+from accessor.batchWriter import BatchWriter
+from accessor.playlistCache import PlaylistCache
+from accessor.rateLimiter import RateLimiter
+from accessor.watermarkStore import Watermark
+from fakeSpotify import FakeSpotify, make_items
+from fakeSpotifyServer import FakeSpotifyServer, serve
+from models.tracks import format_added_at
+from spotipy.exceptions import SpotifyException
+
+httpx = pytest.importorskip("httpx")
+
+
+def _run(
+    server: FakeSpotifyServer,
+    call: Callable[[AsyncSpotifyAccessor], Awaitable[object]],
+    **kwargs: object,
+) -> object:
+    """Run `call` against the server with a fresh accessor."""
+
+    async def go() -> object:
+        accessor = AsyncSpotifyAccessor(
+            lambda: "token", base_url=server.base_url, **kwargs
+        )
+        try:
+            return await call(accessor)
+        finally:
+            await accessor.aclose()
+
+    return asyncio.run(go())
+
+
+def _liked(fake: FakeSpotify, count: int) -> None:
+    now = time.time()
+    fake.liked = [
+        {"added_at": format_added_at(now - 60 * i), "track": {"id": f"l{i}"}}
+        for i in range(count)
+    ]
+
+
+def test_track_uri() -> None:
+    assert track_uri("abc") == "spotify:track:abc"
+    assert track_uri("spotify:track:abc") == "spotify:track:abc"
+
+
+def test_fetch_playlist_tracks_reads_every_page_in_order() -> None:
+    fake = FakeSpotify()
+    ids = [f"t{i}" for i in range(250)]
+    fake.add_playlist("p", "P", make_items(ids))
+
+    with serve(fake) as server:
+        tracks = _run(server, lambda a: a.fetch_playlist_tracks("p"))
+
+    assert [t.id for t in tracks] == ids
+    assert fake.requests["playlist_items"] == 3
+
+
+def test_fetch_playlist_tracks_uses_cache_for_unchanged_snapshot(
+    tmp_path: Path,
+) -> None:
+    fake = FakeSpotify()
+    fake.add_playlist("p", "P", make_items(["a", "b"]))
+    cache = PlaylistCache(cache_dir=str(tmp_path))
+
+    with serve(fake) as server:
+        for _ in range(2):
+            tracks = _run(server, lambda a: a.fetch_playlist_tracks("p"), cache=cache)
+
+    assert [t.id for t in tracks] == ["a", "b"]
+    assert fake.requests["playlist_items"] == 1
+    assert fake.requests["playlist"] == 2
+
+
+def test_saved_tracks_stop_at_time_window() -> None:
+    fake = FakeSpotify()
+    _liked(fake, 200)  # one a minute, newest first
+
+    with serve(fake) as server:
+        tracks = _run(
+            server,
+            lambda a: a.current_user_saved_tracks(time_in_seconds=60 * 70 + 30),
+        )
+
+    assert [t.id for t in tracks] == [f"l{i}" for i in range(71)]
+    # Pages are read in turn and the walk ends in the second one
+    assert fake.requests["current_user_saved_tracks"] == 2
+
+
+def test_saved_tracks_stop_at_watermark() -> None:
+    fake = FakeSpotify()
+    _liked(fake, 120)
+    mark = fake.liked[5]
+
+    with serve(fake) as server:
+        tracks = _run(
+            server,
+            lambda a: a.current_user_saved_tracks(
+                max_items=None,
+                stop_at=Watermark(added_at=mark["added_at"], track_id="l5"),
+            ),
+        )
+
+    assert [t.id for t in tracks] == ["l0", "l1", "l2", "l3", "l4"]
+
+
+def test_saved_tracks_without_bounds_fetch_up_to_max_items() -> None:
+    fake = FakeSpotify()
+    _liked(fake, 300)
+
+    with serve(fake) as server:
+        tracks = _run(server, lambda a: a.current_user_saved_tracks(max_items=120))
+
+    assert [t.id for t in tracks] == [f"l{i}" for i in range(120)]
+    assert fake.requests["current_user_saved_tracks"] == 3
+
+
+def test_add_tracks_writes_in_order_and_reports_chunks() -> None:
+    fake = FakeSpotify()
+    fake.add_playlist("p", "P", [])
+    ids = [f"t{i}" for i in range(230)]
+    chunks = []
+
+    with serve(fake) as server:
+        result = _run(
+            server,
+            lambda a: a.add_tracks_to_playlist(
+                "p", ids, on_chunk=lambda chunk, total: chunks.append(chunk.items)
+            ),
+        )
+
+    assert fake.track_ids("p") == ids
+    assert [len(c) for c in chunks] == [100, 100, 30]
+    assert result.snapshot_id == "p@4"
+
+
+def test_throttled_requests_are_retried_through_the_rate_limiter() -> None:
+    fake = FakeSpotify()
+    fake.add_playlist("p", "P", make_items(["a"]))
+    limiter = RateLimiter(read_rate=1000, write_rate=1000)
+
+    with serve(fake) as server:
+        server.throttle = 2
+        metadata = _run(
+            server, lambda a: a.get_playlist_metadata("p"), rate_limiter=limiter
+        )
+
+    assert metadata["snapshot_id"] == "p@1"
+    assert limiter.metrics()["throttled"] == 2
+
+
+def test_errors_surface_as_spotify_exceptions() -> None:
+    fake = FakeSpotify()
+    fake.add_playlist("p", "P", [])
+
+    with serve(fake) as server, pytest.raises(SpotifyException) as err:
+        _run(
+            server,
+            lambda a: a.add_tracks_to_playlist("missing", ["a"]),
+            writer=BatchWriter(max_attempts=1),
+        )
+
+    assert err.value.http_status == 404
+
+
+def test_async_token_fetches_off_the_loop_and_reuses_until_expiry() -> None:
+    now = [1000.0]
+    fetched: list[int] = []
+
+    def fetch() -> dict:
+        fetched.append(threading.get_ident())
+        return {"access_token": f"tok{len(fetched)}", "expires_at": 1000 + 3600}
+
+    token = AsyncToken(fetch, clock=lambda: now[0], margin=60)
+
+    async def go() -> list[str]:
+        first = await asyncio.gather(token(), token())
+        now[0] = 1000 + 3600 - 30
+        return [*first, await token()]
+
+    assert asyncio.run(go()) == ["tok1", "tok1", "tok2"]
+    # Spotipy's blocking refresh never runs on the event loop's thread
+    assert threading.get_ident() not in fetched
+
+
+def test_requests_await_an_async_token_source() -> None:
+    seen: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers["Authorization"])
+        return httpx.Response(200, json={"snapshot_id": "s"})
+
+    async def token() -> str:
+        return "fresh"
+
+    async def go() -> None:
+        accessor = AsyncSpotifyAccessor(
+            token, client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        )
+        try:
+            await accessor.get_playlist_metadata("p")
+        finally:
+            await accessor.aclose()
+
+    asyncio.run(go())
+
+    assert seen == ["Bearer fresh"]
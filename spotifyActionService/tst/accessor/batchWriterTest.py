@@ -0,0 +1,132 @@
+from typing import Any
+
+import pytest
+import requests
+from accessor import batchWriter
+from accessor.batchWriter import BatchWriter, ChunkResult
+from spotipy.exceptions import SpotifyException
+
+
+def test_chunk_splits_into_api_sized_pieces() -> None:
+    under_test = BatchWriter()
+    chunks = under_test.chunk([str(i) for i in range(250)])
+    assert [len(c) for c in chunks] == [100, 100, 50]
+    assert chunks[2][-1] == "249"
+
+
+def test_chunk_size_is_capped_at_api_limit() -> None:
+    assert BatchWriter(chunk_size=500).chunk_size == 100
+
+
+def test_write_preserves_order_and_reports_progress() -> None:
+    sent: list[list[str]] = []
+    progress: list[tuple[int, int]] = []
+    under_test = BatchWriter(
+        chunk_size=2,
+        on_chunk=lambda chunk, total: progress.append((chunk.index, total)),
+    )
+
+    def send(items: list[str]) -> dict[str, Any]:
+        sent.append(items)
+        return {"snapshot_id": f"s{len(sent)}"}
+
+    result = under_test.write(["a", "b", "c", "d", "e"], send)
+
+    assert sent == [["a", "b"], ["c", "d"], ["e"]]
+    assert progress == [(0, 3), (1, 3), (2, 3)]
+    assert result.ok
+    assert result.written == ["a", "b", "c", "d", "e"]
+    assert result.snapshot_id == "s3"
+
+
+def test_write_calls_per_write_hook_alongside_writer_hook() -> None:
+    seen: list[str] = []
+    under_test = BatchWriter(
+        chunk_size=2, on_chunk=lambda chunk, total: seen.append("writer")
+    )
+
+    under_test.write(
+        ["a", "b", "c"],
+        lambda items: {},
+        on_chunk=lambda chunk, total: seen.append(f"call {chunk.items}"),
+    )
+
+    assert seen == ["writer", "call ['a', 'b']", "writer", "call ['c']"]
+
+
+def test_write_retries_throttled_chunks(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    sleeps: list[float] = []
+    monkeypatch.setattr(batchWriter.time, "sleep", sleeps.append)
+    failures = {"count": 0}
+
+    def send(items: list[str]) -> dict[str, Any]:
+        if items == ["c"] and failures["count"] < 2:
+            failures["count"] += 1
+            raise SpotifyException(429, -1, "slow down")
+        return {"snapshot_id": items[0]}
+
+    under_test = BatchWriter(chunk_size=2, backoff_seconds=0.5)
+    result = under_test.write(["a", "b", "c"], send)
+
+    assert result.ok
+    assert [c.attempts for c in result.chunks] == [1, 3]
+    assert sleeps == [0.5, 1.0]
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        SpotifyException(503, -1, "unavailable"),
+        requests.Timeout("read timed out"),
+        requests.ConnectionError("reset"),
+    ],
+)
+def test_write_does_not_resend_writes_that_may_have_landed(
+    error: Exception,
+) -> None:
+    calls: list[list[str]] = []
+
+    def send(items: list[str]) -> dict[str, Any]:
+        calls.append(items)
+        raise error
+
+    result = BatchWriter(chunk_size=2).write(["a", "b"], send)
+
+    assert calls == [["a", "b"]]
+    assert result.failed[0].attempts == 1
+
+
+def test_write_continues_after_failed_chunk() -> None:
+    def send(items: list[str]) -> dict[str, Any]:
+        if "b" in items:
+            raise SpotifyException(400, -1, "bad id")
+        return {"snapshot_id": items[0]}
+
+    under_test = BatchWriter(chunk_size=1)
+    result = under_test.write(["a", "b", "c"], send)
+
+    assert not result.ok
+    assert result.written == ["a", "c"]
+    failed: list[ChunkResult] = result.failed
+    assert [c.index for c in failed] == [1]
+    # non-retryable errors are attempted once
+    assert failed[0].attempts == 1
+    assert result.snapshot_id == "c"
+
+
+def test_is_retryable() -> None:
+    assert batchWriter.is_retryable(SpotifyException(429, -1, "slow down"))
+    assert not batchWriter.is_retryable(SpotifyException(404, -1, "missing"))
+    assert not batchWriter.is_retryable(SpotifyException(502, -1, "bad gateway"))
+    assert not batchWriter.is_retryable(requests.Timeout("timed out"))
+    assert not batchWriter.is_retryable(RuntimeError("boom"))
+
+
+def test_is_permanent() -> None:
+    assert batchWriter.is_permanent(SpotifyException(403, -1, "forbidden"))
+    assert batchWriter.is_permanent(SpotifyException(404, -1, "missing"))
+    assert not batchWriter.is_permanent(SpotifyException(429, -1, "slow down"))
+    assert not batchWriter.is_permanent(SpotifyException(502, -1, "bad gateway"))
+    assert not batchWriter.is_permanent(RuntimeError("boom"))
@@ -1,8 +1,9 @@
 import json
+import threading
 from pathlib import Path
 
 import pytest
-from accessor.configLoader import load_json_file
+from accessor.configLoader import load_json_file, save_json_file
 
 
 def test_load_valid_json(tmp_path: Path) -> None:
@@ -47,3 +48,26 @@ def test_propagates_other_io_errors(
 
     with pytest.raises(ZeroDivisionError):
         load_json_file(str(dummy))
+
+
+def test_concurrent_saves_each_use_their_own_temp_file(tmp_path: Path) -> None:
+    path = tmp_path / "state" / "data.json"
+    errors: list[Exception] = []
+
+    def save(writer: int) -> None:
+        for n in range(50):
+            try:
+                save_json_file(str(path), {"writer": writer, "n": n})
+            except OSError as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=save, args=(w,)) for w in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert load_json_file(str(path))["n"] == 49
+    # No temp files are left behind
+    assert [p.name for p in path.parent.iterdir()] == ["data.json"]
@@ -0,0 +1,37 @@
+import logging
+from pathlib import Path
+
+import pytest
+from accessor.jsonStore import JsonStore
+
+
+def test_put_get_and_pop_round_trip(tmp_path: Path) -> None:
+    path = str(tmp_path / "state.json")
+    JsonStore(path)._put("a", {"n": 1})
+    JsonStore(path)._put("b", [1, 2])
+
+    reloaded = JsonStore(path)
+    assert reloaded._get("a") == {"n": 1}
+    reloaded._pop("a")
+    assert JsonStore(path)._get("a") is None
+    assert JsonStore(path)._get("b") == [1, 2]
+
+
+def test_corrupt_file_reads_as_empty(tmp_path: Path) -> None:
+    path = tmp_path / "state.json"
+    path.write_text("{not json")
+    assert JsonStore(str(path))._get("a") is None
+
+
+def test_failed_write_is_logged_not_raised(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    blocker = tmp_path / "blocker"
+    blocker.write_text("")
+    # The parent "directory" is a file, so the write fails with OSError
+    under_test = JsonStore(str(blocker / "state.json"))
+
+    with caplog.at_level(logging.WARNING):
+        under_test._put("a", 1)
+
+    assert "Failed to persist state" in caplog.text
@@ -0,0 +1,78 @@
+from pathlib import Path
+
+from accessor.membershipIndex import MIN_CAPACITY, BloomFilter, MembershipIndex
+
+
+def test_bloom_filter_has_no_false_negatives() -> None:
+    bloom = BloomFilter(capacity=2000)
+    ids = [f"track{i}" for i in range(2000)]
+    for tid in ids:
+        bloom.add(tid)
+
+    assert all(tid in bloom for tid in ids)
+    false_positives = sum(f"other{i}" in bloom for i in range(10000))
+    assert false_positives < 300  # ~1% expected
+
+
+def test_bloom_filter_round_trips_its_bits() -> None:
+    bloom = BloomFilter(capacity=10)
+    bloom.add("a")
+    copy = BloomFilter(capacity=10, bits=bytes(bloom.bits))
+    assert "a" in copy
+    assert copy.capacity == MIN_CAPACITY
+
+
+def test_get_misses_until_rebuilt_at_that_snapshot(tmp_path: Path) -> None:
+    under_test = MembershipIndex(index_dir=str(tmp_path))
+    assert under_test.get("pl1", "s1") is None
+
+    under_test.rebuild("pl1", "s1", ["a", "b"])
+
+    members = under_test.get("pl1", "s1")
+    assert members is not None
+    assert "a" in members
+    assert "c" not in members
+    assert under_test.get("pl1", "s2") is None
+
+
+def test_exact_ids_are_only_read_on_a_possible_match(tmp_path: Path) -> None:
+    under_test = MembershipIndex(index_dir=str(tmp_path))
+    under_test.rebuild("pl1", "s1", ["a"])
+    (tmp_path / "pl1.ids").unlink()
+
+    members = under_test.get("pl1", "s1")
+    # The filter answers on its own for IDs it has never seen
+    assert "never-added" not in members
+
+
+def test_record_moves_index_to_new_snapshot(tmp_path: Path) -> None:
+    under_test = MembershipIndex(index_dir=str(tmp_path))
+    under_test.rebuild("pl1", "s1", ["a"])
+
+    under_test.record("pl1", ["b", "c"], previous_snapshot_id="s1", snapshot_id="s2")
+
+    assert under_test.get("pl1", "s1") is None
+    members = under_test.get("pl1", "s2")
+    assert all(tid in members for tid in ["a", "b", "c"])
+
+
+def test_record_drops_index_changed_elsewhere(tmp_path: Path) -> None:
+    under_test = MembershipIndex(index_dir=str(tmp_path))
+    under_test.rebuild("pl1", "s1", ["a"])
+
+    under_test.record("pl1", ["b"], previous_snapshot_id="s0", snapshot_id="s2")
+
+    assert under_test.get("pl1", "s1") is None
+    assert under_test.get("pl1", "s2") is None
+
+
+def test_record_regrows_filter_past_capacity(tmp_path: Path) -> None:
+    under_test = MembershipIndex(index_dir=str(tmp_path))
+    under_test.rebuild("pl1", "s1", [])
+    ids = [f"t{i}" for i in range(MIN_CAPACITY + 10)]
+
+    under_test.record("pl1", ids, previous_snapshot_id="s1", snapshot_id="s2")
+
+    members = under_test.get("pl1", "s2")
+    assert members.bloom.capacity > MIN_CAPACITY
+    assert all(tid in members for tid in ids)
@@ -0,0 +1,96 @@
+import os
+from pathlib import Path
+
+import pytest
+from accessor.playlistCache import PlaylistCache
+from models.tracks import TrackRef
+
+
+def test_get_miss_when_empty(tmp_path: Path) -> None:
+    under_test = PlaylistCache(cache_dir=str(tmp_path))
+    assert under_test.get("pl1", "snap1") is None
+    assert under_test.stats() == {"hits": 0, "misses": 1, "evictions": 0}
+
+
+def test_put_then_get_same_snapshot_hits(tmp_path: Path) -> None:
+    items = [TrackRef("t1", 1735689600.0), TrackRef("t2", 0.0)]
+    under_test = PlaylistCache(cache_dir=str(tmp_path))
+    under_test.put("pl1", "snap1", items)
+
+    assert under_test.get("pl1", "snap1") == items
+    assert under_test.stats()["hits"] == 1
+
+
+def test_get_with_new_snapshot_misses(tmp_path: Path) -> None:
+    under_test = PlaylistCache(cache_dir=str(tmp_path))
+    under_test.put("pl1", "snap1", [])
+
+    assert under_test.get("pl1", "snap2") is None
+    assert under_test.stats()["misses"] == 1
+
+
+def test_corrupt_entry_is_a_miss(tmp_path: Path) -> None:
+    (tmp_path / "pl1.json").write_text("{ not json", encoding="utf-8")
+    under_test = PlaylistCache(cache_dir=str(tmp_path))
+    assert under_test.get("pl1", "snap1") is None
+
+
+def test_hit_survives_entry_evicted_before_touch(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    items = [TrackRef("t1", 0.0)]
+    under_test = PlaylistCache(cache_dir=str(tmp_path))
+    under_test.put("pl1", "snap1", items)
+
+    def evicted(path: str) -> None:
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(os, "utime", evicted)
+
+    assert under_test.get("pl1", "snap1") == items
+
+
+def test_invalidate_removes_entry(tmp_path: Path) -> None:
+    under_test = PlaylistCache(cache_dir=str(tmp_path))
+    under_test.put("pl1", "snap1", [])
+    under_test.invalidate("pl1")
+    under_test.invalidate("missing")
+    assert under_test.get("pl1", "snap1") is None
+
+
+def test_evicts_least_recently_used_over_size_limit(tmp_path: Path) -> None:
+    items = [TrackRef("t" * 20, 1735689600.0)] * 5
+    under_test = PlaylistCache(cache_dir=str(tmp_path), max_bytes=10**9)
+    under_test.put("old", "s", items)
+    under_test.put("used", "s", items)
+    os.utime(tmp_path / "old.json", (1, 1))
+    os.utime(tmp_path / "used.json", (2, 2))
+    # touching "used" makes "old" the eviction candidate
+    under_test.get("used", "s")
+
+    entry_size = (tmp_path / "old.json").stat().st_size
+    under_test.max_bytes = entry_size * 2 + 16
+    under_test.put("new", "s", items)
+
+    assert not (tmp_path / "old.json").exists()
+    assert (tmp_path / "used.json").exists()
+    assert (tmp_path / "new.json").exists()
+    assert under_test.stats()["evictions"] == 1
+
+
+def test_entry_in_old_format_is_a_miss(tmp_path: Path) -> None:
+    (tmp_path / "pl1.json").write_text(
+        '{"snapshot_id": "snap1", "items": []}', encoding="utf-8"
+    )
+    under_test = PlaylistCache(cache_dir=str(tmp_path))
+    assert under_test.get("pl1", "snap1") is None
+
+
+def test_contains_does_not_count_hits_or_misses(tmp_path: Path) -> None:
+    under_test = PlaylistCache(cache_dir=str(tmp_path))
+    under_test.put("pl1", "snap1", [])
+
+    assert under_test.contains("pl1", "snap1")
+    assert not under_test.contains("pl1", "snap2")
+    assert not under_test.contains("pl2", "snap1")
+    assert under_test.stats() == {"hits": 0, "misses": 0, "evictions": 0}
@@ -0,0 +1,58 @@
+from pathlib import Path
+
+from accessor.playlistIndex import PlaylistNameIndex
+
+
+def test_empty_index_is_stale(tmp_path: Path) -> None:
+    under_test = PlaylistNameIndex(path=str(tmp_path / "idx.json"))
+    assert not under_test.is_fresh("u1")
+    assert under_test.lookup("Anything") is None
+
+
+def test_rebuild_and_case_insensitive_lookup(tmp_path: Path) -> None:
+    under_test = PlaylistNameIndex(path=str(tmp_path / "idx.json"))
+    under_test.rebuild(
+        "u1",
+        [
+            {"name": "Chill", "id": "p1"},
+            {"name": "chill", "id": "p2"},
+            {"name": "Rock", "id": "p3"},
+        ],
+    )
+
+    assert under_test.is_fresh("u1")
+    assert under_test.lookup("CHILL") == "p1"
+    assert under_test.lookup("rock") == "p3"
+    assert under_test.lookup("jazz") is None
+
+
+def test_index_expires_after_ttl(tmp_path: Path) -> None:
+    now = {"t": 1000.0}
+    under_test = PlaylistNameIndex(
+        path=str(tmp_path / "idx.json"), ttl_seconds=60, clock=lambda: now["t"]
+    )
+    under_test.rebuild("u1", [])
+    now["t"] += 59
+    assert under_test.is_fresh("u1")
+    now["t"] += 1
+    assert not under_test.is_fresh("u1")
+
+
+def test_index_belongs_to_one_user(tmp_path: Path) -> None:
+    under_test = PlaylistNameIndex(path=str(tmp_path / "idx.json"))
+    under_test.rebuild("u1", [])
+    assert not under_test.is_fresh("u2")
+
+
+def test_index_persists_and_add_updates_in_place(tmp_path: Path) -> None:
+    path = str(tmp_path / "idx.json")
+    first = PlaylistNameIndex(path=path)
+    first.rebuild("u1", [{"name": "Mix", "id": "p1"}])
+    first.add("Mix-Archive", "p9")
+
+    reloaded = PlaylistNameIndex(path=path)
+    assert reloaded.is_fresh("u1")
+    assert reloaded.lookup("mix-archive") == "p9"
+
+    reloaded.invalidate()
+    assert not PlaylistNameIndex(path=path).is_fresh("u1")
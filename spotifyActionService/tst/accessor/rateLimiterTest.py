@@ -0,0 +1,121 @@
+import threading
+
+import pytest
+from accessor import rateLimiter
+from accessor.rateLimiter import READ, WRITE, RateLimiter, TokenBucket
+from spotipy.exceptions import SpotifyException
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def test_token_bucket_allows_burst_then_spaces_calls() -> None:
+    clock = FakeClock()
+    under_test = TokenBucket(rate=2.0, capacity=2.0, clock=clock)
+
+    assert under_test.reserve() == 0.0
+    assert under_test.reserve() == 0.0
+    assert under_test.reserve() == pytest.approx(0.5)
+    assert under_test.reserve() == pytest.approx(1.0)
+
+    clock.now = 10.0
+    assert under_test.reserve() == 0.0
+
+
+def test_token_bucket_hold_until_delays_next_reservation() -> None:
+    clock = FakeClock()
+    under_test = TokenBucket(rate=1.0, capacity=5.0, clock=clock)
+    under_test.hold_until(3.0)
+
+    assert under_test.reserve() == pytest.approx(4.0)
+
+
+def test_reads_and_writes_use_separate_buckets() -> None:
+    clock = FakeClock()
+    under_test = RateLimiter(
+        read_rate=1.0, write_rate=1.0, burst_seconds=1.0, clock=clock, sleep=clock.sleep
+    )
+
+    assert under_test.acquire(READ) == 0.0
+    assert under_test.acquire(WRITE) == 0.0
+    assert under_test.acquire(READ) == pytest.approx(1.0)
+
+    metrics = under_test.metrics()
+    assert metrics["calls"] == 3
+    assert metrics["total_wait_seconds"] == pytest.approx(1.0)
+    assert metrics["max_queue_depth"] == 1
+    assert metrics["queue_depth"] == 0
+
+
+def test_call_honours_retry_after(monkeypatch: pytest.MonkeyPatch) -> None:
+    clock = FakeClock()
+    under_test = RateLimiter(read_rate=100.0, clock=clock, sleep=clock.sleep)
+    responses = iter(
+        [
+            SpotifyException(429, -1, "slow down", headers={"Retry-After": "7"}),
+            {"ok": True},
+        ]
+    )
+
+    def fake_call() -> dict[str, bool]:
+        result = next(responses)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    assert under_test.call(READ, fake_call) == {"ok": True}
+    assert clock.now == pytest.approx(7.0, abs=0.1)
+    assert under_test.metrics()["throttled"] == 1
+
+
+def test_call_gives_up_after_max_retries() -> None:
+    clock = FakeClock()
+    under_test = RateLimiter(max_retries=1, clock=clock, sleep=clock.sleep)
+
+    def always_throttled() -> None:
+        raise SpotifyException(429, -1, "slow down", headers={"Retry-After": "1"})
+
+    with pytest.raises(SpotifyException):
+        under_test.call(WRITE, always_throttled)
+    assert under_test.metrics()["throttled"] == 1
+
+
+def test_call_does_not_retry_other_errors() -> None:
+    under_test = RateLimiter()
+    calls: list[int] = []
+
+    def not_found() -> None:
+        calls.append(1)
+        raise SpotifyException(404, -1, "missing")
+
+    with pytest.raises(SpotifyException):
+        under_test.call(READ, not_found)
+    assert calls == [1]
+
+
+def test_retry_after_seconds_defaults_when_missing() -> None:
+    err = SpotifyException(429, -1, "slow down")
+    assert rateLimiter.retry_after_seconds(err) == 1.0
+
+
+def test_get_rate_limiter_is_shared(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(rateLimiter, "_shared_limiter", None)
+    limiters: list[RateLimiter] = []
+    threads = [
+        threading.Thread(target=lambda: limiters.append(rateLimiter.get_rate_limiter()))
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len({id(limiter) for limiter in limiters}) == 1
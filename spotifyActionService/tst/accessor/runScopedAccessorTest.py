@@ -0,0 +1,96 @@
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+from accessor.runScopedAccessor import RunScopedAccessor
+from models.tracks import TrackRef
+
+
+class CountingAccessor:
+    def __init__(self) -> None:
+        self.playlists = {"shared": ["a", "b"], "solo": ["x"]}
+        self.fetches: list[str] = []
+        self.fail_writes = False
+
+    def fetch_playlist_tracks(self, pid: str) -> list[TrackRef]:
+        self.fetches.append(pid)
+        return [TrackRef(tid, float(i)) for i, tid in enumerate(self.playlists[pid])]
+
+    def iter_playlist_tracks(self, pid: str) -> Iterator[list[TrackRef]]:
+        yield self.fetch_playlist_tracks(pid)
+
+    def get_playlist_metadata(self, pid: str) -> dict[str, Any]:
+        self.fetches.append(f"meta {pid}")
+        return {"name": pid}
+
+    def add_tracks_to_playlist(
+        self, pid: str, ids: list[str], position: int | None = None
+    ) -> None:
+        if self.fail_writes:
+            raise RuntimeError("API down")
+        self.playlists[pid].extend(ids)
+
+    def get_or_create_playlist_with_name(self, name: str) -> str:
+        return f"id-{name}"
+
+
+def test_shared_playlists_are_fetched_once() -> None:
+    inner = CountingAccessor()
+    under_test = RunScopedAccessor(inner, {"shared"})
+
+    under_test.fetch_playlist_tracks("shared")
+    list(under_test.iter_playlist_tracks("shared"))
+    under_test.get_playlist_metadata("shared")
+    under_test.get_playlist_metadata("shared")
+    under_test.fetch_playlist_tracks("solo")
+    under_test.fetch_playlist_tracks("solo")
+
+    assert inner.fetches == ["shared", "meta shared", "solo", "solo"]
+
+
+def test_writes_update_the_shared_copy() -> None:
+    inner = CountingAccessor()
+    under_test = RunScopedAccessor(inner, {"shared"})
+    under_test.fetch_playlist_tracks("shared")
+
+    under_test.add_tracks_to_playlist("shared", ["c"])
+
+    assert [t.id for t in under_test.fetch_playlist_tracks("shared")] == [
+        "a",
+        "b",
+        "c",
+    ]
+    assert inner.fetches == ["shared"]
+
+
+def test_failed_write_drops_the_shared_copy() -> None:
+    inner = CountingAccessor()
+    under_test = RunScopedAccessor(inner, {"shared"})
+    under_test.fetch_playlist_tracks("shared")
+    inner.fail_writes = True
+
+    with pytest.raises(RuntimeError):
+        under_test.add_tracks_to_playlist("shared", ["c"])
+    under_test.fetch_playlist_tracks("shared")
+
+    assert inner.fetches == ["shared", "shared"]
+
+
+def test_other_calls_are_delegated() -> None:
+    under_test = RunScopedAccessor(CountingAccessor(), set())
+    assert under_test.get_or_create_playlist_with_name("PL") == "id-PL"
+
+
+def test_remember_replaces_the_shared_copy() -> None:
+    inner = CountingAccessor()
+    under_test = RunScopedAccessor(inner, {"shared"})
+    under_test.fetch_playlist_tracks("shared")
+
+    under_test.remember("shared", {"snapshot_id": "s2"}, [TrackRef("c", 0.0)])
+    under_test.remember("solo", {"snapshot_id": "s9"}, [])
+
+    assert [t.id for t in under_test.fetch_playlist_tracks("shared")] == ["c"]
+    assert under_test.get_playlist_metadata("shared") == {"snapshot_id": "s2"}
+    # Only shared playlists are kept
+    assert under_test.get_playlist_metadata("solo") == {"name": "solo"}
+    assert inner.fetches == ["shared", "meta solo"]
@@ -0,0 +1,29 @@
+from pathlib import Path
+
+from accessor.runStore import RunRecord, RunStore
+
+
+def test_get_missing_returns_none(tmp_path: Path) -> None:
+    under_test = RunStore(path=str(tmp_path / "runs.json"))
+    assert under_test.get("sync:s:t") is None
+
+
+def test_record_then_get_persists_per_key(tmp_path: Path) -> None:
+    path = str(tmp_path / "runs.json")
+    assert RunStore(path=path).record("a", 100.0, 30) == RunRecord(100.0, 130.0)
+    RunStore(path=path).record("b", 200.0, 60)
+    RunStore(path=path).record("a", 130.5, 30)
+
+    reloaded = RunStore(path=path)
+    assert reloaded.get("a") == RunRecord(last_run=130.5, next_due=160.5)
+    assert reloaded.get("b") == RunRecord(last_run=200.0, next_due=260.0)
+
+
+def test_record_survives_an_unwritable_file(tmp_path: Path) -> None:
+    blocker = tmp_path / "blocker"
+    blocker.write_text("")
+    under_test = RunStore(path=str(blocker / "runs.json"))
+
+    # A disk error must not replace whatever the action itself raised
+    assert under_test.record("a", 100.0, 30) == RunRecord(100.0, 130.0)
+    assert under_test.get("a") is None
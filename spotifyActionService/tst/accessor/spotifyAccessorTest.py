@@ -1,9 +1,16 @@
 import logging
+import time
+from collections.abc import Callable
 from datetime import UTC, datetime, timedelta
+from pathlib import Path
 from typing import Any
 
 import pytest
+from accessor.playlistCache import PlaylistCache
+from accessor.playlistIndex import PlaylistNameIndex
 from accessor.spotifyAccessor import SpotifyAccessor
+from accessor.watermarkStore import Watermark
+from models.tracks import format_added_at, to_track_refs
 
 
 @pytest.fixture
@@ -117,37 +124,49 @@ def test_fetch_playlist_tracks_single_page(
     under_test = SpotifyAccessor(client=dummy_client, user_id="u999")
     tracks = under_test.fetch_playlist_tracks("pl123")
 
-    assert len(tracks) == 2
-    assert tracks[0]["track"]["id"] == "t1"
-    assert tracks[1]["added_at"] == "2025-01-02T00:00:00Z"
+    assert tracks == to_track_refs(sample_items_page["items"])
+    assert tracks[0].id == "t1"
+    assert format_added_at(tracks[1].added_at) == "2025-01-02T00:00:00Z"
 
 
 def test_fetch_playlist_tracks_multiple_pages(
     dummy_client: object,
 ) -> None:
-    page1 = {"items": [{"added_at": "a", "track": {"id": "1"}}], "next": "url2"}
-    page2 = {"items": [{"added_at": "b", "track": {"id": "2"}}], "next": None}
+    page1 = {
+        "items": [{"added_at": "2025-01-01T00:00:00Z", "track": {"id": "1"}}],
+        "next": "url2",
+    }
+    page2 = {
+        "items": [{"added_at": "2025-01-02T00:00:00Z", "track": {"id": "2"}}],
+        "next": None,
+    }
 
     dummy_client.playlist_items = lambda pid, fields: page1
     dummy_client.next = lambda resp: page2
 
     under_test = SpotifyAccessor(client=dummy_client, user_id="u999")
     tracks = under_test.fetch_playlist_tracks("plX")
-    assert [t["track"]["id"] for t in tracks] == ["1", "2"]
+    assert [t.id for t in tracks] == ["1", "2"]
 
 
 def test_current_user_saved_tracks_multiple_pages(
     dummy_client: object,
 ) -> None:
-    page1 = {"items": [{"added_at": "a", "track": {"id": "1"}}], "next": "url2"}
-    page2 = {"items": [{"added_at": "b", "track": {"id": "2"}}], "next": None}
+    page1 = {
+        "items": [{"added_at": "2025-01-01T00:00:00Z", "track": {"id": "1"}}],
+        "next": "url2",
+    }
+    page2 = {
+        "items": [{"added_at": "2025-01-02T00:00:00Z", "track": {"id": "2"}}],
+        "next": None,
+    }
 
     dummy_client.current_user_saved_tracks = lambda limit: page1
     dummy_client.next = lambda resp: page2
 
     under_test = SpotifyAccessor(client=dummy_client, user_id="u999")
     tracks = under_test.current_user_saved_tracks(max_items=10)
-    assert [t["track"]["id"] for t in tracks] == ["1", "2"]
+    assert [t.id for t in tracks] == ["1", "2"]
 
 
 def test_current_user_saved_tracks_respects_max_items(
@@ -155,19 +174,22 @@ def test_current_user_saved_tracks_respects_max_items(
 ) -> None:
     page1 = {
         "items": [
-            {"added_at": "a", "track": {"id": "1"}},
-            {"added_at": "b", "track": {"id": "2"}},
+            {"added_at": "2025-01-01T00:00:00Z", "track": {"id": "1"}},
+            {"added_at": "2025-01-02T00:00:00Z", "track": {"id": "2"}},
         ],
         "next": "url2",
     }
-    page2 = {"items": [{"added_at": "c", "track": {"id": "3"}}], "next": None}
+    page2 = {
+        "items": [{"added_at": "2025-01-03T00:00:00Z", "track": {"id": "3"}}],
+        "next": None,
+    }
 
     dummy_client.current_user_saved_tracks = lambda limit: page1
     dummy_client.next = lambda resp: page2
 
     under_test = SpotifyAccessor(client=dummy_client, user_id="u999")
     tracks = under_test.current_user_saved_tracks(max_items=2)
-    assert [t["track"]["id"] for t in tracks] == ["1", "2"]
+    assert [t.id for t in tracks] == ["1", "2"]
 
 
 def test_current_user_saved_tracks_respects_time_window(
@@ -190,7 +212,7 @@ def test_current_user_saved_tracks_respects_time_window(
 
     under_test = SpotifyAccessor(client=dummy_client, user_id="u999")
     tracks = under_test.current_user_saved_tracks(time_in_seconds=60, max_items=10)
-    assert [t["track"]["id"] for t in tracks] == ["1"]
+    assert [t.id for t in tracks] == ["1"]
 
 
 def test_add_tracks_to_playlist_success(
@@ -221,6 +243,7 @@ def test_add_tracks_to_playlist_failure(
         under_test.add_tracks_to_playlist("pFAIL", ["1"])
     assert "Failed to add tracks to playlist pFAIL: API down" in caplog.text
 
+
 def test_get_playlist_metadata_success(
     dummy_client: object,
 ) -> None:
@@ -233,6 +256,24 @@ def test_get_playlist_metadata_success(
     assert md["snapshot_id"] == "s1"
 
 
+def test_totals_ask_for_a_single_item(
+    dummy_client: object,
+) -> None:
+    limits: list[int] = []
+
+    def page(limit: int) -> dict[str, Any]:
+        limits.append(limit)
+        return {"items": [], "next": None, "total": 42}
+
+    dummy_client.current_user_saved_tracks = page
+    dummy_client.current_user_playlists = page
+
+    under_test = SpotifyAccessor(client=dummy_client, user_id="u1")
+    assert under_test.saved_tracks_total() == 42
+    assert under_test.user_playlists_total() == 42
+    assert limits == [1, 1]
+
+
 def test_get_playlist_metadata_failure(
     caplog: pytest.LogCaptureFixture,
     dummy_client: object,
@@ -353,3 +394,295 @@ def test_get_or_create_playlist_with_name_creates(
     pid = under_test.get_or_create_playlist_with_name("NewList", public=True)
     assert pid == "created456"
     assert "Playlist 'NewList' not found, creating new one" in caplog.text
+
+
+def test_fetch_playlist_tracks_uses_cache_for_unchanged_snapshot(
+    tmp_path: Path,
+    sample_items_page: dict[str, Any],
+    dummy_client: object,
+) -> None:
+    page_calls: list[str] = []
+
+    def fake_items(pid: str, fields: str) -> dict[str, Any]:
+        page_calls.append(pid)
+        return sample_items_page
+
+    dummy_client.playlist_items = fake_items
+    dummy_client.playlist = lambda pid, fields: {"id": pid, "snapshot_id": "s1"}
+
+    cache = PlaylistCache(cache_dir=str(tmp_path))
+    under_test = SpotifyAccessor(client=dummy_client, user_id="u999", cache=cache)
+    first = under_test.fetch_playlist_tracks("pl123")
+    second = under_test.fetch_playlist_tracks("pl123")
+
+    assert first == second == to_track_refs(sample_items_page["items"])
+    assert page_calls == ["pl123"]
+    assert cache.stats()["hits"] == 1
+
+
+def test_fetch_playlist_tracks_refetches_changed_snapshot(
+    tmp_path: Path,
+    sample_items_page: dict[str, Any],
+    dummy_client: object,
+) -> None:
+    page_calls: list[str] = []
+    snapshots = iter(["s1", "s2"])
+
+    def fake_items(pid: str, fields: str) -> dict[str, Any]:
+        page_calls.append(pid)
+        return sample_items_page
+
+    dummy_client.playlist_items = fake_items
+    dummy_client.playlist = lambda pid, fields: {"snapshot_id": next(snapshots)}
+
+    cache = PlaylistCache(cache_dir=str(tmp_path))
+    under_test = SpotifyAccessor(client=dummy_client, user_id="u999", cache=cache)
+    under_test.fetch_playlist_tracks("pl123")
+    under_test.fetch_playlist_tracks("pl123")
+
+    assert page_calls == ["pl123", "pl123"]
+    assert cache.stats()["misses"] == 2
+
+
+def test_fetch_playlist_tracks_parallel_reassembles_in_order(
+    dummy_client: object,
+) -> None:
+    requested: list[int] = []
+
+    def fake_items(
+        pid: str, fields: str, limit: int = 100, offset: int = 0
+    ) -> dict[str, Any]:
+        assert "total" in fields
+        requested.append(offset)
+        # later offsets answer faster to exercise out-of-order completion
+        time.sleep(0.001 * (1000 - offset) / 100)
+        items = [
+            {"added_at": "2025-01-01T00:00:00Z", "track": {"id": str(i)}}
+            for i in range(offset, min(offset + limit, 1000))
+        ]
+        return {"items": items, "total": 1000, "next": None}
+
+    dummy_client.playlist_items = fake_items
+
+    under_test = SpotifyAccessor(client=dummy_client, user_id="u999", page_workers=4)
+    tracks = under_test.fetch_playlist_tracks("big")
+
+    assert [t.id for t in tracks] == [str(i) for i in range(1000)]
+    assert sorted(requested) == list(range(0, 1000, 100))
+
+
+def test_current_user_saved_tracks_parallel_stops_at_max_items(
+    dummy_client: object,
+) -> None:
+    requested: list[int] = []
+
+    def fake_saved(limit: int, offset: int = 0) -> dict[str, Any]:
+        requested.append(offset)
+        items = [
+            {"added_at": "2025-01-01T00:00:00Z", "track": {"id": str(i)}}
+            for i in range(offset, offset + limit)
+        ]
+        return {"items": items, "total": 5000, "next": "more"}
+
+    dummy_client.current_user_saved_tracks = fake_saved
+
+    under_test = SpotifyAccessor(client=dummy_client, user_id="u999", page_workers=3)
+    tracks = under_test.current_user_saved_tracks(max_items=120)
+
+    assert [t.id for t in tracks] == [str(i) for i in range(120)]
+    # only offsets within max_items are ever requested
+    assert sorted(requested) == [0, 50, 100]
+
+
+def test_add_tracks_to_playlist_chunks_large_writes(
+    dummy_client: object,
+) -> None:
+    calls: list[list[str]] = []
+
+    def fake_add(pid: str, ids: list[str]) -> dict[str, Any]:
+        calls.append(ids)
+        return {"snapshot_id": f"s{len(calls)}"}
+
+    dummy_client.playlist_add_items = fake_add
+    track_ids = [f"t{i}" for i in range(230)]
+
+    under_test = SpotifyAccessor(client=dummy_client, user_id="u999")
+    result = under_test.add_tracks_to_playlist("plBig", track_ids)
+
+    assert [len(c) for c in calls] == [100, 100, 30]
+    assert [tid for c in calls for tid in c] == track_ids
+    assert result.snapshot_id == "s3"
+
+
+def test_calls_go_through_rate_limiter(
+    dummy_client: object,
+) -> None:
+    kinds: list[str] = []
+
+    class RecordingLimiter:
+        def call(
+            self, kind: str, fn: Callable[..., object], *args: object, **kwargs: object
+        ) -> object:
+            kinds.append(kind)
+            return fn(*args, **kwargs)
+
+    under_test = SpotifyAccessor(
+        client=dummy_client, user_id="u999", rate_limiter=RecordingLimiter()
+    )
+    under_test.fetch_playlist_tracks("pl")
+    under_test.add_tracks_to_playlist("pl", ["t1"])
+
+    assert kinds == ["read", "write"]
+
+
+def test_get_playlist_id_by_name_uses_index_without_api_calls(
+    tmp_path: Path,
+    dummy_client: object,
+) -> None:
+    pages: list[int] = []
+
+    def fake_playlists(limit: int) -> dict[str, Any]:
+        pages.append(limit)
+        return {"items": [{"name": "Mix", "id": "p1"}], "next": None}
+
+    dummy_client.current_user_playlists = fake_playlists
+    dummy_client.user_playlist_create = lambda user, name, public: {"id": "new1"}
+
+    index = PlaylistNameIndex(path=str(tmp_path / "idx.json"))
+    under_test = SpotifyAccessor(client=dummy_client, user_id="u1", name_index=index)
+
+    assert under_test.get_playlist_id_by_name("mix") == "p1"
+    assert under_test.get_playlist_id_by_name("Mix") == "p1"
+    assert under_test.get_or_create_playlist_with_name("Mix-Archive") == "new1"
+    assert under_test.get_playlist_id_by_name("Mix-Archive") == "new1"
+    # the library is paged once, to build the index
+    assert pages == [50]
+
+
+def test_iter_playlist_tracks_fetches_pages_lazily(
+    dummy_client: object,
+) -> None:
+    page1 = {
+        "items": [{"added_at": "2025-01-01T00:00:00Z", "track": {"id": "1"}}],
+        "next": "url2",
+    }
+    page2 = {
+        "items": [{"added_at": "2025-01-02T00:00:00Z", "track": {"id": "2"}}],
+        "next": None,
+    }
+    next_calls: list[dict[str, Any]] = []
+
+    def fake_next(resp: dict[str, Any]) -> dict[str, Any]:
+        next_calls.append(resp)
+        return page2
+
+    dummy_client.playlist_items = lambda pid, fields: page1
+    dummy_client.next = fake_next
+
+    under_test = SpotifyAccessor(client=dummy_client, user_id="u999")
+    pages = under_test.iter_playlist_tracks("plX")
+
+    assert next(pages) == to_track_refs(page1["items"])
+    assert next_calls == []
+    assert next(pages) == to_track_refs(page2["items"])
+    assert next_calls == [page1]
+
+
+def test_iter_saved_tracks_yields_pages(
+    dummy_client: object,
+) -> None:
+    page1 = {
+        "items": [{"added_at": "2025-01-01T00:00:00Z", "track": {"id": "1"}}],
+        "next": "url2",
+    }
+    page2 = {
+        "items": [{"added_at": "2025-01-02T00:00:00Z", "track": {"id": "2"}}],
+        "next": None,
+    }
+
+    dummy_client.current_user_saved_tracks = lambda limit: page1
+    dummy_client.next = lambda resp: page2
+
+    under_test = SpotifyAccessor(client=dummy_client, user_id="u999")
+    pages = list(under_test.iter_saved_tracks(max_items=10))
+    assert pages == [to_track_refs(page1["items"]), to_track_refs(page2["items"])]
+
+
+def test_iter_saved_tracks_stops_at_watermark(
+    dummy_client: object,
+) -> None:
+    page1 = {
+        "items": [
+            {"added_at": "2025-01-03T00:00:00Z", "track": {"id": "new"}},
+            {"added_at": "2025-01-02T00:00:00Z", "track": {"id": "seen"}},
+            {"added_at": "2025-01-01T00:00:00Z", "track": {"id": "old"}},
+        ],
+        "next": "url2",
+    }
+    dummy_client.current_user_saved_tracks = lambda limit: page1
+    dummy_client.next = lambda resp: pytest.fail("should stop at the watermark")
+
+    under_test = SpotifyAccessor(client=dummy_client, user_id="u999", page_workers=4)
+    tracks = under_test.current_user_saved_tracks(
+        max_items=None, stop_at=Watermark("2025-01-02T00:00:00Z", "seen")
+    )
+    assert [t.id for t in tracks] == ["new"]
+
+
+def test_add_tracks_at_position_keeps_chunks_contiguous(
+    dummy_client: object,
+) -> None:
+    calls: list[tuple[int | None, int]] = []
+
+    def fake_add(
+        pid: str, ids: list[str], position: int | None = None
+    ) -> dict[str, Any]:
+        calls.append((position, len(ids)))
+        return {"snapshot_id": "s"}
+
+    dummy_client.playlist_add_items = fake_add
+
+    under_test = SpotifyAccessor(client=dummy_client, user_id="u999")
+    under_test.add_tracks_to_playlist("pl", [f"t{i}" for i in range(150)], position=7)
+
+    assert calls == [(7, 100), (107, 50)]
+
+
+def test_remove_track_occurrences_batches_by_position(
+    dummy_client: object,
+) -> None:
+    calls: list[list[dict[str, Any]]] = []
+
+    def fake_remove(pid: str, items: list[dict[str, Any]]) -> dict[str, Any]:
+        calls.append(items)
+        return {"snapshot_id": "s"}
+
+    dummy_client.playlist_remove_specific_occurrences_of_items = fake_remove
+    occurrences = [(f"t{i}", i) for i in reversed(range(120))]
+
+    under_test = SpotifyAccessor(client=dummy_client, user_id="u999")
+    result = under_test.remove_track_occurrences("pl", occurrences)
+
+    assert [len(c) for c in calls] == [100, 20]
+    assert calls[0][0] == {"uri": "t119", "positions": [119]}
+    assert result.ok
+
+
+def test_remove_track_occurrences_chains_pinned_snapshots(
+    dummy_client: object,
+) -> None:
+    pins: list[str] = []
+
+    def fake_remove(
+        pid: str, items: list[dict[str, Any]], snapshot_id: str
+    ) -> dict[str, Any]:
+        pins.append(snapshot_id)
+        return {"snapshot_id": f"after-{len(pins)}"}
+
+    dummy_client.playlist_remove_specific_occurrences_of_items = fake_remove
+    occurrences = [(f"t{i}", i) for i in reversed(range(150))]
+
+    under_test = SpotifyAccessor(client=dummy_client, user_id="u999")
+    under_test.remove_track_occurrences("pl", occurrences, snapshot_id="snap1")
+
+    assert pins == ["snap1", "after-1"]
@@ -0,0 +1,28 @@
+from pathlib import Path
+
+from accessor.watermarkStore import Watermark, WatermarkStore
+
+
+def test_get_missing_returns_none(tmp_path: Path) -> None:
+    under_test = WatermarkStore(path=str(tmp_path / "wm.json"))
+    assert under_test.get("sync_liked::tgt") is None
+
+
+def test_set_then_get_persists_per_key(tmp_path: Path) -> None:
+    path = str(tmp_path / "wm.json")
+    WatermarkStore(path=path).set("a", Watermark("2025-01-01T00:00:00Z", "t1"))
+    WatermarkStore(path=path).set("b", Watermark("2025-01-02T00:00:00Z", "t2"))
+
+    reloaded = WatermarkStore(path=path)
+    assert reloaded.get("a") == Watermark("2025-01-01T00:00:00Z", "t1")
+    assert reloaded.get("b") == Watermark("2025-01-02T00:00:00Z", "t2")
+
+
+def test_set_survives_an_unwritable_file(tmp_path: Path) -> None:
+    blocker = tmp_path / "blocker"
+    blocker.write_text("")
+    under_test = WatermarkStore(path=str(blocker / "wm.json"))
+
+    under_test.set("a", Watermark("2025-01-01T00:00:00Z", "t1"))
+
+    assert under_test.get("a") is None
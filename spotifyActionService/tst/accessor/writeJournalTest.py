@@ -0,0 +1,41 @@
+from pathlib import Path
+
+from accessor.watermarkStore import Watermark
+from accessor.writeJournal import JournalEntry, WriteJournal
+
+
+def test_get_returns_none_without_entry(tmp_path: Path) -> None:
+    under_test = WriteJournal(path=str(tmp_path / "journal.json"))
+    assert under_test.get("sync:a:b") is None
+
+
+def test_commit_trims_pending_until_finished(tmp_path: Path) -> None:
+    under_test = WriteJournal(path=str(tmp_path / "journal.json"))
+    under_test.begin("sync:a:b", JournalEntry(["t1", "t2", "t3"]))
+
+    under_test.commit("sync:a:b", ["t1", "t2"])
+    assert under_test.get("sync:a:b").pending == ["t3"]
+
+    under_test.finish("sync:a:b")
+    assert under_test.get("sync:a:b") is None
+
+
+def test_entry_round_trips_follow_ups(tmp_path: Path) -> None:
+    entry = JournalEntry(
+        ["t1"],
+        watermark=Watermark("2025-01-01T00:00:00Z", "t9"),
+        removal_playlist_id="src",
+        removals=[("t1", 4), ("t2", 0)],
+        removal_snapshot_id="snap",
+    )
+    under_test = WriteJournal(path=str(tmp_path / "journal.json"))
+    under_test.begin("archive:src:", entry)
+
+    assert (
+        WriteJournal(path=str(tmp_path / "journal.json")).get("archive:src:") == entry
+    )
+
+
+def test_entry_from_older_format_ignores_playlist_id() -> None:
+    entry = JournalEntry.from_dict({"playlist_id": "b", "pending": ["t1"]})
+    assert entry == JournalEntry(["t1"])
@@ -0,0 +1,40 @@
+import pytest
+from fakeSpotify import FakeSpotify
+from playlistBench import SCENARIOS, BenchResult, compare, run_action, run_scenario
+
+
+@pytest.mark.parametrize("scenario", list(SCENARIOS))
+def test_scenarios_run_against_the_fake(scenario: str) -> None:
+    result = run_scenario(scenario, 120, repeat=1)
+
+    assert result.requests > 0
+    assert result.peak_bytes > 0
+
+
+@pytest.mark.parametrize("scenario", ["sync", "sync_liked"])
+def test_sync_scenarios_fill_the_target(scenario: str) -> None:
+    client = FakeSpotify()
+    action = SCENARIOS[scenario][0](client, 250, 0.4)
+
+    run_action(client, scenario, action, page_workers=4)
+
+    assert len(set(client.track_ids("target"))) == 250
+
+
+def test_archive_scenario_moves_every_track() -> None:
+    client = FakeSpotify()
+    action = SCENARIOS["archive"][0](client, 250, 0.4)
+
+    run_action(client, "archive", action, page_workers=4)
+
+    assert client.track_ids("source") == []
+    assert len(set(client.track_ids("archive"))) == 250
+
+
+def test_compare_flags_request_and_memory_regressions() -> None:
+    baseline = {"sync-100": {"requests": 5, "seconds": 1.0, "peak_bytes": 1000}}
+    same = BenchResult("sync", 100, 1.01, 5, 1000, 10)
+    worse = BenchResult("sync", 100, 1.01, 6, 2000, 10)
+
+    assert compare([same], baseline, 0.5, 0.2) == []
+    assert len(compare([worse], baseline, 0.5, 0.2)) == 2
@@ -1,7 +1,12 @@
 import os
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, HTTPServer
 
 import dependency.spotifyClient as under_test
 import pytest
+from accessor.rateLimiter import READ, RateLimiter
+from spotipy import Spotify
 
 
 class DummyOAuth:
@@ -12,9 +17,23 @@ class DummyOAuth:
         self.refreshed_with.append(token)
 
 
+@pytest.fixture(autouse=True)
+def _reset_provider() -> Iterator[None]:
+    under_test.get_client_provider().reset()
+    yield
+    under_test.get_client_provider().reset()
+
+
+def _set_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("SPOTIFY_CLIENT_ID", "cid")
+    monkeypatch.setenv("SPOTIFY_CLIENT_SECRET", "secret")
+    monkeypatch.setenv("SPOTIFY_REDIRECT_URI", "uri")
+
+
 class DummySpotify:
-    def __init__(self, auth_manager: DummyOAuth) -> None:
+    def __init__(self, auth_manager: DummyOAuth, **kwargs: object) -> None:
         self.auth_manager = auth_manager
+        self.kwargs = kwargs
 
 
 def test_refresh_token_used_when_cache_missing(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -33,5 +52,131 @@ def test_refresh_token_used_when_cache_missing(monkeypatch: pytest.MonkeyPatch)
     client = under_test.get_client()
     assert client.auth_manager is dummy
     assert dummy.refreshed_with == ["refresh"]
+    # 429s are left to the accessor's rate limiter
+    assert 429 not in client.kwargs["status_forcelist"]
+
+
+def test_get_client_reuses_one_client(monkeypatch: pytest.MonkeyPatch) -> None:
+    _set_env(monkeypatch)
+    monkeypatch.delenv("SPOTIPY_REFRESH_TOKEN", raising=False)
+    built: list[DummyOAuth] = []
+
+    def fake_oauth(**kwargs: object) -> DummyOAuth:
+        built.append(DummyOAuth())
+        return built[-1]
+
+    monkeypatch.setattr(under_test, "SpotifyOAuth", fake_oauth)
+    monkeypatch.setattr(under_test, "Spotify", DummySpotify)
+
+    first = under_test.get_client()
+    second = under_test.get_client()
+
+    assert first is second
+    assert len(built) == 1
+
+
+def test_client_session_uses_configured_pool_size(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _set_env(monkeypatch)
+    monkeypatch.setattr(under_test, "SpotifyOAuth", lambda **kwargs: DummyOAuth())
+    monkeypatch.setattr(under_test, "Spotify", DummySpotify)
+
+    provider = under_test.SpotifyClientProvider(pool_size=7)
+    client = provider.get_client()
+
+    adapter = client.kwargs["requests_session"].get_adapter("https://api.spotify.com")
+    assert adapter._pool_maxsize == 7
+
+
+def test_missing_env_raises(monkeypatch: pytest.MonkeyPatch) -> None:
+    for name in ("SPOTIFY_CLIENT_ID", "SPOTIFY_CLIENT_SECRET", "SPOTIFY_REDIRECT_URI"):
+        monkeypatch.delenv(name, raising=False)
+
+    with pytest.raises(OSError) as exc:
+        under_test.SpotifyClientProvider().get_client()
+    assert "SPOTIFY_CLIENT_ID" in str(exc.value)
+
+
+def test_process_token_cache_reads_backing_once() -> None:
+    class CountingCache(under_test.CacheHandler):
+        def __init__(self) -> None:
+            self.reads = 0
+            self.saved: list[dict] = []
+
+        def get_cached_token(self) -> dict:
+            self.reads += 1
+            return {"access_token": "a"}
+
+        def save_token_to_cache(self, token_info: dict) -> None:
+            self.saved.append(token_info)
+
+    backing = CountingCache()
+    cache = under_test.ProcessTokenCache(backing)
+
+    assert cache.get_cached_token() == {"access_token": "a"}
+    assert cache.get_cached_token() == {"access_token": "a"}
+    assert backing.reads == 1
+
+    cache.save_token_to_cache({"access_token": "b"})
+    assert cache.get_cached_token() == {"access_token": "b"}
+    assert backing.saved == [{"access_token": "b"}]
+
+
+class ThrottleOnceHandler(BaseHTTPRequestHandler):
+    """Answers the first request with a 429 and the rest with an empty object."""
+
+    requests_seen = 0
+
+    def log_message(self, format: str, *args: object) -> None:
+        """Keep test output quiet."""
+
+    def do_GET(self) -> None:
+        type(self).requests_seen += 1
+        if self.requests_seen == 1:
+            self.send_response(429)
+            self.send_header("Retry-After", "7")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+
+def test_session_leaves_429s_to_the_rate_limiter() -> None:
+    ThrottleOnceHandler.requests_seen = 0
+    server = HTTPServer(("127.0.0.1", 0), ThrottleOnceHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        client = Spotify(
+            auth="token",
+            requests_session=under_test.SpotifyClientProvider()._build_session(),
+            status_forcelist=under_test.SERVER_ERROR_STATUSES,
+        )
+        client.prefix = f"http://127.0.0.1:{server.server_address[1]}/v1/"
+        slept: list[float] = []
+        limiter = RateLimiter(clock=lambda: 0.0, sleep=slept.append)
+
+        assert limiter.call(READ, client.me) == {}
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # One 429 and the retry; the session itself neither retried nor slept
+    assert ThrottleOnceHandler.requests_seen == 2
+    assert limiter.metrics()["throttled"] == 1
+    # The retry waited out the Retry-After the limiter received
+    [wait] = slept
+    assert wait >= 7.0
+
 
+def test_session_retries_server_errors_on_reads_only() -> None:
+    session = under_test.SpotifyClientProvider()._build_session()
+    retry = session.get_adapter("https://api.spotify.com").max_retries
 
+    assert retry.is_retry("GET", 503)
+    # A write may have landed before the 5xx; resending could duplicate it
+    assert not retry.is_retry("POST", 503)
+    assert not retry.is_retry("DELETE", 502)
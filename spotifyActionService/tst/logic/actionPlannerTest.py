@@ -0,0 +1,169 @@
+from typing import Any
+
+from logic.actionPlanner import (
+    ActionPlanner,
+    format_plan,
+    pages,
+    request_timeline,
+)
+from models.actions import ArchiveAction, SyncAction, SyncLikedAction
+
+
+class FakeAccessor:
+    """Answers only the read-only calls the planner makes."""
+
+    cache = None
+    name_index = None
+    user_id = "u1"
+
+    def __init__(self, totals: dict[str, int]) -> None:
+        self.totals = totals
+        self.writes: list[str] = []
+
+    def get_playlist_metadata(self, pid: str) -> dict[str, Any]:
+        return {"name": pid, "snapshot_id": "s1", "tracks": {"total": self.totals[pid]}}
+
+    def saved_tracks_total(self) -> int:
+        return self.totals["liked"]
+
+    def user_playlists_total(self) -> int:
+        return self.totals["library"]
+
+    def add_tracks_to_playlist(self, pid: str, ids: list[str]) -> None:
+        self.writes.append(pid)
+
+
+def test_pages_is_at_least_one() -> None:
+    assert pages(0, 100) == 1
+    assert pages(100, 100) == 1
+    assert pages(101, 100) == 2
+
+
+def test_plan_sync_counts_pages_and_write_batches() -> None:
+    accessor = FakeAccessor({"src": 250, "tgt": 0})
+    action = SyncAction(type="sync", source_playlist_id="src", target_playlist_id="tgt")
+
+    plan = ActionPlanner(accessor).plan(action)
+
+    # metadata + 3 pages for the source, metadata + 1 empty page for the target
+    assert plan.read_requests == 4 + 2
+    assert plan.write_requests == 3
+    assert accessor.writes == []
+
+
+def test_plan_mirror_adds_removals_and_moves() -> None:
+    accessor = FakeAccessor({"src": 10, "tgt": 5})
+    action = SyncAction(
+        type="sync", source_playlist_id="src", target_playlist_id="tgt", mirror=True
+    )
+
+    plan = ActionPlanner(accessor).plan(action)
+
+    # one removal batch, up to 5 single-item moves, one add batch
+    assert plan.write_requests == 1 + 5 + 1
+
+
+def test_plan_sync_liked_caps_at_max_tracks() -> None:
+    accessor = FakeAccessor({"tgt": 0, "liked": 5000})
+    action = SyncLikedAction(
+        type="sync_liked", target_playlist_id="tgt", max_tracks=120
+    )
+
+    plan = ActionPlanner(accessor).plan(action)
+
+    # target metadata + page, then 1 + 3 saved-track pages of 50
+    assert plan.read_requests == 2 + 4
+    assert plan.write_requests == 2
+
+
+def test_plan_archive_looks_up_archive_playlist() -> None:
+    accessor = FakeAccessor({"src": 30, "library": 120})
+    action = ArchiveAction(
+        type="archive",
+        source_playlist_id="src",
+        target_playlist_id=None,
+        archive_after_seconds=0,
+    )
+
+    plan = ActionPlanner(accessor).plan(action)
+
+    assert any("over 120 playlists" in entry for entry in plan.reads)
+    # create, archive batch, removal batch
+    assert plan.write_requests == 1 + 1 + 1
+
+
+def test_plan_archive_into_target_skips_lookup() -> None:
+    accessor = FakeAccessor({"src": 30})
+    action = ArchiveAction(
+        type="archive", source_playlist_id="src", target_playlist_id="arch"
+    )
+
+    plan = ActionPlanner(accessor).plan(action)
+
+    assert not any("lookup" in entry for entry in plan.reads)
+    assert plan.write_requests == 1
+
+
+def test_format_plan_warns_when_schedule_exceeds_budget() -> None:
+    accessor = FakeAccessor({"src": 1000, "tgt": 0})
+    action = SyncAction(
+        type="sync",
+        source_playlist_id="src",
+        target_playlist_id="tgt",
+        timeBetweenActInSeconds=1,
+    )
+    plans = ActionPlanner(accessor).plan_all([action])
+
+    report = format_plan(plans, read_rate=10, write_rate=5, scheduled=True)
+    assert "every 1s" in report
+    assert "WARNING" in report
+
+    report = format_plan(plans, read_rate=100, write_rate=100, scheduled=True)
+    assert "WARNING" not in report
+
+
+def test_format_plan_run_once_reports_totals() -> None:
+    accessor = FakeAccessor({"src": 100, "tgt": 0})
+    action = SyncAction(type="sync", source_playlist_id="src", target_playlist_id="tgt")
+    plans = ActionPlanner(accessor).plan_all([action])
+
+    report = format_plan(plans, read_rate=2, write_rate=1, scheduled=False)
+    assert "Total: 4 reads, up to 1 writes (at least 2.0s" in report
+
+
+def _scheduled_sync_plans(count: int, interval: int) -> list:
+    accessor = FakeAccessor({"src": 100, "tgt": 0})
+    action = SyncAction(
+        type="sync",
+        source_playlist_id="src",
+        target_playlist_id="tgt",
+        timeBetweenActInSeconds=interval,
+    )
+    return ActionPlanner(accessor).plan_all([action] * count)
+
+
+def test_request_timeline_counts_requests_when_actions_fire() -> None:
+    # 4 reads and 1 write each
+    plans = _scheduled_sync_plans(3, 30)
+
+    spread = request_timeline(plans, [10, 20, 30], horizon=60, bucket=10)
+    together = request_timeline(plans, [30, 30, 30], horizon=60, bucket=10)
+
+    assert spread == {0: 5, 1: 5, 2: 5, 3: 5, 4: 5, 5: 5}
+    assert together == {2: 15, 5: 15}
+
+
+def test_format_plan_shows_load_over_time_when_first_runs_given() -> None:
+    plans = _scheduled_sync_plans(3, 30)
+
+    report = format_plan(
+        plans, read_rate=10, write_rate=5, scheduled=True, first_runs=[10, 20, 30]
+    )
+
+    assert "Requests over the first 30s" in report
+    assert "Busiest second: 5 requests (15 if every action started together)" in (
+        report
+    )
+    assert "Requests over" not in format_plan(
+        plans, read_rate=10, write_rate=5, scheduled=True
+    )
@@ -0,0 +1,138 @@
+from pathlib import Path
+from typing import Any
+
+from accessor.archiveManifest import ArchiveManifest, Shard
+from accessor.batchWriter import BatchResult, ChunkResult
+from accessor.membershipIndex import MembershipIndex
+from logic.archiveShards import ArchiveShards, shard_name
+from models.tracks import TrackRef
+
+
+class FakeLibrary:
+    """Playlists by ID and name, with snapshots that move on every write."""
+
+    def __init__(self, playlists: dict[str, list[str]] | None = None) -> None:
+        self.tracks: dict[str, list[str]] = {}
+        self.names: dict[str, str] = {}
+        self.snapshots: dict[str, int] = {}
+        self.fetched: list[str] = []
+        for name, ids in (playlists or {}).items():
+            self.create(name, ids)
+
+    def create(self, name: str, ids: list[str] | None = None) -> str:
+        playlist_id = f"id-{name}"
+        self.names[name] = playlist_id
+        self.tracks[playlist_id] = list(ids or [])
+        self.snapshots[playlist_id] = 1
+        return playlist_id
+
+    def get_playlist_metadata(self, pid: str) -> dict[str, Any]:
+        return {
+            "snapshot_id": f"{pid}@{self.snapshots[pid]}",
+            "tracks": {"total": len(self.tracks[pid])},
+        }
+
+    def get_playlist_id_by_name(self, name: str) -> str | None:
+        return self.names.get(name)
+
+    def get_or_create_playlist_with_name(self, name: str) -> str:
+        return self.names.get(name) or self.create(name)
+
+    def fetch_playlist_tracks(self, pid: str) -> list[TrackRef]:
+        self.fetched.append(pid)
+        return [TrackRef(tid, 0.0) for tid in self.tracks[pid]]
+
+    def add_tracks_to_playlist(self, pid: str, ids: list[str]) -> BatchResult:
+        self.tracks[pid].extend(ids)
+        self.snapshots[pid] += 1
+        snapshot = self.get_playlist_metadata(pid)["snapshot_id"]
+        return BatchResult([ChunkResult(0, ids, response={"snapshot_id": snapshot})])
+
+
+def test_shard_names() -> None:
+    assert shard_name("PL-Archive", 1) == "PL-Archive"
+    assert shard_name("PL-Archive", 3) == "PL-Archive-3"
+
+
+def test_add_rolls_over_into_numbered_shards(tmp_path: Path) -> None:
+    library = FakeLibrary({"PL-Archive": ["a", "b"]})
+    manifest = ArchiveManifest(path=str(tmp_path / "shards.json"))
+
+    archive = ArchiveShards.for_source(
+        library, "src", "PL-Archive", manifest=manifest, limit=3
+    )
+    archive.add(["c", "d", "e", "f", "g"])
+
+    assert library.tracks == {
+        "id-PL-Archive": ["a", "b", "c"],
+        "id-PL-Archive-2": ["d", "e", "f"],
+        "id-PL-Archive-3": ["g"],
+    }
+    shards = manifest.get("src")
+    assert [s.name for s in shards] == ["PL-Archive", "PL-Archive-2", "PL-Archive-3"]
+    assert shards[0].sealed_snapshot_id == "id-PL-Archive@2"
+    assert shards[-1].sealed_snapshot_id is None
+
+
+def test_discovers_existing_shards_by_name() -> None:
+    library = FakeLibrary({"PL-Archive": ["a"], "PL-Archive-2": ["b"]})
+
+    archive = ArchiveShards.for_source(library, "src", "PL-Archive")
+
+    assert archive.active.playlist_id == "id-PL-Archive-2"
+    assert archive.total == 1
+
+
+def test_duplicate_checks_only_read_the_active_shard(tmp_path: Path) -> None:
+    library = FakeLibrary({"PL-Archive": ["a", "b"]})
+    manifest = ArchiveManifest(path=str(tmp_path / "shards.json"))
+    membership = MembershipIndex(index_dir=str(tmp_path / "membership"))
+
+    first = ArchiveShards.for_source(
+        library, "src", "PL-Archive", manifest, membership, limit=2
+    )
+    first.members()
+    first.add(["c"])
+    library.fetched.clear()
+
+    second = ArchiveShards.for_source(
+        library, "src", "PL-Archive", manifest, membership, limit=2
+    )
+    members = second.members()
+
+    assert all(tid in members for tid in ["a", "b", "c"])
+    assert "z" not in members
+    # Both shards are answered from the index; nothing is paged
+    assert library.fetched == []
+
+
+def test_sealed_shard_without_index_is_read_once(tmp_path: Path) -> None:
+    library = FakeLibrary({"PL-Archive": ["a"], "PL-Archive-2": ["b"]})
+    manifest = ArchiveManifest(path=str(tmp_path / "shards.json"))
+    manifest.set(
+        "src",
+        [
+            Shard("id-PL-Archive", "PL-Archive"),
+            Shard("id-PL-Archive-2", "PL-Archive-2"),
+        ],
+    )
+    membership = MembershipIndex(index_dir=str(tmp_path / "membership"))
+
+    for _ in range(2):
+        members = ArchiveShards.for_source(
+            library, "src", "PL-Archive", manifest, membership
+        ).members()
+        assert "a" in members
+
+    assert library.fetched == ["id-PL-Archive", "id-PL-Archive-2"]
+    assert manifest.get("src")[0].sealed_snapshot_id == "id-PL-Archive@1"
+
+
+def test_single_target_never_rolls_over() -> None:
+    library = FakeLibrary({"Mine": []})
+
+    archive = ArchiveShards.single(library, "id-Mine")
+    archive.add([f"t{i}" for i in range(5)])
+
+    assert len(library.tracks["id-Mine"]) == 5
+    assert len(library.tracks) == 1
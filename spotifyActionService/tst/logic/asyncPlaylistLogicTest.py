@@ -0,0 +1,148 @@
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+from accessor.asyncSpotifyAccessor import AsyncSpotifyAccessor
+from accessor.watermarkStore import WatermarkStore
+from accessor.writeJournal import JournalEntry, WriteJournal
+from fakeSpotify import FakeSpotify, make_items
+from fakeSpotifyServer import serve
+from logic.asyncPlaylistLogic import AsyncPlaylistService
+from models.actions import ActionType, ArchiveAction, SyncAction, SyncLikedAction
+from models.tracks import format_added_at
+from spotipy.exceptions import SpotifyException
+
+pytest.importorskip("httpx")
+
+
+def _run_action(
+    fake: FakeSpotify, method: str, action: object, **service_kwargs: object
+) -> None:
+    with serve(fake) as server:
+
+        async def go() -> None:
+            accessor = AsyncSpotifyAccessor(lambda: "token", base_url=server.base_url)
+            try:
+                service = AsyncPlaylistService(accessor, **service_kwargs)
+                await getattr(service, method)(action)
+            finally:
+                await accessor.aclose()
+
+        asyncio.run(go())
+
+
+def test_supports_only_additive_actions() -> None:
+    assert AsyncPlaylistService.supports(
+        SyncAction(type=ActionType.SYNC, source_playlist_id="s", target_playlist_id="t")
+    )
+    assert not AsyncPlaylistService.supports(
+        SyncAction(
+            type=ActionType.SYNC,
+            source_playlist_id="s",
+            target_playlist_id="t",
+            mirror=True,
+        )
+    )
+    assert AsyncPlaylistService.supports(
+        SyncLikedAction(type=ActionType.SYNC_LIKED, target_playlist_id="t")
+    )
+    assert AsyncPlaylistService.supports(
+        ArchiveAction(
+            type=ActionType.ARCHIVE, source_playlist_id="s", target_playlist_id="t"
+        )
+    )
+    assert not AsyncPlaylistService.supports(
+        ArchiveAction(type=ActionType.ARCHIVE, source_playlist_id="s")
+    )
+
+
+def test_sync_playlists_adds_missing_tracks_in_source_order() -> None:
+    fake = FakeSpotify()
+    fake.add_playlist("src", "Source", make_items(["a", "b", "c", "b", "d"]))
+    fake.add_playlist("tgt", "Target", make_items(["c"]))
+    action = SyncAction(
+        type=ActionType.SYNC, source_playlist_id="src", target_playlist_id="tgt"
+    )
+
+    _run_action(fake, "sync_playlists", action)
+
+    assert fake.track_ids("tgt") == ["c", "a", "b", "d"]
+
+
+def test_sync_liked_tracks_advances_watermark(tmp_path: Path) -> None:
+    fake = FakeSpotify()
+    now = time.time()
+    fake.liked = [
+        {"added_at": format_added_at(now - i), "track": {"id": tid}}
+        for i, tid in enumerate(["new", "old"])
+    ]
+    fake.add_playlist("tgt", "Target", make_items(["old"]))
+    watermarks = WatermarkStore(path=str(tmp_path / "watermarks.json"))
+    action = SyncLikedAction(
+        type=ActionType.SYNC_LIKED,
+        target_playlist_id="tgt",
+        timeBetweenActInSeconds=3600,
+    )
+
+    _run_action(fake, "sync_liked_tracks", action, watermarks=watermarks)
+
+    assert fake.track_ids("tgt") == ["old", "new"]
+    assert watermarks.get(action.key()).track_id == "new"
+
+    # Nothing newer than the watermark: nothing is added
+    _run_action(fake, "sync_liked_tracks", action, watermarks=watermarks)
+    assert fake.track_ids("tgt") == ["old", "new"]
+
+
+def test_archive_playlists_copies_recent_tracks() -> None:
+    fake = FakeSpotify()
+    old = make_items(["old"], start=time.time() - 7200)
+    recent = make_items(["r1", "r2"], start=time.time() - 60)
+    fake.add_playlist("src", "Source", old + recent)
+    fake.add_playlist("arc", "Archive", make_items(["r1"]))
+    action = ArchiveAction(
+        type=ActionType.ARCHIVE,
+        source_playlist_id="src",
+        target_playlist_id="arc",
+        timeBetweenActInSeconds=3600,
+    )
+
+    _run_action(fake, "archive_playlists", action)
+
+    assert fake.track_ids("arc") == ["r1", "r2"]
+    # Copying leaves the source alone
+    assert fake.track_ids("src") == ["old", "r1", "r2"]
+
+
+def test_interrupted_write_is_resumed_from_the_journal(tmp_path: Path) -> None:
+    fake = FakeSpotify()
+    fake.add_playlist("src", "Source", make_items(["a", "b", "c"]))
+    fake.add_playlist("tgt", "Target", make_items(["a"]))
+    action = SyncAction(
+        type=ActionType.SYNC, source_playlist_id="src", target_playlist_id="tgt"
+    )
+    journal = WriteJournal(path=str(tmp_path / "journal.json"))
+    journal.begin(action.key(), JournalEntry(["c"]))
+
+    _run_action(fake, "sync_playlists", action, journal=journal)
+
+    # Only the journaled remainder is written; the diff is not recomputed
+    assert fake.track_ids("tgt") == ["a", "c"]
+    assert journal.get(action.key()) is None
+
+
+def test_journaled_write_to_a_missing_playlist_is_dropped(tmp_path: Path) -> None:
+    fake = FakeSpotify()
+    fake.add_playlist("src", "Source", make_items(["a"]))
+    action = SyncAction(
+        type=ActionType.SYNC, source_playlist_id="src", target_playlist_id="gone"
+    )
+    journal = WriteJournal(path=str(tmp_path / "journal.json"))
+    journal.begin(action.key(), JournalEntry(["a"]))
+
+    with pytest.raises(SpotifyException):
+        _run_action(fake, "sync_playlists", action, journal=journal)
+
+    # The 404 will never go away, so the next run must start afresh
+    assert journal.get(action.key()) is None
@@ -0,0 +1,95 @@
+import random
+
+import pytest
+from logic.playlistDiff import Insertion, Move, PlaylistDiff, Removal, diff_playlists
+
+
+def _apply(target: list[str], diff: PlaylistDiff) -> list[str]:
+    """Replay a diff the way the Web API would apply it."""
+    result = list(target)
+    for removal in diff.removals:
+        assert result[removal.position] == removal.track_id
+        del result[removal.position]
+    for move in diff.moves:
+        move.apply(result)
+    for insertion in diff.insertions:
+        result[insertion.position : insertion.position] = insertion.track_ids
+    return result
+
+
+def test_identical_playlists_need_no_writes() -> None:
+    assert diff_playlists(["a", "b", "c"], ["a", "b", "c"]).is_empty
+
+
+def test_appends_missing_tracks_as_one_run() -> None:
+    diff = diff_playlists(["a", "b", "c", "d"], ["a", "b"])
+    assert diff == PlaylistDiff(insertions=[Insertion(2, ["c", "d"])])
+
+
+def test_removes_extras_highest_position_first() -> None:
+    diff = diff_playlists(["a"], ["x", "a", "y", "a"])
+    assert diff.removals == [Removal("a", 3), Removal("y", 2), Removal("x", 0)]
+    assert diff.moves == []
+
+
+def test_moves_only_tracks_off_the_longest_ordered_run() -> None:
+    diff = diff_playlists(["a", "b", "c", "d"], ["d", "a", "b", "c"])
+    assert diff == PlaylistDiff(moves=[Move(range_start=0, insert_before=4)])
+
+
+def test_keeps_duplicates_in_source() -> None:
+    source = ["a", "b", "a"]
+    diff = diff_playlists(source, ["a"])
+    assert _apply(["a"], diff) == source
+    assert diff.added == 2
+
+
+def test_moves_neighbouring_tracks_in_one_request() -> None:
+    diff = diff_playlists(["a", "b", "c", "d", "e"], ["d", "e", "a", "b", "c"])
+    assert diff == PlaylistDiff(
+        moves=[Move(range_start=0, insert_before=5, range_length=2)]
+    )
+
+
+def test_reversed_playlist_needs_one_move_per_track() -> None:
+    source = [f"t{i}" for i in range(6)]
+    diff = diff_playlists(source, source[::-1])
+    assert len(diff.moves) == 5
+    assert _apply(source[::-1], diff) == source
+
+
+def test_move_apply_matches_the_web_api() -> None:
+    items = list("abcdef")
+    Move(range_start=1, insert_before=5, range_length=2).apply(items)
+    assert items == list("adebcf")
+    Move(range_start=3, insert_before=0, range_length=2).apply(items)
+    assert items == list("bcadef")
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_random_playlists_are_mirrored_exactly(seed: int) -> None:
+    rng = random.Random(seed)
+    pool = [f"t{i}" for i in range(12)]
+    source = [rng.choice(pool) for _ in range(rng.randint(0, 20))]
+    target = [rng.choice(pool) for _ in range(rng.randint(0, 20))]
+
+    assert _apply(target, diff_playlists(source, target)) == source
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_random_permutations_are_sorted_in_few_moves(seed: int) -> None:
+    rng = random.Random(seed)
+    source = [f"t{i}" for i in range(rng.randint(0, 60))]
+    # Shuffle a few blocks around, as a manual reorder in the app would
+    target = list(source)
+    for _ in range(3):
+        start = rng.randrange(len(target) + 1)
+        block = target[start : start + rng.randint(1, 10)]
+        del target[start : start + len(block)]
+        at = rng.randrange(len(target) + 1)
+        target[at:at] = block
+
+    diff = diff_playlists(source, target)
+
+    assert _apply(target, diff) == source
+    assert len(diff.moves) <= 6
@@ -1,38 +1,46 @@
 import logging
+from collections.abc import Callable, Iterator
 from datetime import UTC, datetime, timedelta
+from pathlib import Path
 from typing import Any
 
-import logic.playlistLogic as playlistLogic
 import pytest
+from accessor.batchWriter import BatchResult, ChunkResult
+from accessor.membershipIndex import MembershipIndex
+from accessor.watermarkStore import Watermark, WatermarkStore
+from accessor.writeJournal import JournalEntry, WriteJournal
 from logic.playlistLogic import PlaylistService
 from models.actions import ArchiveAction, SyncAction, SyncLikedAction
+from models.tracks import TrackRef, move_items, parse_added_at
+from spotipy.exceptions import SpotifyException
 
-# Helper to stub out map_to_id_set to use 'id' key
 
+def _refs(*ids: str) -> list[TrackRef]:
+    return [TrackRef(tid) for tid in ids]
+
+
+def _epoch(added_at: str) -> float:
+    return parse_added_at(added_at).timestamp()
 
-def _stub_id_map(monkeypatch: pytest.MonkeyPatch) -> None:
-    # stub out the real mapper to use item['id']
-    monkeypatch.setattr(
-        playlistLogic,
-        "map_to_id_set",
-        lambda items: {item["id"] for item in items},
-    )
+
+class PagingAccessor:
+    """Serves iter_playlist_tracks from fetch_playlist_tracks as one page."""
+
+    def iter_playlist_tracks(self, pid: str) -> Iterator[list[TrackRef]]:
+        yield self.fetch_playlist_tracks(pid)
 
 
 # ------------------ Sync Tests ------------------
 
 
-def test_sync_playlists_no_new(
-    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
-) -> None:
+def test_sync_playlists_no_new(caplog: pytest.LogCaptureFixture) -> None:
     caplog.set_level(logging.INFO)
     action = SyncAction(type="sync", source_playlist_id="src", target_playlist_id="tgt")
-    _stub_id_map(monkeypatch)
 
-    class DummyAccessor:
-        def fetch_playlist_tracks(self, pid: str) -> list[dict[str, Any]]:
+    class DummyAccessor(PagingAccessor):
+        def fetch_playlist_tracks(self, pid: str) -> list[TrackRef]:
             # both playlists have same two tracks
-            return [{"id": "a"}, {"id": "b"}]
+            return _refs("a", "b")
 
         def add_tracks_to_playlist(self, pid: str, ids: list[str]) -> None:
             pytest.skip("No tracks should be added")
@@ -42,16 +50,15 @@ def test_sync_playlists_no_new(
     assert "No new tracks to add to target playlist." in caplog.text
 
 
-def test_sync_playlists_adds_new(monkeypatch: pytest.MonkeyPatch) -> None:
+def test_sync_playlists_adds_new() -> None:
     action = SyncAction(type="sync", source_playlist_id="src", target_playlist_id="tgt")
-    _stub_id_map(monkeypatch)
     calls: list[list[str]] = []
 
-    class DummyAccessor:
-        def fetch_playlist_tracks(self, pid: str) -> list[dict[str, Any]]:
+    class DummyAccessor(PagingAccessor):
+        def fetch_playlist_tracks(self, pid: str) -> list[TrackRef]:
             if pid == action.source_playlist_id:
-                return [{"id": "1"}, {"id": "2"}, {"id": "3"}]
-            return [{"id": "2"}]
+                return _refs("1", "2", "3")
+            return _refs("2")
 
         def add_tracks_to_playlist(self, pid: str, ids: list[str]) -> None:
             calls.append(ids)
@@ -69,28 +76,23 @@ def test_sync_playlists_adds_new(monkeypatch: pytest.MonkeyPatch) -> None:
 def test_filter_items_after_time() -> None:
     # Use real datetime.now to test offset
     now = datetime.now(UTC)
-    older = (now - timedelta(seconds=60)).isoformat().replace("+00:00", "Z")
-    newer = (now - timedelta(seconds=30)).isoformat().replace("+00:00", "Z")
     items = [
-        {"added_at": older, "id": "old"},
-        {"added_at": newer, "id": "new"},
+        TrackRef("old", (now - timedelta(seconds=60)).timestamp()),
+        TrackRef("new", (now - timedelta(seconds=30)).timestamp()),
     ]
     service = PlaylistService(object())  # accessor unused
     filtered = service.filter_items_after_time(items, time_in_seconds=45)
     # Only 'new' is within last 45 seconds
     assert len(filtered) == 1
-    assert filtered[0]["id"] == "new"
+    assert filtered[0].id == "new"
 
 
 # ------------------ Sync Liked Tests ------------------
 
 
-def test_sync_liked_tracks_filters_and_adds(
-    monkeypatch: pytest.MonkeyPatch,
-) -> None:
-    _stub_id_map(monkeypatch)
-    liked_items = [{"id": "new", "added_at": "2025-01-01T00:00:00Z"}]
-    target_items = [{"id": "old"}]
+def test_sync_liked_tracks_filters_and_adds() -> None:
+    liked_items = [TrackRef("new", _epoch("2025-01-01T00:00:00Z"))]
+    target_items = _refs("old")
 
     action = SyncLikedAction(type="sync_liked", target_playlist_id="tgt")
     action.timeBetweenActInSeconds = 60
@@ -98,14 +100,14 @@ def test_sync_liked_tracks_filters_and_adds(
     calls: list[list[str]] = []
 
     class DummyAccessor:
-        def current_user_saved_tracks(
+        def iter_saved_tracks(
             self, time_in_seconds: int | None = None, max_items: int = 500
-        ) -> list[dict[str, Any]]:
+        ) -> Iterator[list[TrackRef]]:
             assert time_in_seconds == 60
             assert max_items == 200
-            return liked_items
+            yield liked_items
 
-        def fetch_playlist_tracks(self, pid: str) -> list[dict[str, Any]]:
+        def fetch_playlist_tracks(self, pid: str) -> list[TrackRef]:
             return target_items
 
         def add_tracks_to_playlist(self, pid: str, ids: list[str]) -> None:
@@ -116,23 +118,20 @@ def test_sync_liked_tracks_filters_and_adds(
     assert calls == [["new"]]
 
 
-def test_sync_liked_tracks_no_new_tracks(
-    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
-) -> None:
+def test_sync_liked_tracks_no_new_tracks(caplog: pytest.LogCaptureFixture) -> None:
     caplog.set_level(logging.INFO)
-    _stub_id_map(monkeypatch)
 
     action = SyncLikedAction(type="sync_liked", target_playlist_id="tgt")
     action.timeBetweenActInSeconds = 0
 
     class DummyAccessor:
-        def current_user_saved_tracks(
+        def iter_saved_tracks(
             self, time_in_seconds: int | None = None, max_items: int = 500
-        ) -> list[dict[str, Any]]:
-            return [{"id": "a", "added_at": "2025-01-01T00:00:00Z"}]
+        ) -> Iterator[list[TrackRef]]:
+            yield [TrackRef("a", _epoch("2025-01-01T00:00:00Z"))]
 
-        def fetch_playlist_tracks(self, pid: str) -> list[dict[str, Any]]:
-            return [{"id": "a"}]
+        def fetch_playlist_tracks(self, pid: str) -> list[TrackRef]:
+            return _refs("a")
 
         def add_tracks_to_playlist(self, pid: str, ids: list[str]) -> None:
             pytest.skip("No tracks should be added")
@@ -142,21 +141,18 @@ def test_sync_liked_tracks_no_new_tracks(
     assert "No new liked tracks to add to target playlist." in caplog.text
 
 
-def test_sync_liked_tracks_allows_duplicates(
-    monkeypatch: pytest.MonkeyPatch,
-) -> None:
-    _stub_id_map(monkeypatch)
+def test_sync_liked_tracks_allows_duplicates() -> None:
     action = SyncLikedAction(type="sync_liked", target_playlist_id="tgt")
     action.avoid_duplicates = False
     calls: list[list[str]] = []
 
     class DummyAccessor:
-        def current_user_saved_tracks(
+        def iter_saved_tracks(
             self, time_in_seconds: int | None = None, max_items: int = 500
-        ) -> list[dict[str, Any]]:
-            return [{"id": "a", "added_at": "2025-01-01T00:00:00Z"}]
+        ) -> Iterator[list[TrackRef]]:
+            yield [TrackRef("a", _epoch("2025-01-01T00:00:00Z"))]
 
-        def fetch_playlist_tracks(self, pid: str) -> list[dict[str, Any]]:
+        def fetch_playlist_tracks(self, pid: str) -> list[TrackRef]:
             pytest.skip("No duplicate check should occur")
 
         def add_tracks_to_playlist(self, pid: str, ids: list[str]) -> None:
@@ -181,49 +177,37 @@ def test_sync_liked_tracks_allows_duplicates(
     ],
 )
 def test_archive_playlists_all_combinations(
-    monkeypatch: pytest.MonkeyPatch,
     source_ids: list[str],
     existing_ids: list[str],
     filter_by_time: bool,
     avoid_duplicates: bool,
     expected_ids: list[list[str]],
 ) -> None:
-    _stub_id_map(monkeypatch)
     now = datetime.now(UTC)
     # build source_items
     if filter_by_time:
         # first id is older, second is newer
         source_items = [
-            {
-                "id": source_ids[0],
-                "added_at": (now - timedelta(seconds=60))
-                .isoformat()
-                .replace("+00:00", "Z"),
-            },
-            {
-                "id": source_ids[1],
-                "added_at": (now - timedelta(seconds=30))
-                .isoformat()
-                .replace("+00:00", "Z"),
-            },
+            TrackRef(source_ids[0], (now - timedelta(seconds=60)).timestamp()),
+            TrackRef(source_ids[1], (now - timedelta(seconds=30)).timestamp()),
         ]
     else:
-        source_items = [{"id": sid, "added_at": "irrelevant"} for sid in source_ids]
+        source_items = _refs(*source_ids)
     # build existing_items
-    existing_items = [{"id": eid, "added_at": "irrelevant"} for eid in existing_ids]
+    existing_items = _refs(*existing_ids)
     time_sec = 45 if filter_by_time else 0
 
     action = ArchiveAction(
         type="archive", source_playlist_id="src", target_playlist_id="tgt"
     )
     action.filter_by_time = filter_by_time
-    action.avoidDuplicates = avoid_duplicates
+    action.avoid_duplicates = avoid_duplicates
     action.timeBetweenActInSeconds = time_sec
 
     calls: list[list[str]] = []
 
-    class DummyAccessor:
-        def fetch_playlist_tracks(self, pid: str) -> list[dict[str, Any]]:
+    class DummyAccessor(PagingAccessor):
+        def fetch_playlist_tracks(self, pid: str) -> list[TrackRef]:
             return source_items if pid == action.source_playlist_id else existing_items
 
         def get_playlist_metadata(self, pid: str) -> dict[str, Any]:
@@ -232,11 +216,602 @@ def test_archive_playlists_all_combinations(
         def get_or_create_playlist_with_name(self, name: str) -> str:
             return "archid"
 
-        def add_tracks_to_playlist(self, pid: str, ids: list[str]) -> None:
+        def add_tracks_to_playlist(self, pid: str, ids: list[str]) -> BatchResult:
             calls.append(ids)
+            return BatchResult()
 
     service = PlaylistService(DummyAccessor())
     service.archive_playlists(action)
     sorted_calls = [sorted(lst) for lst in calls]
     sorted_expected = [sorted(lst) for lst in expected_ids]
     assert sorted_calls == sorted_expected
+
+
+def test_archive_playlists_copies_into_given_target() -> None:
+    action = ArchiveAction(
+        type="archive",
+        source_playlist_id="src",
+        target_playlist_id="tgt",
+        avoid_duplicates=False,
+        filter_by_time=False,
+    )
+    calls: list[tuple[str, list[str]]] = []
+
+    class DummyAccessor(PagingAccessor):
+        def get_playlist_metadata(self, pid: str) -> dict[str, Any]:
+            return {"name": "PL"}
+
+        def get_or_create_playlist_with_name(self, name: str) -> str:
+            raise AssertionError("the target was given")
+
+        def fetch_playlist_tracks(self, pid: str) -> list[TrackRef]:
+            return _refs("a")
+
+        def add_tracks_to_playlist(self, pid: str, ids: list[str]) -> BatchResult:
+            calls.append((pid, ids))
+            return BatchResult()
+
+    PlaylistService(DummyAccessor()).archive_playlists(action)
+    assert calls == [("tgt", ["a"])]
+
+
+def test_archive_filters_every_page_against_one_cutoff(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    caplog.set_level(logging.INFO)
+    action = ArchiveAction(
+        type="archive",
+        source_playlist_id="src",
+        target_playlist_id="tgt",
+        avoid_duplicates=False,
+        timeBetweenActInSeconds=3600,
+    )
+    now = datetime.now(UTC).timestamp()
+    calls: list[list[str]] = []
+
+    class DummyAccessor:
+        def get_playlist_metadata(self, pid: str) -> dict[str, Any]:
+            return {"name": "PL"}
+
+        def iter_playlist_tracks(self, pid: str) -> Iterator[list[TrackRef]]:
+            for page in range(3):
+                yield [
+                    TrackRef(f"old{page}", now - 7200),
+                    TrackRef(f"new{page}", now - 60),
+                ]
+
+        def add_tracks_to_playlist(self, pid: str, ids: list[str]) -> BatchResult:
+            calls.append(ids)
+            return BatchResult()
+
+    PlaylistService(DummyAccessor()).archive_playlists(action)
+
+    assert calls == [["new0", "new1", "new2"]]
+    assert caplog.text.count("added after") == 1
+
+
+class MovingAccessor:
+    """Source playlist with old and new tracks, recording every write."""
+
+    def __init__(
+        self,
+        source: list[TrackRef],
+        total: int | None = None,
+        snapshots: list[str] | None = None,
+    ) -> None:
+        self.source = source
+        self.total = len(source) if total is None else total
+        self.writes: list[tuple[object, ...]] = []
+        # Snapshot ids returned by successive metadata reads (the last repeats)
+        self.snapshots = snapshots or ["snap1"]
+
+    def get_playlist_metadata(self, pid: str) -> dict[str, Any]:
+        snapshot_id = self.snapshots[0]
+        if len(self.snapshots) > 1:
+            self.snapshots.pop(0)
+        return {
+            "name": "PL",
+            "snapshot_id": snapshot_id,
+            "tracks": {"total": self.total},
+        }
+
+    def get_or_create_playlist_with_name(self, name: str) -> str:
+        self.writes.append(("create", name))
+        return "arch"
+
+    def get_playlist_id_by_name(self, name: str) -> str | None:
+        return None
+
+    def fetch_playlist_tracks(self, pid: str) -> list[TrackRef]:
+        return self.source if pid == "src" else []
+
+    def iter_playlist_tracks(self, pid: str) -> Iterator[list[TrackRef]]:
+        yield self.fetch_playlist_tracks(pid)
+
+    def add_tracks_to_playlist(
+        self, pid: str, ids: list[str], position: int | None = None
+    ) -> BatchResult:
+        self.writes.append(("add", pid, ids))
+        return BatchResult()
+
+    def remove_track_occurrences(
+        self,
+        pid: str,
+        occurrences: list[tuple[str, int]],
+        snapshot_id: str | None = None,
+    ) -> None:
+        self.writes.append(("remove", pid, occurrences, snapshot_id))
+
+
+def test_archive_without_target_moves_old_tracks_out_of_source() -> None:
+    now = datetime.now(UTC)
+    old = (now - timedelta(days=40)).timestamp()
+    new = (now - timedelta(days=1)).timestamp()
+    accessor = MovingAccessor(
+        [TrackRef("a", old), TrackRef("b", new), TrackRef("a", old), TrackRef("c", old)]
+    )
+    action = ArchiveAction(
+        type="archive",
+        source_playlist_id="src",
+        archive_after_seconds=30 * 24 * 3600,
+    )
+
+    PlaylistService(accessor).archive_playlists(action)
+
+    assert accessor.writes == [
+        ("create", "PL-Archive"),
+        ("add", "arch", ["a", "c"]),
+        # every old occurrence, highest position first, pinned to the snapshot
+        ("remove", "src", [("c", 3), ("a", 2), ("a", 0)], "snap1"),
+    ]
+
+
+def test_archive_without_target_moves_nothing_if_source_changed_while_read(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    caplog.set_level(logging.WARNING)
+    accessor = MovingAccessor(_refs("a", "b"), snapshots=["snap1", "snap2"])
+    action = ArchiveAction(
+        type="archive",
+        source_playlist_id="src",
+        filter_by_time=False,
+        archive_after_seconds=0,
+    )
+
+    PlaylistService(accessor).archive_playlists(action)
+
+    # The positions may not match snap1, so neither copy nor remove
+    assert accessor.writes == [("create", "PL-Archive")]
+    assert "changed while it was read" in caplog.text
+
+
+def test_archive_without_target_or_age_only_copies_new_tracks() -> None:
+    now = datetime.now(UTC)
+    accessor = MovingAccessor(
+        [
+            TrackRef("a", (now - timedelta(days=40)).timestamp()),
+            TrackRef("b", (now - timedelta(seconds=10)).timestamp()),
+        ]
+    )
+    action = ArchiveAction(type="archive", source_playlist_id="src")
+
+    PlaylistService(accessor).archive_playlists(action)
+
+    # Removing tracks has to be asked for with archive_after_seconds
+    assert accessor.writes == [("create", "PL-Archive"), ("add", "arch", ["b"])]
+
+
+def test_archive_move_in_run_scope_pins_the_snapshot_it_read() -> None:
+    # The scope caches snap1; the source is then reordered to snap2
+    accessor = MovingAccessor(_refs("a", "b"), snapshots=["snap1", "snap2"])
+    action = ArchiveAction(
+        type="archive",
+        source_playlist_id="src",
+        filter_by_time=False,
+        archive_after_seconds=0,
+    )
+    service = PlaylistService(accessor)
+
+    with service.run_scope({"src"}):
+        service.archive_playlists(action)
+
+    # The positions came from snap2, so the removal must be pinned to it
+    assert accessor.writes[-1] == ("remove", "src", [("b", 1), ("a", 0)], "snap2")
+
+
+def test_archive_without_target_uses_archive_after_seconds_as_age() -> None:
+    now = datetime.now(UTC)
+    accessor = MovingAccessor(
+        [
+            TrackRef("a", (now - timedelta(days=40)).timestamp()),
+            TrackRef("b", (now - timedelta(hours=2)).timestamp()),
+        ]
+    )
+    action = ArchiveAction(
+        type="archive",
+        source_playlist_id="src",
+        timeBetweenActInSeconds=3600,
+        archive_after_seconds=30 * 24 * 3600,
+    )
+
+    PlaylistService(accessor).archive_playlists(action)
+
+    # Hourly runs, but only tracks older than 30 days move
+    assert ("add", "arch", ["a"]) in accessor.writes
+    assert accessor.writes[-1] == ("remove", "src", [("a", 0)], "snap1")
+
+
+def test_archive_without_target_keeps_source_when_positions_unknown(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    caplog.set_level(logging.WARNING)
+    accessor = MovingAccessor(_refs("a", "b"), total=3)
+    action = ArchiveAction(
+        type="archive",
+        source_playlist_id="src",
+        filter_by_time=False,
+        archive_after_seconds=0,
+    )
+
+    PlaylistService(accessor).archive_playlists(action)
+
+    assert [w[0] for w in accessor.writes] == ["create", "add"]
+    assert "were not removed" in caplog.text
+
+
+def test_archive_checks_duplicates_against_membership_index(tmp_path: Path) -> None:
+    action = ArchiveAction(
+        type="archive",
+        source_playlist_id="src",
+        target_playlist_id="arch",
+        filter_by_time=False,
+    )
+    fetched: list[str] = []
+    added: list[list[str]] = []
+
+    class DummyAccessor(PagingAccessor):
+        snapshot = "s1"
+        source = _refs("a", "b")
+
+        def get_playlist_metadata(self, pid: str) -> dict[str, Any]:
+            return {"name": pid, "snapshot_id": self.snapshot}
+
+        def fetch_playlist_tracks(self, pid: str) -> list[TrackRef]:
+            fetched.append(pid)
+            return self.source if pid == "src" else _refs("a")
+
+        def add_tracks_to_playlist(self, pid: str, ids: list[str]) -> BatchResult:
+            added.append(ids)
+            self.snapshot = f"s{len(added) + 1}"
+            return BatchResult(
+                [ChunkResult(0, ids, response={"snapshot_id": self.snapshot})]
+            )
+
+    accessor = DummyAccessor()
+    service = PlaylistService(
+        accessor, membership=MembershipIndex(index_dir=str(tmp_path))
+    )
+    service.archive_playlists(action)
+    accessor.source = _refs("a", "b", "c")
+    service.archive_playlists(action)
+
+    # The archive is read once; the second run trusts the index at s2
+    assert fetched.count("arch") == 1
+    assert added == [["b"], ["c"]]
+
+
+def test_sync_playlists_streams_source_pages_in_order() -> None:
+    action = SyncAction(type="sync", source_playlist_id="src", target_playlist_id="tgt")
+    calls: list[list[str]] = []
+    events: list[str] = []
+
+    class DummyAccessor:
+        def fetch_playlist_tracks(self, pid: str) -> list[TrackRef]:
+            events.append(f"fetch {pid}")
+            return _refs("b")
+
+        def iter_playlist_tracks(self, pid: str) -> Iterator[list[TrackRef]]:
+            events.append("page 1")
+            yield _refs("c", "a")
+            events.append("page 2")
+            yield _refs("b", "d", "c")
+
+        def add_tracks_to_playlist(self, pid: str, ids: list[str]) -> None:
+            calls.append(ids)
+
+    service = PlaylistService(DummyAccessor())
+    service.sync_playlists(action)
+
+    # target is read before the source streams in, and source order is kept
+    assert events == ["fetch tgt", "page 1", "page 2"]
+    assert calls == [["c", "a", "d"]]
+
+
+def test_sync_liked_tracks_reads_to_watermark_and_advances_it(
+    tmp_path: Path,
+) -> None:
+    action = SyncLikedAction(type="sync_liked", target_playlist_id="tgt")
+    store = WatermarkStore(path=str(tmp_path / "wm.json"))
+    store.set(action.key(), Watermark("2025-01-01T00:00:00Z", "old"))
+    calls: list[list[str]] = []
+    saved_args: list[tuple[object, ...]] = []
+
+    class DummyAccessor:
+        def fetch_playlist_tracks(self, pid: str) -> list[TrackRef]:
+            return []
+
+        def iter_saved_tracks(
+            self,
+            time_in_seconds: int | None = None,
+            max_items: int | None = 500,
+            stop_at: Watermark | None = None,
+        ) -> Iterator[list[TrackRef]]:
+            saved_args.append((time_in_seconds, max_items, stop_at))
+            yield [
+                TrackRef("n2", _epoch("2025-01-03T00:00:00Z")),
+                TrackRef("n1", _epoch("2025-01-02T00:00:00Z")),
+            ]
+
+        def add_tracks_to_playlist(self, pid: str, ids: list[str]) -> None:
+            calls.append(ids)
+
+    service = PlaylistService(DummyAccessor(), watermarks=store)
+    service.sync_liked_tracks(action)
+
+    assert saved_args == [(None, None, Watermark("2025-01-01T00:00:00Z", "old"))]
+    assert calls == [["n2", "n1"]]
+    assert store.get(action.key()) == Watermark("2025-01-03T00:00:00Z", "n2")
+
+
+def test_sync_liked_tracks_keeps_watermark_when_write_fails(
+    tmp_path: Path,
+) -> None:
+    action = SyncLikedAction(type="sync_liked", target_playlist_id="tgt")
+    store = WatermarkStore(path=str(tmp_path / "wm.json"))
+
+    class DummyAccessor:
+        def fetch_playlist_tracks(self, pid: str) -> list[TrackRef]:
+            return []
+
+        def iter_saved_tracks(
+            self, time_in_seconds: int | None = None, max_items: int | None = 500
+        ) -> Iterator[list[TrackRef]]:
+            yield [TrackRef("n", _epoch("2025-01-03T00:00:00Z"))]
+
+        def add_tracks_to_playlist(self, pid: str, ids: list[str]) -> None:
+            raise RuntimeError("API down")
+
+    service = PlaylistService(DummyAccessor(), watermarks=store)
+    with pytest.raises(RuntimeError):
+        service.sync_liked_tracks(action)
+    assert store.get(action.key()) is None
+
+
+class MirrorAccessor:
+    def __init__(
+        self, playlists: dict[str, list[str]], total: int | None = None
+    ) -> None:
+        self.playlists = playlists
+        self.total = total
+        self.writes: list[tuple[Any, ...]] = []
+
+    def get_playlist_metadata(self, pid: str) -> dict[str, Any]:
+        total = self.total if self.total is not None else len(self.playlists[pid])
+        return {"tracks": {"total": total}}
+
+    def fetch_playlist_tracks(self, pid: str) -> list[TrackRef]:
+        return _refs(*self.playlists[pid])
+
+    def iter_playlist_tracks(self, pid: str) -> Iterator[list[TrackRef]]:
+        yield self.fetch_playlist_tracks(pid)
+
+    def remove_track_occurrences(
+        self, pid: str, occurrences: list[tuple[str, int]]
+    ) -> None:
+        self.writes.append(("remove", occurrences))
+        for _, position in occurrences:
+            del self.playlists[pid][position]
+
+    def reorder_playlist_items(
+        self, pid: str, range_start: int, insert_before: int, range_length: int = 1
+    ) -> None:
+        self.writes.append(("move", range_start, insert_before, range_length))
+        move_items(self.playlists[pid], range_start, insert_before, range_length)
+
+    def add_tracks_to_playlist(
+        self, pid: str, ids: list[str], position: int | None = None
+    ) -> None:
+        self.writes.append(("add", position, ids))
+        tracks = self.playlists[pid]
+        at = len(tracks) if position is None else position
+        tracks[at:at] = ids
+
+
+def test_sync_playlists_mirror_makes_target_identical() -> None:
+    action = SyncAction(
+        type="sync", source_playlist_id="src", target_playlist_id="tgt", mirror=True
+    )
+    accessor = MirrorAccessor(
+        {"src": ["a", "b", "c", "d", "e"], "tgt": ["x", "c", "a", "b", "e", "x"]}
+    )
+
+    PlaylistService(accessor).sync_playlists(action)
+
+    assert accessor.playlists["tgt"] == accessor.playlists["src"]
+    assert accessor.writes == [
+        ("remove", [("x", 5), ("x", 0)]),
+        ("move", 0, 3, 1),
+        ("add", 3, ["d"]),
+    ]
+
+
+def test_sync_playlists_mirror_without_changes_writes_nothing() -> None:
+    action = SyncAction(
+        type="sync", source_playlist_id="src", target_playlist_id="tgt", mirror=True
+    )
+    accessor = MirrorAccessor({"src": ["a", "b"], "tgt": ["a", "b"]})
+
+    PlaylistService(accessor).sync_playlists(action)
+    assert accessor.writes == []
+
+
+def test_sync_playlists_mirror_falls_back_when_target_has_local_files() -> None:
+    action = SyncAction(
+        type="sync", source_playlist_id="src", target_playlist_id="tgt", mirror=True
+    )
+    accessor = MirrorAccessor({"src": ["a", "b"], "tgt": ["b", "x"]}, total=3)
+
+    PlaylistService(accessor).sync_playlists(action)
+    assert accessor.writes == [("add", None, ["a"])]
+
+
+def test_run_scope_shares_fetches_between_actions() -> None:
+    accessor = MirrorAccessor({"src": ["a", "b"], "t1": [], "t2": ["a"]})
+    fetched: list[str] = []
+    fetch = accessor.fetch_playlist_tracks
+
+    def counting_fetch(pid: str) -> list[TrackRef]:
+        fetched.append(pid)
+        return fetch(pid)
+
+    accessor.fetch_playlist_tracks = counting_fetch
+    service = PlaylistService(accessor)
+    with service.run_scope({"src"}):
+        for target in ("t1", "t2"):
+            service.sync_playlists(
+                SyncAction(
+                    type="sync", source_playlist_id="src", target_playlist_id=target
+                )
+            )
+    assert service.accessor is accessor
+    assert fetched == ["t1", "src", "t2"]
+    assert accessor.playlists["t2"] == ["a", "b"]
+
+
+class JournaledAccessor:
+    """Writes in chunks of two and can die after `fail_after` chunks."""
+
+    def __init__(
+        self, fail_after: int | None = None, error: Exception | None = None
+    ) -> None:
+        self.fail_after = fail_after
+        self.error = error or RuntimeError("process killed")
+        self.fetched: list[str] = []
+        self.added: list[list[str]] = []
+
+    def fetch_playlist_tracks(self, pid: str) -> list[TrackRef]:
+        self.fetched.append(pid)
+        return [] if pid == "tgt" else _refs("a", "b", "c", "d", "e")
+
+    def iter_playlist_tracks(self, pid: str) -> Iterator[list[TrackRef]]:
+        yield self.fetch_playlist_tracks(pid)
+
+    def add_tracks_to_playlist(
+        self,
+        pid: str,
+        ids: list[str],
+        on_chunk: Callable[[ChunkResult, int], None] | None = None,
+    ) -> BatchResult:
+        result = BatchResult()
+        for index in range(0, len(ids), 2):
+            if self.fail_after is not None and len(self.added) >= self.fail_after:
+                raise self.error
+            chunk = ChunkResult(index // 2, ids[index : index + 2])
+            self.added.append(chunk.items)
+            result.chunks.append(chunk)
+            if on_chunk:
+                on_chunk(chunk, -1)
+        return result
+
+
+def test_interrupted_sync_resumes_without_refetching(tmp_path: Path) -> None:
+    action = SyncAction(type="sync", source_playlist_id="src", target_playlist_id="tgt")
+    journal = WriteJournal(path=str(tmp_path / "journal.json"))
+
+    crashed = JournaledAccessor(fail_after=1)
+    with pytest.raises(RuntimeError):
+        PlaylistService(crashed, journal=journal).sync_playlists(action)
+    assert crashed.added == [["a", "b"]]
+    assert journal.get(action.key()).pending == ["c", "d", "e"]
+
+    restarted = JournaledAccessor()
+    PlaylistService(restarted, journal=journal).sync_playlists(action)
+
+    # Only the uncommitted chunks are written, and nothing is re-read
+    assert restarted.added == [["c", "d"], ["e"]]
+    assert restarted.fetched == []
+    assert journal.get(action.key()) is None
+
+
+def test_resumed_sync_liked_advances_watermark(tmp_path: Path) -> None:
+    action = SyncLikedAction(type="sync_liked", target_playlist_id="tgt")
+    journal = WriteJournal(path=str(tmp_path / "journal.json"))
+    store = WatermarkStore(path=str(tmp_path / "wm.json"))
+    mark = Watermark("2025-01-02T00:00:00Z", "b")
+    journal.begin(action.key(), JournalEntry(["b"], watermark=mark))
+
+    accessor = JournaledAccessor()
+    PlaylistService(accessor, watermarks=store, journal=journal).sync_liked_tracks(
+        action
+    )
+
+    assert accessor.added == [["b"]]
+    assert store.get(action.key()) == mark
+
+
+def test_resumed_archive_move_removes_from_source(tmp_path: Path) -> None:
+    action = ArchiveAction(
+        type="archive", source_playlist_id="src", archive_after_seconds=0
+    )
+    journal = WriteJournal(path=str(tmp_path / "journal.json"))
+    journal.begin(
+        action.key(),
+        JournalEntry(
+            [],
+            removal_playlist_id="src",
+            removals=[("a", 0)],
+            removal_snapshot_id="snap1",
+        ),
+    )
+    accessor = MovingAccessor(_refs("a", "b"))
+
+    PlaylistService(accessor, journal=journal).archive_playlists(action)
+
+    assert accessor.writes == [
+        ("create", "PL-Archive"),
+        ("remove", "src", [("a", 0)], "snap1"),
+    ]
+    assert journal.get(action.key()) is None
+
+
+@pytest.mark.parametrize(
+    ("status", "kept"), [(403, False), (404, False), (429, True), (503, True)]
+)
+def test_resumed_write_is_dropped_only_when_it_cannot_succeed(
+    tmp_path: Path, status: int, kept: bool
+) -> None:
+    action = SyncAction(type="sync", source_playlist_id="src", target_playlist_id="tgt")
+    journal = WriteJournal(path=str(tmp_path / "journal.json"))
+    journal.begin(action.key(), JournalEntry(["c", "d"]))
+    failing = JournaledAccessor(fail_after=0, error=SpotifyException(status, -1, "no"))
+
+    with pytest.raises(SpotifyException):
+        PlaylistService(failing, journal=journal).sync_playlists(action)
+
+    # A transient failure is resumed next run; a permanent one must not wedge it
+    assert (journal.get(action.key()) is not None) is kept
+
+
+def test_sync_with_nothing_to_add_does_not_touch_the_journal(tmp_path: Path) -> None:
+    action = SyncLikedAction(type="sync_liked", target_playlist_id="tgt")
+    path = tmp_path / "journal.json"
+    store = WatermarkStore(path=str(tmp_path / "wm.json"))
+    accessor = JournaledAccessor()
+    accessor.iter_saved_tracks = lambda **_: iter([])
+
+    PlaylistService(
+        accessor, watermarks=store, journal=WriteJournal(path=str(path))
+    ).sync_liked_tracks(action)
+
+    assert accessor.added == []
+    assert not path.exists()
@@ -0,0 +1,74 @@
+import pytest
+from models.tracks import (
+    TrackPage,
+    TrackRef,
+    added_after,
+    format_added_at,
+    parse_added_at,
+    to_track_refs,
+)
+
+
+def test_from_item_reads_id_and_epoch_added_at() -> None:
+    item = {"added_at": "2025-01-02T00:00:00Z", "track": {"id": "t1", "name": "x"}}
+    ref = TrackRef.from_item(item)
+    assert ref == TrackRef("t1", parse_added_at("2025-01-02T00:00:00Z").timestamp())
+    assert format_added_at(ref.added_at) == "2025-01-02T00:00:00Z"
+
+
+def test_from_item_without_added_at_defaults_to_zero() -> None:
+    assert TrackRef.from_item({"added_at": None, "track": {"id": "t1"}}).added_at == 0
+
+
+def test_track_ref_has_no_instance_dict() -> None:
+    assert not hasattr(TrackRef("t1"), "__dict__")
+
+
+def test_to_track_refs_drops_items_without_a_track_id() -> None:
+    items = [
+        {"added_at": None, "track": {"id": "a"}},
+        {"added_at": None, "track": None},
+        {"added_at": None, "track": {"id": None}},
+        {"added_at": None, "track": {"id": "b"}},
+    ]
+    assert [ref.id for ref in to_track_refs(items)] == ["a", "b"]
+
+
+def test_to_track_refs_missing_track_key_raises() -> None:
+    with pytest.raises(KeyError):
+        to_track_refs([{"no_track": {"id": "x"}}])
+
+
+def test_to_track_refs_missing_id_key_raises() -> None:
+    with pytest.raises(KeyError):
+        to_track_refs([{"track": {"no_id": "x"}}])
+
+
+def test_track_page_in_added_at_order_is_cut_by_bisect() -> None:
+    page = TrackPage([TrackRef("a", 1.0), TrackRef("b", 2.0), TrackRef("c", 2.0)])
+    assert page.ascending
+    assert [t.id for t in page.added_after(1.0)] == ["b", "c"]
+    assert page.added_after(2.0) == []
+    assert page.added_after(0.0) == page
+
+
+def test_track_page_out_of_order_is_scanned_in_page_order() -> None:
+    page = TrackPage([TrackRef("a", 3.0), TrackRef("b", 1.0), TrackRef("c", 2.0)])
+    assert not page.ascending
+    assert [t.id for t in page.added_after(1.5)] == ["a", "c"]
+
+
+def test_added_after_accepts_plain_lists() -> None:
+    assert added_after([TrackRef("a", 1.0), TrackRef("b", 5.0)], 2.0) == [
+        TrackRef("b", 5.0)
+    ]
+
+
+def test_to_track_refs_returns_ordered_page() -> None:
+    items = [
+        {"added_at": "2025-01-01T00:00:00Z", "track": {"id": "a"}},
+        {"added_at": "2025-01-02T00:00:00Z", "track": {"id": "b"}},
+    ]
+    page = to_track_refs(items)
+    assert isinstance(page, TrackPage)
+    assert page.ascending
@@ -12,7 +12,9 @@ def test_cli_sync_invokes_do_sync(
     monkeypatch.setattr(
         cli_module,
         "do_sync",
-        lambda src, tgt, avoid_duplicates: calls.append((src, tgt, avoid_duplicates)),
+        lambda src, tgt, avoid_duplicates, mirror: calls.append(
+            (src, tgt, avoid_duplicates)
+        ),
     )
 
     result = runner.invoke(cli_module.cli, ["sync", "src123", "tgt456"])
@@ -28,7 +30,9 @@ def test_cli_sync_allow_duplicates_flag(
     monkeypatch.setattr(
         cli_module,
         "do_sync",
-        lambda src, tgt, avoid_duplicates: calls.append((src, tgt, avoid_duplicates)),
+        lambda src, tgt, avoid_duplicates, mirror: calls.append(
+            (src, tgt, avoid_duplicates)
+        ),
     )
 
     result = runner.invoke(
@@ -39,6 +43,22 @@ def test_cli_sync_allow_duplicates_flag(
     assert calls == [("src1", "tgt1", False)]
 
 
+def test_cli_sync_mirror_flag(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    runner = CliRunner()
+    calls: list[bool] = []
+    monkeypatch.setattr(
+        cli_module,
+        "do_sync",
+        lambda src, tgt, avoid_duplicates, mirror: calls.append(mirror),
+    )
+
+    result = runner.invoke(cli_module.cli, ["sync", "src1", "tgt1", "--mirror"])
+    assert result.exit_code == 0
+    assert calls == [True]
+
+
 def test_cli_archive_defaults(
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
@@ -97,7 +117,7 @@ def test_cli_run_once_invokes_run_actions_once(
     monkeypatch.setattr(
         cli_module,
         "run_actions_once",
-        lambda: calls.append(True),
+        lambda use_async: calls.append(use_async),
     )
 
     result = runner.invoke(
@@ -105,9 +125,35 @@ def test_cli_run_once_invokes_run_actions_once(
         ["run-once"],
     )
     assert result.exit_code == 0
+    assert calls == [False]
+
+
+def test_cli_run_once_async_flag(monkeypatch: pytest.MonkeyPatch) -> None:
+    runner = CliRunner()
+    calls: list[bool] = []
+    monkeypatch.setattr(
+        cli_module,
+        "run_actions_once",
+        lambda use_async: calls.append(use_async),
+    )
+
+    result = runner.invoke(cli_module.cli, ["run-once", "--async"])
+    assert result.exit_code == 0
     assert calls == [True]
 
 
+def test_cli_run_once_rejects_plan_with_async(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    runner = CliRunner()
+    monkeypatch.setattr(cli_module, "plan_actions", pytest.fail)
+    monkeypatch.setattr(cli_module, "run_actions_once", pytest.fail)
+
+    result = runner.invoke(cli_module.cli, ["run-once", "--plan", "--async"])
+    assert result.exit_code == 2
+    assert "--plan cannot be combined with --async" in result.output
+
+
 def test_cli_schedule_invokes_start_scheduled_actions(
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
@@ -122,3 +168,25 @@ def test_cli_schedule_invokes_start_scheduled_actions(
     result = runner.invoke(cli_module.cli, ["schedule"])
     assert result.exit_code == 0
     assert calls == [True]
+
+
+@pytest.mark.parametrize(
+    ("command", "scheduled"),
+    [("run-once", False), ("schedule", True)],
+)
+def test_cli_plan_flag_plans_without_running(
+    monkeypatch: pytest.MonkeyPatch, command: str, scheduled: bool
+) -> None:
+    runner = CliRunner()
+    calls: list[bool] = []
+    monkeypatch.setattr(
+        cli_module,
+        "plan_actions",
+        lambda scheduled: calls.append(scheduled),
+    )
+    monkeypatch.setattr(cli_module, "run_actions_once", pytest.fail)
+    monkeypatch.setattr(cli_module, "start_scheduled_actions", pytest.fail)
+
+    result = runner.invoke(cli_module.cli, [command, "--plan"])
+    assert result.exit_code == 0
+    assert calls == [scheduled]
@@ -1,7 +1,12 @@
+import asyncio
 import json
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
 import pytest
+from accessor.runStore import RunRecord, RunStore
 from models.actions import (
     Action,
     ActionType,
@@ -9,7 +14,13 @@ from models.actions import (
     SyncAction,
     SyncLikedAction,
 )
-from service.helper.actionHelper import ACTION_MAP, ActionProcessor
+from service.helper.actionHelper import (
+    ACTION_MAP,
+    ActionProcessor,
+    shared_playlist_ids,
+    with_window,
+    written_playlist_ids,
+)
 
 
 def test_parse_valid_actions(tmp_path: Path) -> None:
@@ -94,6 +105,18 @@ def test_parse_invalid_params_raises_valueerror(tmp_path: Path) -> None:
     assert msg.startswith("Invalid params for <ActionType.SYNC")
 
 
+def test_parse_duplicate_action_raises_valueerror(tmp_path: Path) -> None:
+    sync = {"type": "sync", "source_playlist_id": "s", "target_playlist_id": "t"}
+    data = {"actions": [sync, {**sync, "timeBetweenActInSeconds": 60}]}
+    file = tmp_path / "actions.json"
+    file.write_text(json.dumps(data), encoding="utf-8")
+
+    processor = ActionProcessor(playlist_service=None)
+    with pytest.raises(ValueError) as exc:
+        processor.parse_action_file(str(file))
+    assert "Duplicate action sync:s:t" in str(exc.value)
+
+
 def test_handle_action_dispatch() -> None:
     calls = []
 
@@ -130,6 +153,69 @@ def test_handle_action_dispatch() -> None:
     assert calls == [("archive", archive_action)]
 
 
+def test_handle_action_records_runs_even_when_they_fail(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    class FailingService:
+        def sync_playlists(self, action: Action) -> None:
+            raise RuntimeError("boom")
+
+    runs = RunStore(path=str(tmp_path / "runs.json"))
+    processor = ActionProcessor(playlist_service=FailingService(), runs=runs)
+    monkeypatch.setattr("time.time", lambda: 1000.0)
+    action = SyncAction(
+        type=ActionType.SYNC, source_playlist_id="s", target_playlist_id="t"
+    )
+
+    with pytest.raises(RuntimeError):
+        processor.handle_action(action)
+
+    assert runs.get(action.key()) == RunRecord(last_run=1000.0, next_due=1030.0)
+
+
+def test_handle_action_with_window_widens_the_catch_up_run(
+    tmp_path: Path,
+) -> None:
+    ran = []
+
+    class DummyService:
+        def sync_liked_tracks(self, action: Action) -> None:
+            ran.append(action)
+
+    runs = RunStore(path=str(tmp_path / "runs.json"))
+    processor = ActionProcessor(playlist_service=DummyService(), runs=runs)
+    action = SyncLikedAction(type=ActionType.SYNC_LIKED, target_playlist_id="t")
+
+    processor.handle_action(action, window=500.5)
+
+    assert ran[0].timeBetweenActInSeconds == 501
+    # The run is recorded on the action's own interval
+    record = runs.get(action.key())
+    assert record.next_due - record.last_run == 30
+
+
+def test_with_window_only_widens_windowed_actions() -> None:
+    liked = SyncLikedAction(type=ActionType.SYNC_LIKED, target_playlist_id="t")
+    copy = ArchiveAction(
+        type=ActionType.ARCHIVE, source_playlist_id="s", target_playlist_id="t"
+    )
+    shards = ArchiveAction(type=ActionType.ARCHIVE, source_playlist_id="s")
+    move = ArchiveAction(
+        type=ActionType.ARCHIVE, source_playlist_id="s", archive_after_seconds=60
+    )
+    sync = SyncAction(
+        type=ActionType.SYNC, source_playlist_id="s", target_playlist_id="t"
+    )
+
+    assert with_window(liked, 90).timeBetweenActInSeconds == 90
+    assert with_window(copy, 90).timeBetweenActInSeconds == 90
+    assert with_window(shards, 90).timeBetweenActInSeconds == 90
+    assert with_window(liked, 10) is liked
+    # Moving archives take tracks older than the window, so never widen
+    assert with_window(move, 90) is move
+    assert with_window(sync, 90) is sync
+
+
 def test_handle_action_default(monkeypatch: pytest.MonkeyPatch) -> None:
     calls = []
 
@@ -167,3 +253,148 @@ def test_handle_actions_iterates() -> None:
     processor.handle_actions([a1, a2, a3])
 
     assert calls == [a1, a2, a3]
+
+
+def test_handle_actions_shares_playlists_across_actions() -> None:
+    scopes: list[set[str]] = []
+    calls: list[Action] = []
+
+    class DummyService:
+        @contextmanager
+        def run_scope(self, shared: set[str]) -> Iterator[None]:
+            scopes.append(shared)
+            yield
+
+        def sync_playlists(self, action: Action) -> None:
+            calls.append(action)
+
+    a1 = SyncAction(
+        type=ActionType.SYNC, source_playlist_id="s", target_playlist_id="t1"
+    )
+    a2 = SyncAction(
+        type=ActionType.SYNC, source_playlist_id="s", target_playlist_id="t2"
+    )
+    a3 = SyncLikedAction(type=ActionType.SYNC_LIKED, target_playlist_id="t2")
+    processor = ActionProcessor(playlist_service=DummyService())
+    processor.handle_actions([a1, a2])
+
+    assert scopes == [{"s"}]
+    assert calls == [a1, a2]
+    assert shared_playlist_ids([a1, a2, a3]) == {"s", "t2"}
+
+
+def test_written_playlist_ids() -> None:
+    sync = SyncAction(
+        type=ActionType.SYNC, source_playlist_id="s", target_playlist_id="t"
+    )
+    copy = ArchiveAction(
+        type=ActionType.ARCHIVE, source_playlist_id="s", target_playlist_id="t"
+    )
+    move = ArchiveAction(type=ActionType.ARCHIVE, source_playlist_id="s")
+
+    assert written_playlist_ids(sync) == {"t"}
+    assert written_playlist_ids(copy) == {"t"}
+    assert written_playlist_ids(move) == {"s"}
+
+
+def test_handle_action_holds_target_locks() -> None:
+    held: list[set[str]] = []
+
+    class RecordingLocks:
+        @contextmanager
+        def hold(self, playlist_ids: set[str]) -> Iterator[None]:
+            held.append(playlist_ids)
+            yield
+
+    class DummyService:
+        def sync_liked_tracks(self, action: Action) -> None:
+            assert held, "action ran without its locks"
+
+    processor = ActionProcessor(playlist_service=DummyService(), locks=RecordingLocks())
+    processor.handle_action(
+        SyncLikedAction(type=ActionType.SYNC_LIKED, target_playlist_id="t")
+    )
+
+    assert held == [{"t"}]
+
+
+class RecordingAsyncService:
+    """Async service stub that records how many actions overlap."""
+
+    def __init__(self) -> None:
+        self.active = 0
+        self.peak = 0
+        self.ran: list[Action] = []
+
+    @staticmethod
+    def supports(action: Action) -> bool:
+        return not getattr(action, "mirror", False)
+
+    async def sync_playlists(self, action: Action) -> None:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        if action.target_playlist_id == "boom":
+            raise RuntimeError("boom")
+        self.ran.append(action)
+
+
+def _sync(target: str, mirror: bool = False) -> SyncAction:
+    return SyncAction(
+        type=ActionType.SYNC,
+        source_playlist_id="s",
+        target_playlist_id=target,
+        mirror=mirror,
+    )
+
+
+def test_handle_actions_async_runs_independent_actions_together() -> None:
+    service = RecordingAsyncService()
+    processor = ActionProcessor(playlist_service=None, async_playlist_service=service)
+    actions = [_sync(f"t{i}") for i in range(6)]
+
+    asyncio.run(processor.handle_actions_async(actions, concurrency=4))
+
+    assert sorted(a.target_playlist_id for a in service.ran) == [
+        f"t{i}" for i in range(6)
+    ]
+    assert service.peak == 4
+
+
+def test_handle_actions_async_serializes_writes_to_one_playlist() -> None:
+    service = RecordingAsyncService()
+    processor = ActionProcessor(playlist_service=None, async_playlist_service=service)
+
+    asyncio.run(processor.handle_actions_async([_sync("t"), _sync("t")]))
+
+    assert len(service.ran) == 2
+    assert service.peak == 1
+
+
+def test_handle_actions_async_runs_unsupported_actions_on_a_thread() -> None:
+    threads: list[str] = []
+
+    class BlockingService:
+        def sync_playlists(self, action: Action) -> None:
+            threads.append(threading.current_thread().name)
+
+    processor = ActionProcessor(
+        playlist_service=BlockingService(),
+        async_playlist_service=RecordingAsyncService(),
+    )
+
+    asyncio.run(processor.handle_actions_async([_sync("t", mirror=True)]))
+
+    assert len(threads) == 1
+    assert threads[0] != threading.main_thread().name
+
+
+def test_handle_actions_async_raises_after_running_everything() -> None:
+    service = RecordingAsyncService()
+    processor = ActionProcessor(playlist_service=None, async_playlist_service=service)
+
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(processor.handle_actions_async([_sync("boom"), _sync("ok")]))
+
+    assert [a.target_playlist_id for a in service.ran] == ["ok"]
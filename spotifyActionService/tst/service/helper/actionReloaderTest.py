@@ -0,0 +1,201 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+from models.actions import Action, ActionType, SyncAction, SyncLikedAction
+from service.helper.actionHelper import ActionProcessor
+from service.helper.actionReloader import (
+    ActionReloader,
+    diff_actions,
+    keyed_actions,
+)
+from service.helper.timerScheduler import Job, TimerScheduler
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _sync(source: str, target: str, interval: int = 30, **kwargs: object) -> dict:
+    return {
+        "type": "sync",
+        "source_playlist_id": source,
+        "target_playlist_id": target,
+        "timeBetweenActInSeconds": interval,
+        **kwargs,
+    }
+
+
+def _write(path: Path, actions: list[dict], mtime_ns: int) -> None:
+    path.write_text(json.dumps({"actions": actions}))
+    # Pin the mtime so back-to-back writes never share a timestamp
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class CountingProcessor(ActionProcessor):
+    def __init__(self) -> None:
+        super().__init__(playlist_service=None)
+        self.parses = 0
+
+    def parse_action_file(self, filepath: str) -> list[Action]:
+        self.parses += 1
+        return super().parse_action_file(filepath)
+
+
+def _reloader(path: Path) -> tuple[ActionReloader, TimerScheduler, FakeClock]:
+    clock = FakeClock()
+    scheduler = TimerScheduler(clock=clock)
+    processor = CountingProcessor()
+
+    def schedule(action: Action, delay: float | None) -> Job:
+        return scheduler.every(
+            action.timeBetweenActInSeconds,
+            processor.handle_action,
+            action,
+            delay=delay,
+        )
+
+    reloader = ActionReloader(str(path), scheduler, processor, schedule)
+    reloader.start(lambda actions: [None] * len(actions))
+    return reloader, scheduler, clock
+
+
+def test_keyed_actions_uses_action_keys() -> None:
+    sync = SyncAction(
+        type=ActionType.SYNC, source_playlist_id="a", target_playlist_id="b"
+    )
+    liked = SyncLikedAction(type=ActionType.SYNC_LIKED, target_playlist_id="b")
+
+    assert keyed_actions([sync, liked]) == {
+        "sync:a:b": sync,
+        "sync_liked::b": liked,
+    }
+
+
+def test_diff_actions_reports_added_removed_and_changed() -> None:
+    old = {"x": Action(type=ActionType.SYNC), "y": Action(type=ActionType.SYNC)}
+    new = {
+        "y": Action(type=ActionType.SYNC, timeBetweenActInSeconds=60),
+        "z": Action(type=ActionType.SYNC),
+    }
+
+    diff = diff_actions(old, new)
+
+    assert (diff.added, diff.removed, diff.changed) == (["z"], ["x"], ["y"])
+    assert not diff_actions(old, old)
+
+
+def test_check_does_not_read_an_untouched_file(tmp_path: Path) -> None:
+    path = tmp_path / "actions.json"
+    _write(path, [_sync("a", "b")], mtime_ns=1)
+    reloader, _, _ = _reloader(path)
+
+    assert not reloader.check()
+    assert reloader.processor.parses == 1
+
+
+def test_check_ignores_a_touch_that_leaves_the_content_alone(
+    tmp_path: Path,
+) -> None:
+    path = tmp_path / "actions.json"
+    _write(path, [_sync("a", "b")], mtime_ns=1)
+    reloader, _, _ = _reloader(path)
+    jobs = dict(reloader.jobs)
+
+    _write(path, [_sync("a", "b")], mtime_ns=2)
+
+    assert not reloader.check()
+    assert reloader.processor.parses == 1
+    assert reloader.jobs == jobs
+
+
+def test_check_reschedules_only_affected_actions(tmp_path: Path) -> None:
+    path = tmp_path / "actions.json"
+    _write(
+        path,
+        [_sync("a", "b"), _sync("c", "d"), _sync("e", "f"), _sync("g", "h")],
+        mtime_ns=1,
+    )
+    reloader, scheduler, clock = _reloader(path)
+    kept = reloader.jobs["sync:a:b"]
+    edited = reloader.jobs["sync:c:d"]
+    retimed = reloader.jobs["sync:e:f"]
+    removed = reloader.jobs["sync:g:h"]
+
+    clock.now = 12
+    _write(
+        path,
+        [
+            _sync("a", "b"),
+            _sync("c", "d", mirror=True),
+            _sync("e", "f", interval=60),
+            _sync("x", "y"),
+        ],
+        mtime_ns=2,
+    )
+    diff = reloader.check()
+
+    assert (diff.added, diff.removed, diff.changed) == (
+        ["sync:x:y"],
+        ["sync:g:h"],
+        ["sync:c:d", "sync:e:f"],
+    )
+    # Untouched actions keep their job and timer
+    assert reloader.jobs["sync:a:b"] is kept
+    assert kept.due == 30
+    # An edit with the same interval keeps its next run time
+    assert edited.cancelled
+    assert reloader.jobs["sync:c:d"].args[0].mirror
+    assert reloader.jobs["sync:c:d"].due == 30
+    # A new interval, or a new action, starts a fresh interval from now
+    assert retimed.cancelled
+    assert reloader.jobs["sync:e:f"].due == 72
+    assert reloader.jobs["sync:x:y"].due == 42
+    assert removed.cancelled
+    assert len(scheduler.jobs) == 4
+
+
+def test_check_cancels_catch_ups_of_removed_and_edited_actions(
+    tmp_path: Path,
+) -> None:
+    path = tmp_path / "actions.json"
+    _write(path, [_sync("a", "b"), _sync("c", "d"), _sync("e", "f")], mtime_ns=1)
+    reloader, scheduler, _ = _reloader(path)
+    catch_ups = {}
+    for key, job in list(reloader.jobs.items()):
+        action = job.args[0]
+        catch_ups[key] = scheduler.once(5, reloader.processor.handle_action, action)
+        reloader.track_catch_up(action, catch_ups[key])
+
+    _write(path, [_sync("a", "b"), _sync("c", "d", mirror=True)], mtime_ns=2)
+    reloader.check()
+
+    assert not catch_ups["sync:a:b"].cancelled
+    assert catch_ups["sync:c:d"].cancelled
+    assert catch_ups["sync:e:f"].cancelled
+
+
+def test_check_keeps_the_schedule_when_the_file_is_invalid(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    path = tmp_path / "actions.json"
+    _write(path, [_sync("a", "b")], mtime_ns=1)
+    reloader, scheduler, _ = _reloader(path)
+    jobs = dict(reloader.jobs)
+
+    path.write_text("{not json")
+    os.utime(path, ns=(2, 2))
+
+    assert not reloader.check()
+    assert reloader.jobs == jobs
+    assert "Keeping the current schedule" in caplog.text
+
+    # Fixing the file applies it as usual
+    _write(path, [_sync("a", "b", interval=60)], mtime_ns=3)
+    assert reloader.check().changed == ["sync:a:b"]
+    assert scheduler.jobs[0].interval == 60
@@ -0,0 +1,115 @@
+from pathlib import Path
+
+import pytest
+from accessor.runStore import RunStore
+from models.actions import ActionType, SyncAction
+from service.helper.catchUp import CatchUp, CatchUpPolicy, resume_delays
+
+
+def _action(target: str) -> SyncAction:
+    return SyncAction(
+        type=ActionType.SYNC,
+        timeBetweenActInSeconds=60,
+        source_playlist_id="s",
+        target_playlist_id=target,
+    )
+
+
+@pytest.fixture
+def runs(tmp_path: Path) -> RunStore:
+    store = RunStore(path=str(tmp_path / "runs.json"))
+    # "due" is next due at 1030; "missed" was last due at 900
+    store.record(_action("due").key(), 970.0, 60)
+    store.record(_action("missed").key(), 840.0, 60)
+    return store
+
+
+def _resume(runs: RunStore, policy: CatchUpPolicy) -> tuple[list[float], list[CatchUp]]:
+    actions = [_action("new"), _action("due"), _action("missed")]
+    return resume_delays(actions, [20, 40, 60], runs, policy, now=1000.0)
+
+
+def test_actions_keep_their_stored_next_run(runs: RunStore) -> None:
+    delays, _ = _resume(runs, CatchUpPolicy.SKIP)
+
+    # Never ran: default delay; not yet due: until the stored next run
+    assert delays[:2] == [20, 30]
+
+
+def test_skip_waits_for_the_next_slot_on_the_cadence(runs: RunStore) -> None:
+    delays, catch_ups = _resume(runs, CatchUpPolicy.SKIP)
+
+    # Slots at 900 and 960 were missed; the next is at 1020
+    assert delays[2] == 20
+    assert catch_ups == []
+
+
+def test_run_once_catches_up_once_then_restarts_the_interval(
+    runs: RunStore,
+) -> None:
+    delays, catch_ups = _resume(runs, CatchUpPolicy.RUN_ONCE)
+
+    assert delays[2] == 60
+    assert catch_ups == [CatchUp(_action("missed"))]
+
+
+def test_coalesce_catches_up_over_the_whole_gap(runs: RunStore) -> None:
+    delays, catch_ups = _resume(runs, CatchUpPolicy.COALESCE)
+
+    assert delays[2] == 60
+    assert catch_ups == [CatchUp(_action("missed"), window=160.0)]
+
+
+def test_stored_next_run_never_waits_past_a_shortened_interval(
+    runs: RunStore,
+) -> None:
+    action = SyncAction(
+        type=ActionType.SYNC,
+        timeBetweenActInSeconds=10,
+        source_playlist_id="s",
+        target_playlist_id="due",
+    )
+
+    delays, _ = resume_delays([action], [10], runs, CatchUpPolicy.SKIP, now=1000.0)
+
+    assert delays == [10]
+
+
+def test_several_missed_actions_are_spread_not_run_at_once(tmp_path: Path) -> None:
+    runs = RunStore(path=str(tmp_path / "runs.json"))
+    actions = [_action(target) for target in ("a", "b", "c")]
+    for action in actions:
+        runs.record(action.key(), 0.0, 60)
+
+    delays, catch_ups = resume_delays(
+        actions, [20, 40, 60], runs, CatchUpPolicy.COALESCE, now=1000.0
+    )
+
+    assert [catch_up.delay for catch_up in catch_ups] == [0, 20, 40]
+    # Each reads back to its last run from when it actually starts
+    assert [catch_up.window for catch_up in catch_ups] == [1000, 1020, 1040]
+    assert delays == [60, 80, 100]
+
+
+def test_run_less_than_an_interval_overdue_is_late_not_missed(
+    tmp_path: Path,
+) -> None:
+    runs = RunStore(path=str(tmp_path / "runs.json"))
+    # Both were due at 960: one interval is 60s, the other 30s
+    late = _action("late")
+    missed = SyncAction(
+        type=ActionType.SYNC,
+        timeBetweenActInSeconds=30,
+        source_playlist_id="s",
+        target_playlist_id="missed",
+    )
+    runs.record(late.key(), 900.0, 60)
+    runs.record(missed.key(), 930.0, 30)
+
+    delays, catch_ups = resume_delays(
+        [late, missed], [60, 30], runs, CatchUpPolicy.SKIP, now=1000.0
+    )
+
+    # The late one just runs now; skip only drops runs that were missed
+    assert delays == [0, 20]
+    assert catch_ups == []
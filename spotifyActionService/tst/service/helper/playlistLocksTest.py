@@ -0,0 +1,57 @@
+import threading
+import time
+
+from service.helper.playlistLocks import PlaylistLocks
+
+
+def _run_both(locks: PlaylistLocks, first: set[str], second: set[str]) -> int:
+    """Hold `first` and `second` from two threads; return max concurrency."""
+    active = 0
+    peak = 0
+    guard = threading.Lock()
+
+    def work(ids: set[str]) -> None:
+        nonlocal active, peak
+        with locks.hold(ids):
+            with guard:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.05)
+            with guard:
+                active -= 1
+
+    threads = [threading.Thread(target=work, args=(ids,)) for ids in (first, second)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=2)
+    return peak
+
+
+def test_overlapping_playlists_take_turns() -> None:
+    assert _run_both(PlaylistLocks(), {"a", "b"}, {"b", "c"}) == 1
+
+
+def test_disjoint_playlists_run_together() -> None:
+    assert _run_both(PlaylistLocks(), {"a"}, {"b"}) == 2
+
+
+def test_opposite_orders_do_not_deadlock() -> None:
+    locks = PlaylistLocks()
+    done = []
+
+    def work(ids: list[str]) -> None:
+        for _ in range(200):
+            with locks.hold(ids):
+                pass
+        done.append(ids)
+
+    threads = [
+        threading.Thread(target=work, args=(ids,)) for ids in (["x", "y"], ["y", "x"])
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert len(done) == 2
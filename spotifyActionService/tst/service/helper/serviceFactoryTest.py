@@ -0,0 +1,40 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from accessor.playlistCache import PlaylistCache
+from accessor.spotifyAccessor import SpotifyAccessor
+from dependency import spotifyClient
+from service.helper import serviceFactory as under_test
+
+
+@pytest.fixture(autouse=True)
+def _offline(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """Fresh process state, without OAuth or a real client."""
+
+    def fake_init(
+        self: SpotifyAccessor, client: object, cache: PlaylistCache, **kwargs: object
+    ) -> None:
+        self.cache = cache
+
+    monkeypatch.setenv("SPOTIFY_ACTIONS_STATE_DIR", str(tmp_path))
+    monkeypatch.setattr(under_test, "_shared_state", None)
+    monkeypatch.setattr(SpotifyAccessor, "__init__", fake_init)
+    monkeypatch.setattr(
+        spotifyClient, "get_client", lambda: SimpleNamespace(auth_manager=None)
+    )
+
+
+def test_local_state_is_created_once_per_process() -> None:
+    assert under_test.get_local_state() is under_test.get_local_state()
+
+
+def test_both_engines_share_one_set_of_stores() -> None:
+    pytest.importorskip("httpx")
+    blocking = under_test.build_playlist_service()
+    nonblocking = under_test.build_async_playlist_service()
+
+    # Separate instances on the same files would lose each other's updates
+    assert nonblocking.watermarks is blocking.watermarks
+    assert nonblocking.journal is blocking.journal
+    assert nonblocking.accessor.cache is blocking.accessor.cache
@@ -0,0 +1,242 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from service.helper.timerScheduler import TimerScheduler, spread_offsets
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_every_rejects_non_positive_intervals() -> None:
+    with pytest.raises(ValueError):
+        TimerScheduler().every(0, print)
+
+
+def test_run_pending_runs_due_jobs_in_due_order() -> None:
+    clock = FakeClock()
+    under_test = TimerScheduler(clock=clock)
+    ran = []
+    under_test.every(10, ran.append, "slow")
+    under_test.every(3, ran.append, "fast")
+
+    assert under_test.run_pending() == 0
+    assert under_test.next_due() == 3
+
+    clock.now = 10
+    under_test.run_pending()
+
+    assert ran == ["fast", "slow"]
+    # fast missed its slots at 6 and 9 while idle; it is not run three times
+    assert under_test.next_due() == 12
+
+
+def test_overrunning_job_skips_missed_slots() -> None:
+    clock = FakeClock()
+    under_test = TimerScheduler(clock=clock)
+    job = under_test.every(5, lambda: setattr(clock, "now", 17))
+
+    clock.now = 5
+    under_test.run_pending()
+
+    # Slots at 10 and 15 were missed while it ran; next is 20, not 10
+    assert job.due == 20
+
+
+def test_cancelled_job_does_not_run() -> None:
+    clock = FakeClock()
+    under_test = TimerScheduler(clock=clock)
+    ran = []
+    job = under_test.every(1, ran.append, "x")
+    under_test.cancel(job)
+
+    clock.now = 5
+    under_test.run_pending()
+
+    assert ran == []
+    assert under_test.next_due() is None
+    assert under_test.jobs == []
+
+
+def test_failing_job_is_logged_and_rescheduled(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    clock = FakeClock()
+    under_test = TimerScheduler(clock=clock)
+    ran: list[str] = []
+
+    def boom() -> None:
+        raise RuntimeError("boom")
+
+    under_test.every(2, boom)
+    under_test.every(3, ran.append, "after", delay=2)
+    clock.now = 2
+
+    assert under_test.run_pending() == 2
+    # The failure neither escaped nor stopped the next due job
+    assert ran == ["after"]
+    assert under_test.next_due() == 4
+    assert "failed" in caplog.text
+
+
+def test_run_forever_fires_on_time_and_stops() -> None:
+    under_test = TimerScheduler()
+    fired: list[float] = []
+    start = time.monotonic()
+
+    def tick() -> None:
+        fired.append(time.monotonic() - start)
+        if len(fired) == 3:
+            under_test.stop()
+
+    under_test.every(0.05, tick)
+    under_test.run_forever()
+
+    assert len(fired) == 3
+    for n, at in enumerate(fired, start=1):
+        assert at == pytest.approx(0.05 * n, abs=0.04)
+
+
+def test_stop_interrupts_a_long_sleep() -> None:
+    under_test = TimerScheduler()
+    under_test.every(3600, print)
+    thread = threading.Thread(target=under_test.run_forever)
+    thread.start()
+
+    time.sleep(0.05)
+    started = time.monotonic()
+    under_test.stop()
+    thread.join(timeout=2)
+
+    assert not thread.is_alive()
+    assert time.monotonic() - started < 1
+
+
+def test_adding_an_earlier_job_wakes_the_loop() -> None:
+    under_test = TimerScheduler()
+    under_test.every(3600, print)
+    done = threading.Event()
+    thread = threading.Thread(target=under_test.run_forever)
+    thread.start()
+
+    time.sleep(0.05)
+    under_test.every(0.01, done.set)
+    try:
+        assert done.wait(timeout=2)
+    finally:
+        under_test.stop()
+        thread.join(timeout=2)
+
+
+def test_executor_runs_due_jobs_at_the_same_time() -> None:
+    clock = FakeClock()
+    both_started = threading.Barrier(2, timeout=2)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        under_test = TimerScheduler(clock=clock, executor=executor)
+        under_test.every(5, both_started.wait)
+        under_test.every(5, both_started.wait)
+
+        clock.now = 5
+        assert under_test.run_pending() == 2
+
+    # Both waited on the barrier together, and came back onto the heap
+    assert not both_started.broken
+    assert [job.due for job in under_test.jobs] == [10, 10]
+
+
+def test_executor_job_is_not_started_again_while_running() -> None:
+    clock = FakeClock()
+    release = threading.Event()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        under_test = TimerScheduler(clock=clock, executor=executor)
+        under_test.every(1, release.wait)
+
+        clock.now = 1
+        assert under_test.run_pending() == 1
+        clock.now = 3
+        assert under_test.run_pending() == 0
+        release.set()
+
+    assert under_test.next_due() == 4
+
+
+def test_executor_job_failure_is_logged_and_rescheduled(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    clock = FakeClock()
+
+    def boom() -> None:
+        raise RuntimeError("boom")
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        under_test = TimerScheduler(clock=clock, executor=executor)
+        under_test.every(2, boom)
+        clock.now = 2
+        under_test.run_pending()
+
+    assert under_test.next_due() == 4
+    assert "failed" in caplog.text
+
+
+def test_every_with_delay_runs_first_after_delay() -> None:
+    clock = FakeClock(100)
+    under_test = TimerScheduler(clock=clock)
+
+    job = under_test.every(30, print, delay=10)
+
+    assert job.due == 110
+    with pytest.raises(ValueError):
+        under_test.every(30, print, delay=-1)
+
+
+def test_jitter_delays_runs_without_shifting_the_cadence() -> None:
+    clock = FakeClock()
+    delays = iter([4.0, 1.0])
+    under_test = TimerScheduler(clock=clock, rand=lambda low, high: next(delays))
+    job = under_test.every(10, print, jitter=5)
+
+    assert job.due == 14
+
+    clock.now = 14
+    under_test.run_pending()
+
+    # The next slot is 20 on the original cadence, not 24
+    assert job.due == 21
+
+
+def test_jitter_is_capped_at_the_interval() -> None:
+    bounds = []
+    under_test = TimerScheduler(
+        clock=FakeClock(), rand=lambda low, high: bounds.append(high) or 0.0
+    )
+
+    under_test.every(10, print, jitter=60)
+
+    assert bounds == [10]
+
+
+def test_spread_offsets_spaces_jobs_sharing_an_interval() -> None:
+    assert spread_offsets([30, 30, 30, 60]) == [10, 20, 30, 60]
+    assert spread_offsets([]) == []
+
+
+def test_once_runs_a_single_time() -> None:
+    clock = FakeClock()
+    under_test = TimerScheduler(clock=clock)
+    ran = []
+    under_test.once(0, ran.append, "now")
+
+    under_test.run_pending()
+    clock.now = 100
+    under_test.run_pending()
+
+    assert ran == ["now"]
+    assert under_test.jobs == []
+    with pytest.raises(ValueError):
+        under_test.once(-1, print)
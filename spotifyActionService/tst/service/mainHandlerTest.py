@@ -42,7 +42,7 @@ def test_do_sync(
     calls: list[Any] = []
 
     class DummyService:
-        def __init__(self, accessor: Action) -> None:
+        def __init__(self, accessor: Action, **kwargs: object) -> None:
             calls.append(("init", accessor))
 
         def sync_playlists(self, action: Action) -> None:
@@ -80,7 +80,7 @@ def test_do_archive(
     calls: list[Any] = []
 
     class DummyService:
-        def __init__(self, accessor: SpotifyAccessor) -> None:
+        def __init__(self, accessor: SpotifyAccessor, **kwargs: object) -> None:
             calls.append(("init", accessor))
 
         def archive_playlists(self, action: Action) -> None:
@@ -109,13 +109,27 @@ def test_do_archive(
     assert action.timeBetweenActInSeconds == 5 * 24 * 3600
     assert action.avoid_duplicates is True
     assert action.filter_by_time is False
+    # Into a target nothing is removed from the source
+    assert not action.moves_tracks()
 
 
 def test_run_actions_once(monkeypatch: pytest.MonkeyPatch) -> None:
     calls: list[bool] = []
-    monkeypatch.setattr(onDemandHandler, "main", lambda: calls.append(True))
+    monkeypatch.setattr(
+        onDemandHandler, "main", lambda use_async: calls.append(use_async)
+    )
 
     under_test.run_actions_once()
+    assert calls == [False]
+
+
+def test_run_actions_once_async(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[bool] = []
+    monkeypatch.setattr(
+        onDemandHandler, "main", lambda use_async: calls.append(use_async)
+    )
+
+    under_test.run_actions_once(use_async=True)
     assert calls == [True]
 
 
@@ -3,6 +3,7 @@ import logging
 import pytest
 import service.onDemandHandler as under_test
 from accessor.spotifyAccessor import SpotifyAccessor
+from dependency import spotifyClient
 from service.helper.actionHelper import ActionProcessor
 from spotipy import Spotify
 
@@ -41,7 +42,7 @@ def test_main_invokes_parse_and_handle(
         SpotifyAccessor, "get_current_user_id", lambda self: "test_user"
     )
 
-    def fake_init(self: SpotifyAccessor, client: Spotify) -> None:
+    def fake_init(self: SpotifyAccessor, client: Spotify, **kwargs: object) -> None:
         # initialize minimal state without network or input
         self.user_id = "test_user"
         self.client = None
@@ -53,7 +54,7 @@ def test_main_invokes_parse_and_handle(
     )
 
     # stub get_client to avoid real OAuth setup
-    monkeypatch.setattr(under_test.spotifyClient, "get_client", lambda: None)
+    monkeypatch.setattr(spotifyClient, "get_client", lambda: None)
 
     # run main (this will use our monkeypatched methods)
     under_test.main()
@@ -70,3 +71,34 @@ def test_main_invokes_parse_and_handle(
     assert "Parsed 2 actions." in log
     assert "Actions: ['act1', 'act2']" in log
     assert "Handling actions..." in log
+
+
+def test_main_async_runs_actions_on_the_event_loop(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls: list[tuple[str, object]] = []
+
+    class FakeAccessor:
+        async def aclose(self) -> None:
+            calls.append(("closed", None))
+
+    class FakeAsyncService:
+        accessor = FakeAccessor()
+
+    async def fake_handle_async(
+        self: ActionProcessor, actions: list[str], concurrency: int
+    ) -> None:
+        calls.append(("handle_async", (actions, concurrency)))
+
+    monkeypatch.setattr(under_test, "build_playlist_service", lambda: None)
+    monkeypatch.setattr(
+        under_test, "build_async_playlist_service", lambda: FakeAsyncService()
+    )
+    monkeypatch.setattr(ActionProcessor, "parse_action_file", lambda self, p: ["a"])
+    monkeypatch.setattr(ActionProcessor, "handle_actions", pytest.fail)
+    monkeypatch.setattr(ActionProcessor, "handle_actions_async", fake_handle_async)
+    monkeypatch.setenv("SPOTIFY_ASYNC_CONCURRENCY", "5")
+
+    under_test.main(use_async=True)
+
+    assert calls == [("handle_async", (["a"], 5)), ("closed", None)]
@@ -1,15 +1,20 @@
-import time
-from collections.abc import Callable
+import signal
+from pathlib import Path
 
 import pytest
-import schedule
 import service.schedulerHandler as under_test
+from accessor.runStore import RunStore
 from accessor.spotifyAccessor import SpotifyAccessor
+from dependency import spotifyClient
 from models.actions import Action
+from service.helper.catchUp import CatchUp
+from service.helper.playlistLocks import PlaylistLocks
+from service.helper.timerScheduler import TimerScheduler
 from service.schedulerHandler import (
-    SLEEP_TIME_IN_SECONDS,
+    first_run_delays,
     main,
     schedule_action,
+    schedule_catch_up,
 )
 from spotipy import Spotify
 
@@ -20,53 +25,77 @@ class DummyProcessor:
         ...
 
 
-def test_schedule_action_creates_job(monkeypatch: pytest.MonkeyPatch) -> None:
-    calls = []
+def test_schedule_action_creates_job() -> None:
+    scheduler = TimerScheduler(clock=lambda: 100.0)
+    dummy_processor = DummyProcessor()
+    dummy_action = Action(type=None, timeBetweenActInSeconds=5)
 
-    class FakeJob:
-        def __init__(self, interval: int) -> None:
-            self.interval = interval
-            self.seconds = self  # match the .seconds property
+    job = schedule_action(scheduler, dummy_processor, dummy_action)
 
-        def do(self, func: Callable[[Action], None], arg: Action) -> "FakeJob":
-            calls.append((self.interval, func, arg))
-            return self
+    assert scheduler.jobs == [job]
+    assert job.interval == 5
+    assert job.due == 105.0
+    assert job.fn == dummy_processor.handle_action
+    assert job.args == (dummy_action,)
 
-    # mock external schedule.every
-    monkeypatch.setattr(schedule, "every", lambda n: FakeJob(n))
 
-    dummy_processor = DummyProcessor()
-    dummy_action = Action(type=None, timeBetweenActInSeconds=5)
+def test_schedule_action_passes_delay_and_jitter() -> None:
+    scheduler = TimerScheduler(clock=lambda: 100.0, rand=lambda low, high: high)
+    action = Action(type=None, timeBetweenActInSeconds=30)
 
-    # call the real schedule_action
-    schedule_action(dummy_processor, dummy_action)
+    job = schedule_action(scheduler, DummyProcessor(), action, delay=10, jitter=2)
 
-    assert calls == [(5, dummy_processor.handle_action, dummy_action)]
+    assert job.due == 112.0
+    assert job.jitter == 2
 
 
-def test_main_schedules_and_runs_once(monkeypatch: pytest.MonkeyPatch) -> None:
-    # 0) stub SpotifyAccessor to bypass OAuth interaction
-    monkeypatch.setattr(
-        SpotifyAccessor, "get_current_user_id", lambda self: "test_user"
+def test_schedule_catch_up_runs_once_after_its_delay_and_jitter() -> None:
+    scheduler = TimerScheduler(clock=lambda: 100.0, rand=lambda low, high: high)
+    action = Action(type=None, timeBetweenActInSeconds=30)
+
+    job = schedule_catch_up(
+        scheduler, DummyProcessor(), CatchUp(action, 45.0, delay=10), jitter=2
     )
 
-    def fake_init(self: SpotifyAccessor, client: Spotify) -> None:
+    assert not job.repeat
+    assert job.due == 112.0
+    assert job.args == (action, 45.0)
+
+
+def test_first_run_delays_spread_actions_unless_disabled(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    actions = [Action(type=None, timeBetweenActInSeconds=30) for _ in range(3)]
+
+    monkeypatch.delenv("SPOTIFY_SCHEDULE_SPREAD", raising=False)
+    assert first_run_delays(actions) == [10, 20, 30]
+
+    monkeypatch.setenv("SPOTIFY_SCHEDULE_SPREAD", "false")
+    assert first_run_delays(actions) == [30, 30, 30]
+
+
+def _stub_spotify(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Stub SpotifyAccessor and the client to bypass OAuth interaction."""
+
+    def fake_init(self: SpotifyAccessor, client: Spotify, **kwargs: object) -> None:
         self.user_id = "test_user"
         self.client = None
 
-    monkeypatch.setattr(
-        SpotifyAccessor,
-        "__init__",
-        fake_init,
-    )
+    monkeypatch.setattr(SpotifyAccessor, "__init__", fake_init)
+    monkeypatch.setattr(spotifyClient, "get_client", lambda: None)
 
-    # stub get_client to avoid real OAuth setup
-    monkeypatch.setattr(under_test.spotifyClient, "get_client", lambda: None)
+
+def test_main_schedules_and_runs_until_stopped(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _stub_spotify(monkeypatch)
+    monkeypatch.delenv("SPOTIFY_ACTION_WORKERS", raising=False)
+    monkeypatch.setenv("SPOTIFY_ACTIONS_RELOAD_SECONDS", "0")
 
     # 1) stub external ActionProcessor.parse_action_file
     actions = [
-        Action(type=None, timeBetweenActInSeconds=3),
-        Action(type=None, timeBetweenActInSeconds=7),
+        Action(type="first", timeBetweenActInSeconds=3),
+        Action(type="second", timeBetweenActInSeconds=7),
     ]
     monkeypatch.setattr(
         under_test.ActionProcessor,
@@ -74,50 +103,116 @@ def test_main_schedules_and_runs_once(monkeypatch: pytest.MonkeyPatch) -> None:
         lambda self, path: actions,
     )
 
-    # 2) capture calls to schedule.every
-    calls = []
-
-    class FakeJob:
-        def __init__(self, interval: int) -> None:
-            self.interval = interval
-            self.seconds = self
-
-        def do(self, func: Callable, arg: any) -> "FakeJob":
-            calls.append((self.interval, func, arg))
-            return self
-
-    monkeypatch.setattr(schedule, "every", lambda n: FakeJob(n))
-
-    # 3) stub schedule.run_pending to break after one iteration
-    run_count = {"count": 0}
-
-    def fake_run_pending() -> None:
-        if run_count["count"] >= 1:
-            raise KeyboardInterrupt()
-        run_count["count"] += 1
-
-    monkeypatch.setattr(schedule, "run_pending", fake_run_pending)
-
-    # 4) stub external time.sleep
-    monkeypatch.setattr(time, "sleep", lambda s: None)
-
-    # run main — it should schedule both actions, run one loop, then raise
-    with pytest.raises(KeyboardInterrupt):
-        main()
-
-    # assertions
-    assert run_count["count"] == 1, "run_pending should be called exactly once"
-    # two actions scheduled
-    assert len(calls) == 2
-    # check first action
-    interval1, func1, arg1 = calls[0]
-    assert interval1 == 3
-    assert arg1 is actions[0]
-    assert func1.__name__ == "handle_action"
-    # check second action
-    interval2, func2, arg2 = calls[1]
-    assert interval2 == 7
-    assert arg2 is actions[1]
-    assert func2.__name__ == "handle_action"
-    # make sure the sleep constant didn't change
-    assert SLEEP_TIME_IN_SECONDS == 1
+    # 2) capture the scheduler instead of running it, and the SIGTERM handler
+    schedulers: list[TimerScheduler] = []
+    handlers = {}
+    monkeypatch.setattr(
+        TimerScheduler, "run_forever", lambda self: schedulers.append(self)
+    )
+    monkeypatch.setattr(
+        signal, "signal", lambda signum, handler: handlers.update({signum: handler})
+    )
+
+    main()
+
+    [scheduler] = schedulers
+    assert [(job.interval, job.args) for job in scheduler.jobs] == [
+        (3, (actions[0],)),
+        (7, (actions[1],)),
+    ]
+    assert all(job.fn.__name__ == "handle_action" for job in scheduler.jobs)
+    # Actions run inline unless workers are configured
+    assert scheduler.executor is None
+    # SIGTERM stops the loop
+    handlers[signal.SIGTERM](signal.SIGTERM, None)
+    assert scheduler._wait_until_due() is False
+
+
+def test_main_with_workers_runs_actions_on_a_pool_with_locks(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _stub_spotify(monkeypatch)
+    monkeypatch.setenv("SPOTIFY_ACTION_WORKERS", "3")
+    actions = [Action(type=None, timeBetweenActInSeconds=3)]
+    monkeypatch.setattr(
+        under_test.ActionProcessor, "parse_action_file", lambda self, path: actions
+    )
+    schedulers: list[TimerScheduler] = []
+    monkeypatch.setattr(
+        TimerScheduler, "run_forever", lambda self: schedulers.append(self)
+    )
+    monkeypatch.setattr(signal, "signal", lambda signum, handler: None)
+
+    main()
+
+    [scheduler] = schedulers
+    assert scheduler.executor._max_workers == 3
+    processor = scheduler.jobs[0].fn.__self__
+    assert isinstance(processor.locks, PlaylistLocks)
+
+
+def test_main_checks_the_actions_file_for_changes(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _stub_spotify(monkeypatch)
+    monkeypatch.delenv("SPOTIFY_ACTION_WORKERS", raising=False)
+    monkeypatch.delenv("SPOTIFY_ACTIONS_RELOAD_SECONDS", raising=False)
+    actions = [Action(type=None, timeBetweenActInSeconds=30)]
+    monkeypatch.setattr(
+        under_test.ActionProcessor, "parse_action_file", lambda self, path: actions
+    )
+    schedulers: list[TimerScheduler] = []
+    monkeypatch.setattr(
+        TimerScheduler, "run_forever", lambda self: schedulers.append(self)
+    )
+    monkeypatch.setattr(signal, "signal", lambda signum, handler: None)
+
+    main()
+
+    [scheduler] = schedulers
+    reload_job, action_job = scheduler.jobs
+    assert reload_job.interval == 5
+    assert reload_job.fn.__name__ == "check"
+    assert reload_job.fn.__self__.jobs == {actions[0].key(): action_job}
+
+
+def test_main_catches_up_missed_runs_from_the_run_store(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    _stub_spotify(monkeypatch)
+    monkeypatch.delenv("SPOTIFY_ACTION_WORKERS", raising=False)
+    monkeypatch.setenv("SPOTIFY_ACTIONS_RELOAD_SECONDS", "0")
+    monkeypatch.setenv("SPOTIFY_ACTIONS_STATE_DIR", str(tmp_path))
+    monkeypatch.setenv("SPOTIFY_SCHEDULE_CATCH_UP", "run_once")
+    fresh = Action(type="sync", timeBetweenActInSeconds=30)
+    missed = Action(type="sync_liked", timeBetweenActInSeconds=30)
+    RunStore(path=str(tmp_path / "runs.json")).record(missed.key(), 0.0, 30)
+    monkeypatch.setattr(
+        under_test.ActionProcessor,
+        "parse_action_file",
+        lambda self, path: [fresh, missed],
+    )
+    schedulers: list[TimerScheduler] = []
+    monkeypatch.setattr(
+        TimerScheduler, "run_forever", lambda self: schedulers.append(self)
+    )
+    monkeypatch.setattr(signal, "signal", lambda signum, handler: None)
+    tracked = []
+    monkeypatch.setattr(
+        under_test.ActionReloader,
+        "track_catch_up",
+        lambda self, action, job: tracked.append((action, job)),
+    )
+
+    main()
+
+    [scheduler] = schedulers
+    catch_up, *recurring = scheduler.jobs
+    assert not catch_up.repeat
+    assert catch_up.args == (missed, None)
+    # Removing the action from the file cancels its catch-up
+    assert tracked == [(missed, catch_up)]
+    assert [(job.repeat, job.args) for job in recurring] == [
+        (True, (fresh,)),
+        (True, (missed,)),
+    ]
@@ -0,0 +1,91 @@
+import json
+import logging
+import logging.handlers
+import queue
+
+from util.logger import (
+    JsonFormatter,
+    SamplingFilter,
+    Truncated,
+    _use_queue,
+    event,
+    truncate,
+)
+
+
+def _record(msg: str, *args: object, **extra: object) -> logging.LogRecord:
+    record = logging.LogRecord("test", logging.INFO, "f.py", 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_truncate_caps_long_payloads() -> None:
+    rendered = str(truncate("x" * 50, limit=10))
+    assert rendered == "xxxxxxxxxx... (50 chars)"
+    assert str(truncate("short", limit=10)) == "short"
+    assert repr(truncate(["a"], limit=10)) == "['a']"
+
+
+def test_truncate_formats_only_when_rendered() -> None:
+    calls: list[int] = []
+
+    class Payload:
+        def __str__(self) -> str:
+            calls.append(1)
+            return "payload"
+
+    wrapped = Truncated(Payload(), 100)
+    logger = logging.getLogger("loggerTest.lazy")
+    logger.setLevel(logging.WARNING)
+    logger.info("value: %s", wrapped)
+    assert calls == []
+    assert f"value: {wrapped}" == "value: payload"
+    assert calls == [1]
+
+
+def test_sampling_filter_keeps_one_in_n_per_event() -> None:
+    under_test = SamplingFilter(every=3)
+    kept = [
+        under_test.filter(_record("page %s", i, **event("page", sampled=True)))
+        for i in range(7)
+    ]
+    assert kept == [True, False, False, True, False, False, True]
+    # other events and unsampled records are counted separately / not at all
+    assert under_test.filter(_record("x", **event("other", sampled=True)))
+    assert all(under_test.filter(_record("plain")) for _ in range(5))
+
+
+def test_sampling_filter_never_drops_warnings() -> None:
+    under_test = SamplingFilter(every=100)
+    record = _record("page", **event("page", sampled=True))
+    record.levelno = logging.WARNING
+    assert all(under_test.filter(record) for _ in range(5))
+
+
+def test_json_formatter_emits_event_fields() -> None:
+    record = _record("Fetched %s", 3, **event("fetched", playlist_id="p1", items=3))
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "Fetched 3"
+    assert entry["event"] == "fetched"
+    assert entry["playlist_id"] == "p1"
+    assert entry["items"] == 3
+
+
+def test_use_queue_moves_handlers_behind_listener() -> None:
+    root = logging.getLogger("loggerTest.queue")
+    root.propagate = False
+    seen: queue.SimpleQueue = queue.SimpleQueue()
+
+    class Collect(logging.Handler):
+        def emit(self, record: logging.LogRecord) -> None:
+            seen.put(record.getMessage())
+
+    root.addHandler(Collect())
+    listener = _use_queue(root)
+    try:
+        assert isinstance(root.handlers[0], logging.handlers.QueueHandler)
+        root.warning("hello %s", "queue")
+        assert seen.get(timeout=1) == "hello queue"
+    finally:
+        listener.stop()
+        root.handlers.clear()